@@ -1,10 +1,23 @@
 import streamlit as st
-import pandas as pd
 
-from utils.tokens_mock import generate_token_dataset
-from utils.formatting import pct_delta_str
+from utils.cache import cached_token_dataset
+from utils.monitor import alert_monitor
+from utils.scheduler import ensure_scheduler, store_status
+from utils.startup import ensure_warmup, warmup_status
+from utils.screener import PAGE_SIZES, PCT_COLUMNS, page_slice, screen
+from utils.tokens_mock import TOKENS_DEFAULT, token_universe
+from utils.perf import span
+from utils.ui import data_status, perf_begin, perf_panel, warmup_notice
 
 st.set_page_config(page_title="Dashboard Home", layout="wide")
+trace = perf_begin("Summary")
+
+# snapshots refresh and caches warm in the background; show how fresh the served data is
+ensure_scheduler()
+ensure_warmup()
+with st.sidebar:
+    data_status(store_status())
+    warmup_notice(warmup_status())
 
 st.title("📊 Crypto Dashboard – Summary")
 st.caption("Token overview for quick screening (mock data)")
@@ -12,24 +25,86 @@ st.caption("Token overview for quick screening (mock data)")
 # =======================
 # Generate data
 # =======================
-seed = st.number_input("Mock seed", min_value=1, max_value=9999, value=42, step=1)
-summary, _ = generate_token_dataset(seed=seed)
+seed_col, universe_col = st.columns(2)
+with seed_col:
+    seed = st.number_input("Mock seed", min_value=1, max_value=9999, value=42, step=1)
+with universe_col:
+    # the default list, or padded with synthetic tickers to load-test the screener
+    universe = st.selectbox("Universe (tokens)", [len(TOKENS_DEFAULT), 1000, 5000, 10000])
+
+tokens = None if universe == len(TOKENS_DEFAULT) else token_universe(universe)
+with span("load dataset"):
+    summary, _ = cached_token_dataset(tokens=tokens, seed=seed)
+# rules run in the background; large universes render before the first pass lands
+with span("alerts"):
+    alerts = alert_monitor(tokens, seed).latest(wait=tokens is None)
+
+# =======================
+# Screener controls
+# =======================
+f1, f2, f3, f4, f5, f6 = st.columns([2, 2, 1.2, 1.4, 1.2, 1.2])
+with f1:
+    query = st.text_input("Token contains", "")
+with f2:
+    sort_by = st.selectbox("Sort by", ["Default (unlocks, volume)"] + PCT_COLUMNS)
+with f3:
+    descending = st.toggle("Descending", value=True)
+with f4:
+    top_n = st.number_input("Top K (0 = all)", min_value=0, value=0, step=10)
+with f5:
+    unlock_only = st.checkbox("Unlock >2% only", value=False)
+with f6:
+    alerts_only = st.checkbox("Any alert only", value=False, disabled=alerts is None)
 
-summary_view = summary.copy()
+r1, r2 = st.columns([2, 3])
+with r1:
+    range_col = st.selectbox("Filter column", ["(none)"] + PCT_COLUMNS)
+with r2:
+    lo, hi = st.slider("Range (%)", -100.0, 300.0, (-100.0, 300.0), step=1.0, disabled=range_col == "(none)")
+ranges = {} if range_col == "(none)" else {range_col: (lo, hi)}
 
-for col in ["Price (30D %)", "FDV (30D %)", "Volume 24H (30D %)"]:
-    summary_view[col] = summary_view[col].apply(pct_delta_str)
+with span("screen"):
+    alert_mask = alerts.any()[alerts.positions(summary["Token"])] if alerts_only and alerts is not None else None
+    rows = screen(
+        summary,
+        query=query,
+        unlock_only=unlock_only,
+        ranges=ranges,
+        sort_by=None if sort_by not in PCT_COLUMNS else sort_by,
+        descending=descending,
+        k=top_n or None,
+        mask=alert_mask,
+    )
 
 # =======================
 # Summary Table
 # =======================
 st.subheader("🪙 Tokens Summary")
 
-st.dataframe(
-    summary_view,
-    use_container_width=True,
-    hide_index=True,
-)
+p1, p2 = st.columns([1, 4])
+with p1:
+    page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+n_pages = max(-(-len(rows) // page_size), 1)
+with p2:
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)
+
+sl = page_slice(len(rows), page, page_size)
+st.caption(f"Showing {sl.start + 1 if sl.stop else 0}–{sl.stop} of {len(rows):,} matches ({len(summary):,} tokens)")
+
+page_view = summary.iloc[rows[sl]]
+if alerts is not None:
+    page_view = page_view.assign(Alerts=alerts.labels(page_view["Token"]))
+else:
+    st.caption("Alert rules are still evaluating in the background…")
+
+with span("table"):
+    # numeric columns stay numeric; formatting is client-side via column_config
+    st.dataframe(
+        page_view,
+        use_container_width=True,
+        hide_index=True,
+        column_config={col: st.column_config.NumberColumn(col, format="%+.2f%%") for col in PCT_COLUMNS},
+    )
 
 st.markdown(
     """
@@ -38,3 +113,5 @@ st.markdown(
 - This page is for **quick comparison & screening**
 """
 )
+
+perf_panel(trace)
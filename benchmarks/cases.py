@@ -0,0 +1,200 @@
+"""Benchmark cases: name -> (setup, run).
+
+setup() is called once, untimed, and returns the arguments run(*args) is
+timed with. Keep names stable: they are the keys in the JSON baselines.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = {
+    "app": "app.py",
+    "tokens": os.path.join("pages", "2_Tokens.py"),
+    "macro": os.path.join("pages", "3_Macro.py"),
+    "portfolio": os.path.join("pages", "4_Portfolio.py"),
+}
+
+class Case(NamedTuple):
+    name: str
+    run: Callable
+    setup: Callable = tuple
+    repeat: int = 5
+
+CASES = []
+
+def case(name: str, setup: Callable = tuple, repeat: int = 5):
+    def register(fn):
+        CASES.append(Case(name, fn, setup, repeat))
+        return fn
+    return register
+
+# =======================
+# Data generation
+# =======================
+def _dataset_case(n_tokens: int, days: int, repeat: int):
+    from utils.tokens_mock import generate_token_dataset, token_universe
+
+    @case(f"tokens/dataset/{n_tokens}x{days}d", setup=lambda: (token_universe(n_tokens),), repeat=repeat)
+    def run(tokens):
+        generate_token_dataset(tokens, seed=42, days=days)
+
+def _details_case(n_tokens: int):
+    from utils.tokens_mock import generate_token_dataset, token_universe
+
+    # the lazy part: every token's full detail block
+    @case(f"tokens/details/{n_tokens}", setup=lambda: (token_universe(n_tokens),), repeat=3)
+    def run(tokens):
+        _, details = generate_token_dataset(tokens, seed=42)
+        for t in details:
+            details[t]
+
+for n_tokens, days, repeat in [(15, 365, 10), (100, 365, 5), (1000, 365, 3), (100, 730, 5), (100, 1825, 3)]:
+    _dataset_case(n_tokens, days, repeat)
+for n_tokens in (15, 100):
+    _details_case(n_tokens)
+
+def _series_case(kind: str):
+    from utils.fake_data import make_series
+
+    @case(f"macro/make_series/{kind}", repeat=20)
+    def run():
+        make_series(f"bench {kind}", years=3, freq="D", kind=kind, seed=42)
+
+for kind in ("level", "volume", "ratio", "index"):
+    _series_case(kind)
+
+@case("macro/make_panel", repeat=20)
+def _make_panel():
+    from utils.fake_data import MACRO_SERIES, make_panel
+    make_panel(MACRO_SERIES, seed=42)
+
+# =======================
+# Analytics
+# =======================
+def _token_block(n_tokens: int):
+    from utils.tokens_mock import generate_token_arrays, token_universe
+    return (generate_token_arrays(token_universe(n_tokens), seed=42)["values"],)
+
+@case("rolling/latest_stats/1000", setup=lambda: _token_block(1000), repeat=10)
+def _latest_stats(values):
+    from utils.rolling import latest_stats
+    latest_stats(values)
+
+@case("rolling/rolling_stats/100", setup=lambda: _token_block(100), repeat=5)
+def _rolling_stats(values):
+    # full-length MA7/30/90 (the old ma_30), EWMA and vol
+    from utils.rolling import rolling_stats
+    rolling_stats(values)
+
+@case("rolling/pct_change/1000", setup=lambda: _token_block(1000), repeat=20)
+def _pct_change(values):
+    from utils.rolling import last_and_change, pct_change
+    pct_change(values, 30)
+    pct_change(values, 7)
+    last_and_change(values, 1)
+
+@case("rolling/rolling_corr/6x1096", setup=lambda: (np.exp(np.random.default_rng(0).normal(0, 0.02, (6, 1096)).cumsum(axis=1)),), repeat=20)
+def _rolling_corr(values):
+    from utils.rolling import rolling_corr
+    rolling_corr(values, 26)
+
+@case("portfolio/analytics/500", setup=lambda: _portfolio_inputs(500), repeat=10)
+def _portfolio(prices, positions):
+    from utils.portfolio import portfolio_analytics
+    portfolio_analytics(prices, positions)
+
+def _portfolio_inputs(n_tokens: int):
+    from utils.tokens_mock import generate_token_dataset, token_universe
+    _, details = generate_token_dataset(token_universe(n_tokens), seed=42)
+    return details.prices(), details.positions()
+
+# =======================
+# Export
+# =======================
+@case("export/parquet/100", setup=lambda: (tempfile.mkdtemp(prefix="bench-export-"),), repeat=3)
+def _export(out):
+    # in-process (workers=0): the per-batch build and write cost, without pool startup
+    from utils.export import export
+    from utils.tokens_mock import token_universe
+    export(out, token_universe(100), workers=0)
+
+# =======================
+# Full page reruns (headless)
+# =======================
+def _clear_caches():
+    """Drop every process-wide cache, as a restarted worker would start."""
+    from utils import monitor, rollups, snapshot
+    from utils.cache import DATASETS
+    from utils.charts import FIGURES
+    from utils.feed import FEEDS
+
+    DATASETS.clear()
+    if DATASETS.disk is not None:
+        DATASETS.disk.clear()
+    FIGURES.clear()
+    FEEDS.clear()
+    with rollups._LOCK:
+        rollups._PYRAMIDS.clear()
+    snapshot._OPEN.clear()
+    with monitor._LOCK:
+        for m in monitor._MONITORS.values():
+            m.stop()
+        monitor._MONITORS.clear()
+
+def _run_page(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+def _page_cases(page: str, path: str):
+    from streamlit.testing.v1 import AppTest
+
+    def warm():
+        at = AppTest.from_file(os.path.join(ROOT, path), default_timeout=120)
+        _run_page(at)
+        return (at,)
+
+    # caches warm: what every rerun after the first costs
+    @case(f"page/{page}/rerun", setup=warm, repeat=10)
+    def rerun(at):
+        _run_page(at)
+
+    # process caches empty: the first visit after a restart or day rollover
+    @case(f"page/{page}/cold", setup=warm, repeat=3)
+    def cold(at):
+        _clear_caches()
+        _run_page(at)
+
+for page, path in PAGES.items():
+    _page_cases(page, path)
+
+# =======================
+# Startup
+# =======================
+@case("startup/warm_up", repeat=3)
+def _warm_up():
+    from utils.startup import warm_up
+    _clear_caches()
+    warm_up()
+
+# a fresh interpreter up to the end of its first render: imports, data, figures
+_FIRST_RENDER = """
+import sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+sys.exit(1 if at.exception else 0)
+"""
+
+def _first_render_case(page: str, path: str):
+    @case(f"startup/first_render/{page}", repeat=3)
+    def run():
+        subprocess.run([sys.executable, "-c", _FIRST_RENDER, os.path.join(ROOT, path)], cwd=ROOT, check=True)
+
+for page, path in PAGES.items():
+    _first_render_case(page, path)
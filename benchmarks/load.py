@@ -0,0 +1,238 @@
+"""Concurrent-session load test against the pages, headless via AppTest.
+
+    python -m benchmarks.load --sessions 1,4,16 --duration 20
+    python -m benchmarks.load --sessions 32 --workers 4 --pages tokens --json load.json
+
+Each phase starts `workers` fresh processes (one per Streamlit worker you
+would run) and spreads `sessions` simulated users over them as threads, so
+sessions in one process share its caches the way real sessions do. Each
+session loops a scripted action on its page, then reruns:
+
+    app        change the seed (from a small pool, so caches can hit)
+    tokens     cycle the selected token
+    macro      toggle "Show data table"
+    portfolio  change the seed
+
+The report per phase gives rerun latency percentiles (first visits listed
+separately), the median service time without queueing ("busy"),
+throughput, errors and each worker's RSS at start, peak and end, i.e. how
+much memory N sessions cost. Within a worker, reruns execute one at a
+time (see _RUN_LOCK): with several sessions per worker, rerun latency is
+mostly the wait for that lock, not the page, and the report says so.
+By default each session gets its own worker, so latency is the page's;
+pass --workers to pack sessions and measure queueing instead.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.cases import PAGES, ROOT
+
+SEED_POOL = (42, 7, 99, 1234)
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:   # not Linux: peak RSS is the best we have
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / 2**20 if sys.platform == "darwin" else maxrss / 1024
+
+# =======================
+# Session scripts
+# =======================
+def _widget(widgets, label: str):
+    return next(w for w in widgets if w.label == label)
+
+def _change_seed(at, rng):
+    _widget(at.number_input, "Mock seed").set_value(rng.choice(SEED_POOL))
+
+def _cycle_token(at, rng):
+    box = _widget(at.selectbox, "Select token")
+    options = list(box.options)
+    box.set_value(options[(options.index(box.value) + 1) % len(options)])
+
+def _toggle_raw(at, rng):
+    box = _widget(at.checkbox, "Show data table")
+    box.set_value(not box.value)
+
+ACTIONS = {"app": _change_seed, "tokens": _cycle_token, "macro": _toggle_raw, "portfolio": _change_seed}
+
+# AppTest drives a process-global Streamlit runtime, and CPython 3.11's
+# parser isn't safe to enter from several threads at once, so within a
+# worker one rerun executes at a time. Latency includes the wait for the
+# worker (the queueing N sessions cause); service time is the run alone.
+_RUN_LOCK = threading.Lock()
+
+def _run(at) -> tuple[float, float]:
+    t = time.perf_counter()
+    with _RUN_LOCK:
+        started = time.perf_counter()
+        at.run()
+    done = time.perf_counter()
+    return done - t, done - started
+
+def _session(page: str, deadline: float, think: float, seed: int, out: dict, lock: threading.Lock):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(os.path.join(ROOT, PAGES[page]), default_timeout=120)
+    first, _ = _run(at)
+    latencies, service, errors = [], [], 0
+    while time.perf_counter() < deadline:
+        try:
+            ACTIONS[page](at, rng)
+            latency, busy = _run(at)
+            latencies.append(latency)
+            service.append(busy)
+            errors += bool(at.exception)
+        except Exception:
+            # e.g. the page errored and the widget is gone: count it and start the session over
+            errors += 1
+            at = AppTest.from_file(os.path.join(ROOT, PAGES[page]), default_timeout=120)
+            _run(at)
+            if at.exception:
+                break
+        if think:
+            time.sleep(rng.expovariate(1 / think))
+    with lock:
+        out["first"].setdefault(page, []).append(first)
+        out["reruns"].setdefault(page, []).extend(latencies)
+        out["service"].extend(service)
+        out["errors"] += errors
+
+def run_worker(pages: list, n_sessions: int, duration: float, think: float, worker: int) -> dict:
+    """One worker process: n_sessions threads round-robin over pages for `duration` seconds."""
+    import streamlit.testing.v1  # noqa: F401  (imports outside the measured window)
+
+    out = {"first": {}, "reruns": {}, "service": [], "errors": 0, "rss_start": rss_mb()}
+    peak = [out["rss_start"]]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.2):
+            peak[0] = max(peak[0], rss_mb())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [
+        threading.Thread(target=_session, args=(pages[i % len(pages)], deadline, think, worker * 1000 + i, out, lock))
+        for i in range(n_sessions)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    out["elapsed"] = time.perf_counter() - start
+    done.set()
+    out["rss_end"] = rss_mb()
+    out["rss_peak"] = max(peak[0], out["rss_end"])
+    return out
+
+# =======================
+# Phases + report
+# =======================
+def _percentiles(values) -> dict:
+    if not values:
+        return {"n": 0}
+    ms = np.asarray(values) * 1e3
+    return {
+        "n": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+def run_phase(pages: list, sessions: int, workers: int | None, duration: float, think: float) -> dict:
+    workers = sessions if workers is None else max(1, min(workers, sessions))
+    per_worker = [sessions // workers + (i < sessions % workers) for i in range(workers)]
+    # spawn: fresh interpreters, so each phase starts from cold caches and a clean RSS
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = list(pool.map(run_worker, [pages] * workers, per_worker, [duration] * workers,
+                                [think] * workers, range(workers)))
+
+    reruns = {p: sum((r["reruns"].get(p, []) for r in results), []) for p in pages}
+    first = {p: sum((r["first"].get(p, []) for r in results), []) for p in pages}
+    all_reruns = sum(reruns.values(), [])
+    elapsed = statistics.fmean(r["elapsed"] for r in results)
+    return {
+        "sessions": sessions,
+        "workers": workers,
+        # reruns in one worker take turns (_RUN_LOCK): latency beyond service time is that wait
+        "serialized": sessions > workers,
+        "duration_s": elapsed,
+        "throughput_rps": len(all_reruns) / elapsed if elapsed else 0.0,
+        "errors": sum(r["errors"] for r in results),
+        "rerun": _percentiles(all_reruns),
+        "service": _percentiles(sum((r["service"] for r in results), [])),
+        "first_visit": _percentiles(sum(first.values(), [])),
+        "pages": {p: _percentiles(reruns[p]) for p in pages},
+        "rss_mb": [
+            {"start": r["rss_start"], "peak": r["rss_peak"], "end": r["rss_end"], "growth": r["rss_end"] - r["rss_start"]}
+            for r in results
+        ],
+    }
+
+def _print_phase(phase: dict):
+    r, f = phase["rerun"], phase["first_visit"]
+    growth = max(w["growth"] for w in phase["rss_mb"])
+    peak = max(w["peak"] for w in phase["rss_mb"])
+    print(f"{phase['sessions']:>8}{phase['workers']:>8}{r.get('n', 0):>8}{phase['throughput_rps']:>9.1f}"
+          f"{r.get('p50_ms', 0):>9.0f}{r.get('p90_ms', 0):>9.0f}{r.get('p99_ms', 0):>9.0f}"
+          f"{phase['service'].get('p50_ms', 0):>10.0f}"
+          f"{f.get('p50_ms', 0):>10.0f}{peak:>10.0f}{growth:>+10.0f}{phase['errors']:>7}", flush=True)
+    if phase["serialized"]:
+        print(f"{'':>16}note: {phase['sessions']} sessions on {phase['workers']} worker(s) run one rerun at a time; "
+              f"p50-p99 include waiting for the worker (busy p50 is the rerun alone)")
+    for page, p in phase["pages"].items():
+        if p["n"]:
+            print(f"{'':>16}{page:<10} n={p['n']:<6} p50 {p['p50_ms']:.0f} ms  p90 {p['p90_ms']:.0f} ms  p99 {p['p99_ms']:.0f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive N simulated sessions against the dashboard pages.")
+    parser.add_argument("--sessions", default="1,4,16", help="comma-separated session counts, one phase each")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes per phase (default: one per session, so reruns never queue)")
+    parser.add_argument("--pages", default="app,tokens,macro", help=f"comma-separated, from {','.join(PAGES)}")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    parser.add_argument("--think", type=float, default=0.0, help="mean think time between actions, seconds")
+    parser.add_argument("--disk-cache", action="store_true", help="keep the shared disk cache (off: every phase starts cold)")
+    parser.add_argument("--json", help="write the phases to this file")
+    args = parser.parse_args(argv)
+
+    pages = [p.strip() for p in args.pages.split(",") if p.strip()]
+    unknown = set(pages) - set(PAGES)
+    if unknown:
+        parser.error(f"unknown pages: {', '.join(sorted(unknown))}")
+    if not args.disk_cache:
+        os.environ["DASHBOARD_CACHE_DIR"] = ""   # inherited by the spawned workers
+    os.environ.pop("DASHBOARD_SCHEDULER", None)
+
+    print(f"{'sessions':>8}{'workers':>8}{'reruns':>8}{'rerun/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+          f"{'busy p50':>10}{'first p50':>10}{'peak MB':>10}{'RSS +MB':>10}{'errors':>7}")
+    phases = []
+    for n in (int(s) for s in args.sessions.split(",")):
+        phase = run_phase(pages, n, args.workers, args.duration, args.think)
+        phases.append(phase)
+        _print_phase(phase)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"pages": pages, "duration_s": args.duration, "think_s": args.think, "phases": phases}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
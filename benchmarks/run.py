@@ -0,0 +1,129 @@
+"""Run the benchmark suite and compare against a JSON baseline.
+
+    python -m benchmarks.run                       # print results
+    python -m benchmarks.run -k page/ --save       # (re)write the baseline for those cases
+    python -m benchmarks.run --check               # exit 1 on a regression vs the baseline
+
+Per case: wall time over `repeat` timed runs (after one untimed warm-up),
+then one extra run under tracemalloc for the peak traced memory and the
+number of traced blocks still allocated after it ("retained": caches and
+leaks, not total allocations), plus the gen-0 GC collections it triggered
+(a proxy for object allocation churn).
+
+Timings are absolute, so the baseline only means something on the machine
+that wrote it: it is git-ignored, and --check without one just prints the
+results. Run --save once on the machine that runs --check.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+# hermetic: no shared disk cache or snapshot store, no background refresh or warm-up
+os.environ["DASHBOARD_CACHE_DIR"] = ""
+os.environ.pop("DASHBOARD_SNAPSHOT_DIR", None)
+os.environ.pop("DASHBOARD_SCHEDULER", None)
+os.environ["DASHBOARD_WARMUP"] = "0"
+
+from benchmarks.cases import CASES, ROOT  # noqa: E402
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_THRESHOLD = 1.25   # fail when a case gets 25% slower (or bigger) than its baseline
+MIN_DELTA_S = 0.002        # ignore timing regressions smaller than this (timer noise)
+
+def measure(case) -> dict:
+    args = case.setup()
+    case.run(*args)   # warm-up: imports, lazy caches, allocator pools
+
+    times = []
+    for _ in range(case.repeat):
+        t = time.perf_counter()
+        case.run(*args)
+        times.append(time.perf_counter() - t)
+
+    gc.collect()
+    gen0 = gc.get_stats()[0]["collections"]
+    tracemalloc.start()
+    case.run(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    retained = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "repeat": case.repeat,
+        "peak_mb": peak / 2**20,
+        "retained_blocks": retained,
+        "gc0": gc.get_stats()[0]["collections"] - gen0,
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    failures = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if r["median_s"] > base["median_s"] * threshold and r["median_s"] - base["median_s"] > MIN_DELTA_S:
+            failures.append(f"{name}: median {r['median_s'] * 1e3:.1f} ms vs baseline {base['median_s'] * 1e3:.1f} ms")
+        if r["peak_mb"] > base["peak_mb"] * threshold and r["peak_mb"] - base["peak_mb"] > 1:
+            failures.append(f"{name}: peak {r['peak_mb']:.1f} MB vs baseline {base['peak_mb']:.1f} MB")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark data generation, analytics and page reruns.")
+    parser.add_argument("-k", "--filter", default="", help="only cases whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="merge these results into the baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a case regressed past --threshold")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {"cases": {}}
+
+    results = {}
+    print(f"{'case':<36}{'median ms':>11}{'min ms':>10}{'peak MB':>10}{'retained':>9}{'gc0':>6}{'vs base':>9}")
+    for case in CASES:
+        if args.filter not in case.name:
+            continue
+        r = results[case.name] = measure(case)
+        base = baseline["cases"].get(case.name)
+        ratio = f"{r['median_s'] / base['median_s']:.2f}x" if base else "-"
+        print(f"{case.name:<36}{r['median_s'] * 1e3:>11.2f}{r['min_s'] * 1e3:>10.2f}{r['peak_mb']:>10.2f}"
+              f"{r['retained_blocks']:>9}{r['gc0']:>6}{ratio:>9}", flush=True)
+
+    meta = {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": meta, "cases": results}, f, indent=2)
+    if args.save:
+        baseline = {"meta": meta, "cases": {**baseline["cases"], **results}}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved {len(results)} cases to {args.baseline}")
+    if args.check:
+        if not baseline["cases"]:
+            print(f"No baseline at {args.baseline}; run with --save on this machine first")
+            return
+        if baseline.get("meta") != meta:
+            print(f"WARNING baseline was saved on {baseline.get('meta')}, this is {meta}: timings may not compare")
+        failures = compare(results, baseline["cases"], args.threshold)
+        for line in failures:
+            print(f"REGRESSION {line}")
+        if failures:
+            sys.exit(1)
+        print(f"No regressions past {args.threshold:.2f}x")
+
+if __name__ == "__main__":
+    main()
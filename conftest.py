@@ -0,0 +1 @@
+# repo root on sys.path for the tests (there is no installed package)
@@ -1,62 +1,128 @@
+from html import escape
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 
-from utils.tokens_mock import generate_token_dataset, ma_30
-from utils.formatting import colored_delta, pct_delta_str, badge
-from utils.token_news_mock import get_mock_governance, get_mock_news
+from utils.alerts import SHARE_RULE, UNLOCK_RULE
+from utils.cache import cached_token_dataset, data_version
+from utils.charts import bar_figure, plot, range_selector, series_chart
+from utils.rollups import TOKEN_AGG
+from utils.rolling import latest_stats
+from utils.scheduler import ensure_scheduler, store_status
+from utils.startup import ensure_warmup, warmup_status
+from utils.screener import page_slice
+from utils.sources import SourceError
+from utils.feed import FEEDS
+from utils.tokens_mock import METRICS
+from utils.formatting import colored_delta, pct_delta_str, badge, badge_html, html_table
+from utils.monitor import alert_monitor
+from utils.perf import span
+from utils.ui import data_status, perf_begin, perf_panel, warmup_notice
 
 st.set_page_config(page_title="Tokens", layout="wide")
+trace = perf_begin("Tokens")
+
+# snapshots refresh in the background; show how fresh the served data is
+ensure_scheduler()
+ensure_warmup()
+with st.sidebar:
+    data_status(store_status())
+    warmup_notice(warmup_status())
 
 st.title("🪙 Tokens Dashboard")
 st.caption("DefiLlama-style token pages (mock data for team discussion).")
 
+FEED_PAGE_SIZES = [10, 25, 50]
+RISK_CATEGORIES = {
+    "Security": ("red", "Potential downside risk (mock)"),
+    "Regulation": ("red", "Potential downside risk (mock)"),
+}
+
 # =======================
 # Helpers
 # =======================
-def last_and_30d_change(df: pd.DataFrame):
-    if len(df) < 31:
-        v = float(df["value"].iloc[-1])
-        return v, 0.0
-    v = float(df["value"].iloc[-1])
-    prev = float(df["value"].iloc[-31])
-    chg = (v / prev - 1) * 100 if prev != 0 else 0.0
-    return v, chg
-
-def section_metric(label: str, value_str: str, pct: float):
+def token_stats(d) -> dict:
+    """Latest indicators for every series of a token, in one batched pass."""
+    stats = latest_stats(d.values)
+    return {m: {k: float(v[j]) for k, v in stats.items()} for j, m in enumerate(METRICS)}
+
+def vs_ma(s: dict, window: int = 30) -> float:
+    ma = s[f"ma{window}"]
+    return (s["last"] / ma - 1) * 100 if ma else 0.0
+
+def status_badge(status: str, impact: str) -> str:
+    if status == "Active" and impact == "High":
+        return badge_html("Active", color="red", tooltip="Active + High impact (mock)")
+    if status == "Active":
+        return badge_html("Active", color="blue", tooltip="Active (mock)")
+    if status == "Passed":
+        return badge_html("Passed", color="green", tooltip="Passed (mock)")
+    return badge_html(str(status), color="gray", tooltip="Mock")
+
+def paginate(df: pd.DataFrame, page_size: int, key: str) -> pd.DataFrame:
+    """Page of df picked by a page-number input under `key`; empty frames skip the input."""
+    n_pages = max(-(-len(df) // page_size), 1)
+    if n_pages == 1:
+        return df
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=key)
+    return df.iloc[page_slice(len(df), int(page), page_size)]
+
+def synced_feed(kind: str, token: str):
+    """The feed after a sync; if the source fails, the items from the last good sync."""
+    try:
+        return FEEDS.sync(kind, token)
+    except SourceError as e:
+        st.warning(f"Couldn't update the {kind} feed ({e}); showing the last synced items.")
+        return FEEDS.feed(kind, token)
+
+def section_metric(label: str, value_str: str, pct: float, s: dict | None = None):
     st.markdown(f"**{label}**  \n{value_str}  \n{colored_delta(pct)}")
+    if s is not None:
+        st.caption(f"WoW {s['chg_7d']:+.2f}% · MA7 {vs_ma(s, 7):+.2f}% · Vol 30D {s['vol30']:.0f}%")
 
 # =======================
 # Token selector (simple)
 # =======================
-summary, details = generate_token_dataset(seed=42)
+seed = 42
+with span("load dataset"):
+    summary, details = cached_token_dataset(seed=seed)
 
 if "selected_token" not in st.session_state:
     st.session_state.selected_token = summary["Token"].iloc[0]
 
-token = st.selectbox(
-    "Select token",
-    summary["Token"].tolist(),
-    index=summary["Token"].tolist().index(st.session_state.selected_token),
-)
+sel_col, range_col = st.columns([3, 2])
+with sel_col:
+    token = st.selectbox(
+        "Select token",
+        summary["Token"].tolist(),
+        index=summary["Token"].tolist().index(st.session_state.selected_token),
+    )
+with range_col:
+    chart_range = range_selector(key="token_range")
 
 st.session_state.selected_token = token
 d = details[token]
+with span("token stats"):
+    stats = token_stats(d)
 
 # =======================
 # Alerts – unlock & market share
 # =======================
-unlock_df = d["unlock"].copy()
-unlock_big = unlock_df[unlock_df["unlock_pct_of_circ"] > 2.0]
-has_unlock_alert = len(unlock_big) > 0
+# rule results for the whole universe come from the background monitor
+with span("alerts"):
+    fired = {rule.name: (value, first) for rule, value, first in alert_monitor(seed=seed).latest().fired(token)}
+
+unlock_df = d["unlock"]
+unlock_big = unlock_df[unlock_df["unlock_pct_of_circ"] > UNLOCK_RULE.threshold]
+has_unlock_alert = UNLOCK_RULE.name in fired
 if has_unlock_alert:
-    first_unlock = unlock_big.iloc[0]
-    unlock_tip = f"Next >2% unlock: {first_unlock['date'].date().isoformat()} ({first_unlock['unlock_pct_of_circ']:.1f}%)"
+    unlock_value, unlock_month = fired[UNLOCK_RULE.name]
+    unlock_tip = f"Next >2% unlock: {unlock_df['date'].iloc[unlock_month].date().isoformat()} ({unlock_value:.1f}%)"
 else:
     unlock_tip = "No >2% unlock in next 12 months (mock)."
 
-share_last, share_chg = last_and_30d_change(d["fund_share"])
-has_share_alert = share_chg <= -20.0
+share_last, share_chg = stats["fund_share"]["last"], stats["fund_share"]["chg_30d"]
+has_share_alert = SHARE_RULE.name in fired
 share_tip = f"30D change: {share_chg:+.2f}% (alert if ≤ -20%)"
 
 # =======================
@@ -84,47 +150,54 @@ with h5:
         badge("Share Drop", color="red", tooltip=share_tip)
     else:
         badge("Share OK", color="green", tooltip=share_tip)
+    for name, (value, _) in fired.items():
+        if name not in (UNLOCK_RULE.name, SHARE_RULE.name):
+            st.write("")
+            badge(name, color="red", tooltip=f"{value:+.2f} (mock)")
 
 st.markdown("---")
 
 # =======================
 # Tabs (add Governance & News)
 # =======================
-tabs = st.tabs(["Overview", "Unlocks", "Fundamentals", "Governance & News"])
+# Switching tabs reruns the page and only the open tab's section runs; each
+# section is a fragment, so its own widgets rerun it without the header.
+tabs = st.tabs(["Overview", "Unlocks", "Fundamentals", "Governance & News"], key="token_tab", on_change="rerun")
 
 # =======================
 # Overview
 # =======================
-with tabs[0]:
+@st.fragment
+def overview():
     c1, c2, c3 = st.columns(3)
 
-    price_last, price_chg = last_and_30d_change(d["price"])
-    fdv_last, fdv_chg = last_and_30d_change(d["fdv"])
-    vol_last, vol_chg = last_and_30d_change(d["volume"])
-    circ_last, circ_chg = last_and_30d_change(d["circ"])
-    burn_last, burn_chg = last_and_30d_change(d["burn"])
+    price_last, price_chg = stats["price"]["last"], stats["price"]["chg_30d"]
+    fdv_last, fdv_chg = stats["fdv"]["last"], stats["fdv"]["chg_30d"]
+    vol_last, vol_chg = stats["volume"]["last"], stats["volume"]["chg_30d"]
+    circ_last, circ_chg = stats["circ"]["last"], stats["circ"]["chg_30d"]
+    burn_last, burn_chg = stats["burn"]["last"], stats["burn"]["chg_30d"]
 
     with c1:
-        section_metric("Price", f"${price_last:,.4f}", price_chg)
-        st.plotly_chart(px.line(d["price"], x="date", y="value"), use_container_width=True, key=f"{token}_price")
+        section_metric("Price", f"${price_last:,.4f}", price_chg, stats["price"])
+        series_chart(d["price"], TOKEN_AGG["price"], chart_range, cache_key=(token, "price", seed, data_version()), key=f"{token}_price")
 
     with c2:
-        section_metric("FDV", f"${fdv_last/1e9:,.2f}B", fdv_chg)
-        st.plotly_chart(px.line(d["fdv"], x="date", y="value"), use_container_width=True, key=f"{token}_fdv")
+        section_metric("FDV", f"${fdv_last/1e9:,.2f}B", fdv_chg, stats["fdv"])
+        series_chart(d["fdv"], TOKEN_AGG["fdv"], chart_range, cache_key=(token, "fdv", seed, data_version()), key=f"{token}_fdv")
 
     with c3:
-        section_metric("Trading Volume (24H)", f"${vol_last/1e6:,.1f}M", vol_chg)
-        st.plotly_chart(px.area(d["volume"], x="date", y="value"), use_container_width=True, key=f"{token}_volume")
+        section_metric("Trading Volume (24H)", f"${vol_last/1e6:,.1f}M", vol_chg, stats["volume"])
+        series_chart(d["volume"], TOKEN_AGG["volume"], chart_range, kind="area", cache_key=(token, "volume", seed, data_version()), key=f"{token}_volume")
 
     c4, c5, c6 = st.columns(3)
 
     with c4:
-        section_metric("Circulating Supply", f"{circ_last/1e6:,.1f}M", circ_chg)
-        st.plotly_chart(px.line(d["circ"], x="date", y="value"), use_container_width=True, key=f"{token}_circ")
+        section_metric("Circulating Supply", f"{circ_last/1e6:,.1f}M", circ_chg, stats["circ"])
+        series_chart(d["circ"], TOKEN_AGG["circ"], chart_range, cache_key=(token, "circ", seed, data_version()), key=f"{token}_circ")
 
     with c5:
-        section_metric("Token Burning", f"{burn_last:,.0f}", burn_chg)
-        st.plotly_chart(px.line(d["burn"], x="date", y="value"), use_container_width=True, key=f"{token}_burn")
+        section_metric("Token Burning", f"{burn_last:,.0f}", burn_chg, stats["burn"])
+        series_chart(d["burn"], TOKEN_AGG["burn"], chart_range, cache_key=(token, "burn", seed, data_version()), key=f"{token}_burn")
 
     with c6:
         st.markdown("**Unlock Alert (12M)**")
@@ -137,10 +210,11 @@ with tabs[0]:
 # =======================
 # Unlocks
 # =======================
-with tabs[1]:
+@st.fragment
+def unlocks():
     st.subheader("Token Unlocking Schedule (Next 12 Months)")
-    unlock_df2 = d["unlock"].copy()
-    unlock_df2["Alert (>2%)"] = unlock_df2["unlock_pct_of_circ"] > 2.0
+    # derived frame over the shared (read-only) schedule; never modify d[...] in place
+    unlock_df2 = d["unlock"].assign(**{"Alert (>2%)": d["unlock"]["unlock_pct_of_circ"] > 2.0})
 
     if has_unlock_alert:
         badge("Unlock alert: >2% months exist", color="red", tooltip=unlock_tip)
@@ -148,55 +222,49 @@ with tabs[1]:
         badge("No unlock alert", color="green", tooltip=unlock_tip)
 
     st.dataframe(unlock_df2, use_container_width=True, hide_index=True)
-    st.plotly_chart(px.bar(unlock_df2, x="date", y="unlock_pct_of_circ"), use_container_width=True, key=f"{token}_unlock_bar")
+    plot(bar_figure(unlock_df2, x="date", y="unlock_pct_of_circ"), key=f"{token}_unlock_bar")
 
 # =======================
 # Fundamentals
 # =======================
-with tabs[2]:
+@st.fragment
+def fundamentals():
     st.subheader("Fundamentals (mock)")
 
-    fees_last, fees_chg = last_and_30d_change(d["fund_fees"])
+    fees_last, fees_chg = stats["fund_fees"]["last"], stats["fund_fees"]["chg_30d"]
     ann_fees = fees_last * 365
 
-    tvl_df = ma_30(d["fund_tvl"])
-    tvl_last = float(tvl_df["value"].iloc[-1])
-    tvl_ma = float(tvl_df["ma30"].iloc[-1])
-    tvl_vs_ma = (tvl_last / tvl_ma - 1) * 100 if tvl_ma else 0.0
-
-    plat_df = ma_30(d["fund_platform_vol"])
-    plat_last = float(plat_df["value"].iloc[-1])
-    plat_ma = float(plat_df["ma30"].iloc[-1])
-    plat_vs_ma = (plat_last / plat_ma - 1) * 100 if plat_ma else 0.0
+    tvl_last, tvl_vs_ma = stats["fund_tvl"]["last"], vs_ma(stats["fund_tvl"])
+    plat_last, plat_vs_ma = stats["fund_platform_vol"]["last"], vs_ma(stats["fund_platform_vol"])
 
-    mau_last, mau_chg = last_and_30d_change(d["fund_mau"])
-    dau_last, dau_chg = last_and_30d_change(d["fund_dau"])
+    mau_last, mau_chg = stats["fund_mau"]["last"], stats["fund_mau"]["chg_30d"]
+    dau_last, dau_chg = stats["fund_dau"]["last"], stats["fund_dau"]["chg_30d"]
 
     k1, k2, k3 = st.columns(3)
     with k1:
-        section_metric("Revenues / Fees", f"${fees_last:,.0f}/day", fees_chg)
-        st.plotly_chart(px.line(d["fund_fees"], x="date", y="value"), use_container_width=True, key=f"{token}_fees")
+        section_metric("Revenues / Fees", f"${fees_last:,.0f}/day", fees_chg, stats["fund_fees"])
+        series_chart(d["fund_fees"], TOKEN_AGG["fund_fees"], chart_range, cache_key=(token, "fund_fees", seed, data_version()), key=f"{token}_fees")
 
     with k2:
         section_metric("Annualized Fees", f"${ann_fees/1e6:,.2f}M", fees_chg)
-        st.plotly_chart(px.line(d["fund_fees"], x="date", y="value"), use_container_width=True, key=f"{token}_ann_fees")
+        series_chart(d["fund_fees"], TOKEN_AGG["fund_fees"], chart_range, cache_key=(token, "fund_fees", seed, data_version()), key=f"{token}_ann_fees")
 
     with k3:
-        section_metric("TVL (vs MA30)", f"${tvl_last/1e9:,.2f}B", tvl_vs_ma)
-        st.plotly_chart(px.line(tvl_df, x="date", y="value"), use_container_width=True, key=f"{token}_tvl")
+        section_metric("TVL (vs MA30)", f"${tvl_last/1e9:,.2f}B", tvl_vs_ma, stats["fund_tvl"])
+        series_chart(d["fund_tvl"], TOKEN_AGG["fund_tvl"], chart_range, cache_key=(token, "fund_tvl", seed, data_version()), key=f"{token}_tvl")
 
     k4, k5, k6 = st.columns(3)
     with k4:
-        section_metric("Platform Trading Volume (vs MA30)", f"${plat_last/1e9:,.2f}B", plat_vs_ma)
-        st.plotly_chart(px.line(plat_df, x="date", y="value"), use_container_width=True, key=f"{token}_platform_vol")
+        section_metric("Platform Trading Volume (vs MA30)", f"${plat_last/1e9:,.2f}B", plat_vs_ma, stats["fund_platform_vol"])
+        series_chart(d["fund_platform_vol"], TOKEN_AGG["fund_platform_vol"], chart_range, cache_key=(token, "fund_platform_vol", seed, data_version()), key=f"{token}_platform_vol")
 
     with k5:
-        section_metric("MAU", f"{mau_last:,.0f}", mau_chg)
-        st.plotly_chart(px.line(d["fund_mau"], x="date", y="value"), use_container_width=True, key=f"{token}_mau")
+        section_metric("MAU", f"{mau_last:,.0f}", mau_chg, stats["fund_mau"])
+        series_chart(d["fund_mau"], TOKEN_AGG["fund_mau"], chart_range, cache_key=(token, "fund_mau", seed, data_version()), key=f"{token}_mau")
 
     with k6:
-        section_metric("DAU", f"{dau_last:,.0f}", dau_chg)
-        st.plotly_chart(px.line(d["fund_dau"], x="date", y="value"), use_container_width=True, key=f"{token}_dau")
+        section_metric("DAU", f"{dau_last:,.0f}", dau_chg, stats["fund_dau"])
+        series_chart(d["fund_dau"], TOKEN_AGG["fund_dau"], chart_range, cache_key=(token, "fund_dau", seed, data_version()), key=f"{token}_dau")
 
     st.markdown("### Market Share (mock)")
     if has_share_alert:
@@ -205,69 +273,58 @@ with tabs[2]:
         badge("Market share stable", color="green", tooltip=share_tip)
 
     st.markdown(f"Latest: **{share_last*100:.2f}%**  \n30D change: {colored_delta(share_chg)}")
-    st.plotly_chart(px.line(d["fund_share"], x="date", y="value"), use_container_width=True, key=f"{token}_market_share")
+    series_chart(d["fund_share"], TOKEN_AGG["fund_share"], chart_range, cache_key=(token, "fund_share", seed, data_version()), key=f"{token}_market_share")
 
 # =======================
 # Governance & News (new tab)
 # =======================
-with tabs[3]:
+@st.fragment
+def governance_news():
+    feed_page_size = st.selectbox("Rows per page", FEED_PAGE_SIZES, key="feed_page_size")
+
     st.subheader("Governance (mock)")
-    gov_df = get_mock_governance(token).copy()
-
-    # Ensure datetime formatting
-    if "start" in gov_df.columns:
-        gov_df["start"] = pd.to_datetime(gov_df["start"])
-    if "end" in gov_df.columns:
-        gov_df["end"] = pd.to_datetime(gov_df["end"])
-
-    # Highlight logic via badges
-    for _, row in gov_df.iterrows():
-        cols = st.columns([5, 2, 2, 2, 2])
-        with cols[0]:
-            st.markdown(f"**{row.get('title','')}**")
-        with cols[1]:
-            st.write(row.get("type", "-"))
-        with cols[2]:
-            status = row.get("status", "-")
-            impact = row.get("impact", "Low")
-            if status == "Active" and impact == "High":
-                badge("Active", color="red", tooltip="Active + High impact (mock)")
-            elif status == "Active":
-                badge("Active", color="blue", tooltip="Active (mock)")
-            elif status == "Passed":
-                badge("Passed", color="green", tooltip="Passed (mock)")
-            else:
-                badge(str(status), color="gray", tooltip="Mock")
-        with cols[3]:
-            st.write(impact)
-        with cols[4]:
-            s = row.get("start", None)
-            e = row.get("end", None)
-            if pd.notna(s) and pd.notna(e):
-                st.write(f"{s.date()} → {e.date()}")
-            else:
-                st.write("-")
+    with span("sync governance"):
+        gov = synced_feed("governance", token)
+    statuses = st.multiselect("Status", gov.categories(), key="gov_status")
+    gov_df = paginate(gov.query(statuses or None), feed_page_size, f"gov_page_{token}")
+    st.markdown(html_table(
+        ["Proposal", "Type", "Status", "Impact", "Dates"],
+        [
+            [
+                f"<b>{escape(str(r.title))}</b>",
+                escape(str(r.type)),
+                status_badge(r.status, r.impact),
+                escape(str(r.impact)),
+                f"{r.start.date()} → {r.end.date()}" if pd.notna(r.start) and pd.notna(r.end) else "-",
+            ]
+            for r in gov_df.itertuples(index=False)
+        ],
+    ), unsafe_allow_html=True)
 
     st.markdown("---")
     st.subheader("News (mock)")
-    news_df = get_mock_news(token).copy()
-    if "date" in news_df.columns:
-        news_df["date"] = pd.to_datetime(news_df["date"])
-
-    # Simple feed with badges
-    for _, row in news_df.sort_values("date", ascending=False).iterrows():
-        c1, c2, c3, c4 = st.columns([1.2, 6, 2, 2])
-        with c1:
-            st.write(row["date"].date().isoformat())
-        with c2:
-            st.markdown(f"**{row.get('headline','')}**")
-        with c3:
-            st.write(row.get("source", "-"))
-        with c4:
-            cat = row.get("category", "Other")
-            if cat in ["Security", "Regulation"]:
-                badge(cat, color="red", tooltip="Potential downside risk (mock)")
-            else:
-                badge(cat, color="gray", tooltip="Mock")
-
-st.caption("Mock data only. Next step: wire real governance/news sources (Snapshot, Tally, RSS, CryptoPanic).")
+    with span("sync news"):
+        news = synced_feed("news", token)
+    categories = st.multiselect("Category", news.categories(), key="news_category")
+    news_df = paginate(news.query(categories or None), feed_page_size, f"news_page_{token}")
+    st.markdown(html_table(
+        ["Date", "Headline", "Source", "Category"],
+        [
+            [
+                r.date.date().isoformat(),
+                f"<b>{escape(str(r.headline))}</b>",
+                escape(str(r.source)),
+                badge_html(r.category, *RISK_CATEGORIES.get(r.category, ("gray", "Mock"))),
+            ]
+            for r in news_df.itertuples(index=False)
+        ],
+    ), unsafe_allow_html=True)
+
+for tab, section in zip(tabs, [overview, unlocks, fundamentals, governance_news]):
+    if tab.open:
+        with tab, span(section.__name__):
+            section()
+
+st.caption("Mock data by default. Live governance/news (Snapshot, CryptoPanic) via DASHBOARD_LIVE_SOURCES; Tally and RSS next.")
+
+perf_panel(trace)
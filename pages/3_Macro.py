@@ -1,11 +1,36 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 
-from utils.fake_data import make_series
-from utils.ui import kpi_row, section_header, divider
+from utils.cache import DATASETS, cached_macro, data_version
+from utils.charts import cached_figure, heatmap_figure, plot, range_selector, series_chart, time_figure
+from utils.fake_data import MACRO_SERIES
+from utils.rollups import MACRO_KIND_AGG
+from utils.rolling import last_and_change, rolling_corr
+from utils.scheduler import ensure_scheduler, store_status
+from utils.startup import ensure_warmup, warmup_status
+from utils.perf import span
+from utils.ui import kpi_row, section_header, divider, data_status, perf_begin, perf_panel, warmup_notice
 
 st.set_page_config(page_title="Macro", layout="wide")
+trace = perf_begin("Macro")
+
+# label and value format per MACRO_SERIES entry
+KPI_FORMATS = [
+    ("M2", "{:,.0f}"),
+    ("Stablecoin Supply", "{:,.0f}"),
+    ("Spot Vol", "{:,.0f}"),
+    ("Perp Vol", "{:,.0f}"),
+    ("BTC MVRV", "{:.2f}"),
+    ("Fear & Greed", "{:.0f}"),
+]
+CHANGE_LABELS = {"W": "WoW", "D": "DoD"}
+CORR_WINDOWS = {"12W": 12, "26W": 26, "52W": 52}
+
+# snapshots refresh in the background; show how fresh the served data is
+ensure_scheduler()
+ensure_warmup()
+with st.sidebar:
+    data_status(store_status())
+    warmup_notice(warmup_status())
 
 st.title("🌍 Macro Dashboard")
 st.caption("DefiLlama-style layout (mock data for team discussion).")
@@ -13,82 +38,109 @@ st.caption("DefiLlama-style layout (mock data for team discussion).")
 st.sidebar.header("Controls")
 show_raw = st.sidebar.checkbox("Show data table", value=False)
 seed = st.sidebar.number_input("Mock seed", min_value=1, max_value=9999, value=42, step=1)
+with st.sidebar:
+    chart_range = range_selector(options=("3M", "6M", "1Y", "3Y", "All"), default="All", key="macro_range")
+
+with span("load panel"):
+    panel = cached_macro(MACRO_SERIES, seed=seed)
+m2, stable, spot, perp, mvrv, fg = (panel[name] for name, *_ in MACRO_SERIES)
 
-m2 = make_series("M2", years=3, freq="W", kind="level", seed=seed)
-stable = make_series("Stablecoin Supplies", years=3, freq="W", kind="level", seed=seed)
-spot = make_series("Spot Trading Volume", years=3, freq="W", kind="volume", seed=seed)
-perp = make_series("Perp Trading Volume", years=3, freq="W", kind="volume", seed=seed)
-mvrv = make_series("BTC MVRV", years=3, freq="W", kind="ratio", seed=seed)
-fg = make_series("Fear & Greed", years=1, freq="D", kind="index", seed=seed)
-
-def last_and_change(df: pd.DataFrame):
-    v = df["value"].iloc[-1]
-    prev = df["value"].iloc[-2] if len(df) > 1 else v
-    chg = (v / prev - 1) * 100 if prev != 0 else 0
-    return v, chg
-
-m2_last, m2_chg = last_and_change(m2)
-st_last, st_chg = last_and_change(stable)
-spot_last, spot_chg = last_and_change(spot)
-perp_last, perp_chg = last_and_change(perp)
-mvrv_last, mvrv_chg = last_and_change(mvrv)
-fg_last, fg_chg = last_and_change(fg)
+# latest value and period-over-period change for every series, one batched call per frequency
+kpis = {}
+for freq in panel.freqs():
+    last, chg = last_and_change(panel.blocks[freq][1], periods=1)
+    kpis.update(zip(panel.names(freq), zip(last, chg)))
 
 kpi_row([
-    ("M2 (mock)", f"{m2_last:,.0f}", f"{m2_chg:+.2f}% WoW"),
-    ("Stablecoin Supply (mock)", f"{st_last:,.0f}", f"{st_chg:+.2f}% WoW"),
-    ("Spot Vol (mock)", f"{spot_last:,.0f}", f"{spot_chg:+.2f}% WoW"),
-    ("Perp Vol (mock)", f"{perp_last:,.0f}", f"{perp_chg:+.2f}% WoW"),
-    ("BTC MVRV (mock)", f"{mvrv_last:.2f}", f"{mvrv_chg:+.2f}% WoW"),
-    ("Fear & Greed (mock)", f"{fg_last:.0f}", f"{fg_chg:+.2f}% DoD"),
+    (f"{label} (mock)", fmt.format(kpis[name][0]), f"{kpis[name][1]:+.2f}% {CHANGE_LABELS[freq]}")
+    for (name, _, freq, _), (label, fmt) in zip(MACRO_SERIES, KPI_FORMATS)
 ])
 
 divider()
 
-tabs = st.tabs(["Liquidity", "Market Activity", "Valuation", "Sentiment"])
+# only the open tab's section runs (see pages/2_Tokens.py)
+tabs = st.tabs(["Liquidity", "Market Activity", "Valuation", "Sentiment", "Correlation"], key="macro_tab", on_change="rerun")
 
-with tabs[0]:
+@st.fragment
+def liquidity():
     section_header("Liquidity", "3Y • Weekly • Mock")
     c1, c2 = st.columns(2)
     with c1:
         st.subheader("M2")
-        st.plotly_chart(px.line(m2, x="date", y="value"), use_container_width=True)
+        series_chart(m2, MACRO_KIND_AGG["level"], chart_range, cache_key=("M2", seed, data_version()))
         if show_raw:
             st.dataframe(m2, use_container_width=True)
     with c2:
         st.subheader("Stablecoin Supplies")
-        st.plotly_chart(px.line(stable, x="date", y="value"), use_container_width=True)
+        series_chart(stable, MACRO_KIND_AGG["level"], chart_range, cache_key=("Stablecoin Supplies", seed, data_version()))
         if show_raw:
             st.dataframe(stable, use_container_width=True)
 
-with tabs[1]:
+@st.fragment
+def market_activity():
     section_header("Market Activity", "3Y • Weekly • Mock")
     c1, c2 = st.columns(2)
     with c1:
         st.subheader("Spot Trading Volume")
-        st.plotly_chart(px.area(spot, x="date", y="value"), use_container_width=True)
+        series_chart(spot, MACRO_KIND_AGG["volume"], chart_range, kind="area", cache_key=("Spot Trading Volume", seed, data_version()))
         if show_raw:
             st.dataframe(spot, use_container_width=True)
     with c2:
         st.subheader("Perp Trading Volume")
-        st.plotly_chart(px.area(perp, x="date", y="value"), use_container_width=True)
+        series_chart(perp, MACRO_KIND_AGG["volume"], chart_range, kind="area", cache_key=("Perp Trading Volume", seed, data_version()))
         if show_raw:
             st.dataframe(perp, use_container_width=True)
 
-with tabs[2]:
+@st.fragment
+def valuation():
     section_header("Valuation", "3Y • Weekly • Mock")
     st.subheader("BTC MVRV")
-    st.plotly_chart(px.line(mvrv, x="date", y="value"), use_container_width=True)
+    series_chart(mvrv, MACRO_KIND_AGG["ratio"], chart_range, cache_key=("BTC MVRV", seed, data_version()))
     if show_raw:
         st.dataframe(mvrv, use_container_width=True)
 
-with tabs[3]:
+@st.fragment
+def sentiment():
     section_header("Sentiment", "1Y • Daily • Mock")
     st.subheader("Fear & Greed Index")
-    st.plotly_chart(px.line(fg, x="date", y="value"), use_container_width=True)
+    series_chart(fg, MACRO_KIND_AGG["index"], chart_range, cache_key=("Fear & Greed", seed, data_version()))
     st.caption("Scale: 0 (Extreme Fear) → 100 (Extreme Greed).")
     if show_raw:
         st.dataframe(fg, use_container_width=True)
 
+@st.fragment
+def correlation():
+    section_header("Correlation", "Rolling correlation of weekly log returns • Mock")
+    names = panel.names("W")
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        window_label = st.segmented_control("Window", list(CORR_WINDOWS), default="26W", key="corr_window") or "26W"
+    window = CORR_WINDOWS[window_label]
+    # every pair over the whole history in one pass, shared across sessions
+    corr = DATASETS.get_or_compute(("macro_corr", seed, data_version(), window), lambda: rolling_corr(panel.blocks["W"][1], window))
+    dates = panel.blocks["W"][0]
+
+    with c1:
+        st.subheader(f"Latest ({window_label})")
+        plot(cached_figure(("corr_heatmap", seed, data_version(), window), lambda: heatmap_figure(corr[..., -1], names)))
+    with c2:
+        pair = st.multiselect("Pair", names, default=names[:2], max_selections=2, key="corr_pair")
+        if len(pair) == 2:
+            i, j = names.index(pair[0]), names.index(pair[1])
+            st.subheader(f"{pair[0]} vs {pair[1]}")
+            plot(cached_figure(
+                ("corr_pair", seed, data_version(), window, i, j),
+                lambda: time_figure(dates[window:], corr[i, j, window:]),
+            ))
+        else:
+            st.caption("Pick two series to chart their rolling correlation.")
+
+for tab, section in zip(tabs, [liquidity, market_activity, valuation, sentiment, correlation]):
+    if tab.open:
+        with tab, span(section.__name__):
+            section()
+
 divider()
 st.caption("Replace mock data sources later; this is for layout discussion.")
+
+perf_panel(trace)
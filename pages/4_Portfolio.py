@@ -0,0 +1,108 @@
+import streamlit as st
+
+from utils.cache import cached_portfolio, data_version
+from utils.charts import bar_figure, cached_figure, heatmap_figure, plot, range_selector, series_chart
+from utils.hashing import stable_key
+from utils.scheduler import ensure_scheduler, store_status
+from utils.startup import ensure_warmup, warmup_status
+from utils.tokens_mock import TOKENS_DEFAULT, token_universe
+from utils.perf import span
+from utils.ui import kpi_row, section_header, divider, data_status, perf_begin, perf_panel, warmup_notice
+
+st.set_page_config(page_title="Portfolio", layout="wide")
+trace = perf_begin("Portfolio")
+
+HEATMAP_MAX = 20   # largest positions shown in the correlation heatmap
+
+# snapshots refresh in the background; show how fresh the served data is
+ensure_scheduler()
+ensure_warmup()
+with st.sidebar:
+    data_status(store_status())
+    warmup_notice(warmup_status())
+
+st.title("💼 Portfolio")
+st.caption("Every mock position held at constant quantity over the token history.")
+
+st.sidebar.header("Controls")
+seed = st.sidebar.number_input("Mock seed", min_value=1, max_value=9999, value=42, step=1)
+universe = st.sidebar.selectbox("Positions", [len(TOKENS_DEFAULT), 100, 500])
+with st.sidebar:
+    chart_range = range_selector(key="portfolio_range")
+
+tokens = None if universe == len(TOKENS_DEFAULT) else token_universe(universe)
+with span("load portfolio"):
+    pf = cached_portfolio(tokens, seed)
+frames = pf["frames"]
+table = pf["table"]
+chart_key = (stable_key(*pf["tokens"]), seed, data_version())
+
+kpi_row([
+    ("Value", f"${pf['value'][-1]:,.0f}", None),
+    ("PnL", f"${pf['pnl'][-1]:,.0f}", f"{pf['pnl_pct']:+.2f}%"),
+    ("Vol (ann.)", f"{pf['vol']:.1f}%", None),
+    (f"VaR {pf['level']:.0%} (1D)", f"${pf['var_abs']:,.0f}", f"-{pf['var']:.2f}%"),
+    (f"ES {pf['level']:.0%} (1D)", f"{pf['es']:.2f}%", None),
+    ("Max drawdown", f"{pf['max_drawdown']:.1f}%", None),
+])
+
+divider()
+
+# only the open tab's section runs (see pages/2_Tokens.py)
+tabs = st.tabs(["Value & PnL", "Risk", "Positions"], key="portfolio_tab", on_change="rerun")
+
+@st.fragment
+def value_pnl():
+    c1, c2 = st.columns(2)
+    with c1:
+        st.subheader("Portfolio value")
+        series_chart(frames["value"], "last", chart_range, cache_key=("portfolio_value", *chart_key))
+    with c2:
+        st.subheader("PnL vs cost")
+        series_chart(frames["pnl"], "last", chart_range, cache_key=("portfolio_pnl", *chart_key))
+    st.subheader("Drawdown (%)")
+    series_chart(frames["drawdown"], "last", chart_range, kind="area", cache_key=("portfolio_dd", *chart_key))
+
+@st.fragment
+def risk():
+    section_header("Risk", "Daily log returns • annualized • Mock")
+    c1, c2 = st.columns(2)
+    with c1:
+        st.subheader("Rolling vol 30D (%)")
+        series_chart(frames["rolling_vol"], "last", chart_range, cache_key=("portfolio_vol", *chart_key))
+    with c2:
+        st.subheader("Contribution to risk (%)")
+        top = table.head(HEATMAP_MAX)
+        plot(cached_figure(("portfolio_risk", *chart_key), lambda: bar_figure(top, "Token", "Risk share (%)")))
+
+    st.subheader(f"Correlation (largest {min(HEATMAP_MAX, len(table))} positions)")
+    def build():
+        # largest weights first; rows of corr follow pf["tokens"]
+        order = pf["weights"].argsort()[::-1][:HEATMAP_MAX]
+        return heatmap_figure(pf["corr"][order][:, order], [pf["tokens"][i] for i in order])
+    plot(cached_figure(("portfolio_corr", *chart_key), build))
+
+@st.fragment
+def positions():
+    st.dataframe(
+        table,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Value": st.column_config.NumberColumn("Value", format="$%,.0f"),
+            "PnL": st.column_config.NumberColumn("PnL", format="$%,.0f"),
+            "Weight (%)": st.column_config.NumberColumn("Weight (%)", format="%.2f%%"),
+            "PnL (%)": st.column_config.NumberColumn("PnL (%)", format="%+.2f%%"),
+            "Risk share (%)": st.column_config.NumberColumn("Risk share (%)", format="%.2f%%"),
+        },
+    )
+
+for tab, section in zip(tabs, [value_pnl, risk, positions]):
+    if tab.open:
+        with tab, span(section.__name__):
+            section()
+
+divider()
+st.caption("Positions are mock: quantities and cost bases come from the token generator.")
+
+perf_panel(trace)
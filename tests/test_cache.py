@@ -0,0 +1,167 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import cache
+from utils.cache import DatasetCache
+
+def _block(n_bytes: int) -> np.ndarray:
+    return np.zeros(n_bytes // 8)
+
+def test_lru_evicts_least_recently_used():
+    c = DatasetCache(max_bytes=2000)
+    c.put("a", _block(800))
+    c.put("b", _block(800))
+    c.get("a")                  # a is now most recent
+    c.put("c", _block(800))
+    assert c.get("b") is None
+    assert c.get("a") is not None and c.get("c") is not None
+    assert c.evictions == 1
+
+def test_byte_budget():
+    c = DatasetCache(max_bytes=4000)
+    for i in range(10):
+        c.put(i, _block(1000))
+    stats = c.stats()
+    assert stats["bytes"] <= 4000
+    assert stats["entries"] == 4
+
+def test_ttl_expiry(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    c = DatasetCache(max_bytes=10_000, ttl=60)
+    c.put("k", _block(80))
+    now[0] += 59
+    assert c.get("k") is not None
+    now[0] += 2
+    assert c.get("k") is None
+
+def test_expires_at_next_midnight():
+    c = DatasetCache(max_bytes=10_000)
+    noon = pd.Timestamp("2024-03-01 12:00").timestamp()
+    assert c._expires_at(noon) == pd.Timestamp("2024-03-02").timestamp()
+
+def test_get_or_compute_computes_once_under_concurrency():
+    c = DatasetCache(max_bytes=10_000)
+    calls = []
+    gate = threading.Event()
+
+    def compute():
+        calls.append(1)
+        gate.wait(1)
+        return _block(80)
+
+    threads = [threading.Thread(target=c.get_or_compute, args=("k", compute)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+
+def test_readonly_values_reject_in_place_writes():
+    c = DatasetCache(max_bytes=1 << 20, readonly=True)
+    df = c.put("k", pd.DataFrame({"Token": ["A", "B"], "x": [1.0, 2.0]}))
+    with pytest.raises(ValueError):
+        df.iloc[0, 1] = 9.0
+    with pytest.raises(ValueError):
+        df.loc[0, "Token"] = "Z"
+    assert c.get("k")["x"].tolist() == [1.0, 2.0]
+
+def test_readonly_mutation_is_dropped_and_recomputed():
+    c = DatasetCache(max_bytes=1 << 20, readonly=True)
+    make = lambda: pd.DataFrame({"x": [1.0, 2.0]})
+    df = c.get_or_compute("k", make)
+    df["extra"] = 1             # structural change the read-only arrays can't stop
+    fresh = c.get_or_compute("k", make)   # no exception for the next reader
+    assert "extra" not in fresh.columns
+    assert c.mutations == 1
+
+def test_token_positions_are_read_only_and_pickle():
+    import pickle
+
+    from utils.tokens_mock import generate_token_dataset
+
+    _, details = generate_token_dataset(["AAVE", "LDO"], seed=1)
+    d = details["AAVE"]
+    with pytest.raises(TypeError):
+        d["position"]["qty"] = 0.0
+    restored = pickle.loads(pickle.dumps(details))["AAVE"]
+    assert dict(restored["position"]) == dict(d["position"])
+    assert not restored.values.flags.writeable
+
+def test_snapshot_dataset_is_shared_read_only(tmp_path, monkeypatch):
+    from utils.snapshot import write_snapshot
+
+    write_snapshot(str(tmp_path), tokens=["AAVE", "LDO", "ENA"], seed=42)
+    monkeypatch.setenv("DASHBOARD_SNAPSHOT_DIR", str(tmp_path))
+    summary, details = cache.cached_token_dataset(["AAVE", "LDO", "ENA"], seed=42)
+    with pytest.raises(ValueError):
+        summary.iloc[0, 1] = 999.0
+    with pytest.raises(TypeError):
+        details["AAVE"]["position"]["qty"] = 0.0
+    again, _ = cache.cached_token_dataset(["AAVE", "LDO", "ENA"], seed=42)
+    assert again is summary
+
+def test_snapshot_details_build_each_token_once_across_threads(tmp_path):
+    from utils.snapshot import Snapshot, write_snapshot
+
+    write_snapshot(str(tmp_path), tokens=["AAVE", "LDO"], seed=42)
+    _, details = Snapshot(str(tmp_path)).token_dataset()
+    barrier = threading.Barrier(8)
+    got = []
+
+    def read():
+        barrier.wait()
+        got.append(details["LDO"])
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(d is got[0] for d in got)
+    assert details.nbytes == int(got[0].unlock.memory_usage().sum())
+
+def test_data_version_follows_the_published_snapshot(tmp_path, monkeypatch):
+    from utils.snapshot import publish, write_snapshot
+
+    monkeypatch.delenv("DASHBOARD_SNAPSHOT_DIR", raising=False)
+    assert cache.data_version() == (cache.as_of(), None)
+    monkeypatch.setenv("DASHBOARD_SNAPSHOT_DIR", str(tmp_path))
+    versions = []
+    for name in ("v1", "v2"):
+        write_snapshot(str(tmp_path / name), tokens=["AAVE", "LDO"], seed=42)
+        publish(str(tmp_path), name)
+        versions.append(cache.data_version())
+    assert versions[0][1] == str(tmp_path / "v1")
+    assert versions[1][1] == str(tmp_path / "v2")
+
+def test_disk_entry_that_fails_to_load_is_dropped_and_recomputed(tmp_path):
+    disk = cache.DiskCache(str(tmp_path / "disk"), 10_000)
+    c = DatasetCache(max_bytes=10_000, disk=disk)
+    assert c.get_or_compute(("k",), lambda: 1) == 1
+    (entry,) = list((tmp_path / "disk").glob("*.pkl"))
+    entry.write_bytes(b"\x80\x05garbage")
+    c.clear()
+    assert c.get_or_compute(("k",), lambda: 2) == 2
+    assert disk.get(entry.stem) == 2      # rewritten by the recompute
+
+def test_disk_keys_carry_the_version(tmp_path):
+    path = str(tmp_path / "disk")
+    old = DatasetCache(max_bytes=10_000, disk=cache.DiskCache(path, 10_000, version="old"))
+    new = DatasetCache(max_bytes=10_000, disk=cache.DiskCache(path, 10_000, version="new"))
+    old.get_or_compute(("k",), lambda: "from old code")
+    assert new.get_or_compute(("k",), lambda: "recomputed") == "recomputed"
+
+def test_disk_cache_refuses_shared_directories(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    with pytest.raises(PermissionError):
+        cache.DiskCache(str(shared), 10_000)
+    private = tmp_path / "private"
+    cache.DiskCache(str(private), 10_000)
+    assert private.stat().st_mode & 0o777 == 0o700
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from utils.charts import PIXEL_WIDTH, WEBGL_THRESHOLD, series_view, time_figure
+from utils.rollups import MAX_POINTS
+
+def _daily(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"date": pd.date_range("2015-01-01", periods=n, freq="D"),
+                         "value": 100 + rng.standard_normal(n).cumsum()})
+
+def test_budgets_are_ordered():
+    assert PIXEL_WIDTH < WEBGL_THRESHOLD < MAX_POINTS
+
+def test_long_view_is_downsampled_and_drawn_with_webgl():
+    n = (WEBGL_THRESHOLD + MAX_POINTS) // 2
+    df = _daily(n)
+    view = series_view(df, "last", "All")
+    assert len(view) == n               # still daily: the rollup budget fits it
+    for method in ("lttb", "minmax"):
+        trace = time_figure(view["date"].to_numpy(), view["value"].to_numpy(), method=method).data[0]
+        assert trace.type == "scattergl"
+        assert len(trace.y) <= PIXEL_WIDTH + 2   # minmax keeps both ends
+
+def test_short_view_is_drawn_as_is():
+    df = _daily(365)
+    view = series_view(df, "last", "All")
+    trace = time_figure(view["date"].to_numpy(), view["value"].to_numpy()).data[0]
+    assert trace.type == "scatter"
+    assert len(trace.y) == 365
+
+def test_views_past_the_budget_roll_up():
+    df = _daily(MAX_POINTS + 500)
+    view = series_view(df, "last", "All")
+    assert len(view) <= MAX_POINTS
+    # weekly, the trailing (partial) week dated at its last day
+    assert (view["date"].diff().iloc[1:-1] == pd.Timedelta(days=7)).all()
+    assert view["date"].iloc[-1] == df["date"].iloc[-1]
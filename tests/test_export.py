@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import pytest
+
+from utils.alerts import DEFAULT_RULES, evaluate, lookback
+from utils.export import MIN_DAYS, export
+from utils.fake_data import MACRO_SERIES
+from utils.snapshot import MANIFEST
+from utils.tokens_mock import METRICS, generate_token_arrays
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOKENS = ["AAVE", "LDO", "ENA", "AAVE"]     # AAVE twice, in different batches
+DAYS = MIN_DAYS + 30
+
+def _read(path):
+    return (pq.read_table if path.endswith(".parquet") else pacsv.read_csv)(path)
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_export_writes_every_table(tmp_path, fmt):
+    manifest = export(str(tmp_path), TOKENS, seed=3, days=DAYS, fmt=fmt, workers=0, batch_size=3)
+    with open(tmp_path / MANIFEST) as f:
+        assert json.load(f) == manifest
+
+    n_days = DAYS + 1
+    expected = {
+        "details": len(TOKENS) * n_days,
+        "stats": len(TOKENS) * len(METRICS),
+        "positions": len(TOKENS),
+        "summary": len(TOKENS),
+    }
+    for name, rows in expected.items():
+        assert manifest["rows"][name] == rows
+        assert _read(str(tmp_path / f"{name}.{fmt}")).num_rows == rows
+    assert manifest["rows"]["macro"] == _read(str(tmp_path / f"macro.{fmt}")).num_rows
+    assert set(_read(str(tmp_path / f"macro.{fmt}")).column("series").to_pylist()) == {s[0] for s in MACRO_SERIES}
+
+    summary = _read(str(tmp_path / f"summary.{fmt}")).to_pandas()
+    assert list(summary.columns) == ["Token", "Price (30D %)", "FDV (30D %)", "Volume 24H (30D %)",
+                                     "Next Unlock (>2%)", "Alerts"]
+    assert sorted(summary["Token"]) == sorted(TOKENS)
+
+def test_summary_alerts_follow_their_rows(tmp_path):
+    export(str(tmp_path), TOKENS, seed=3, days=DAYS, workers=0, batch_size=3)
+    summary = pq.read_table(tmp_path / "summary.parquet").to_pandas()
+    arrays = generate_token_arrays(TOKENS, seed=3, days=DAYS)
+    labels = evaluate(DEFAULT_RULES, arrays["values"][..., -lookback(DEFAULT_RULES):], METRICS,
+                      arrays["unlock_pct"], tokens=TOKENS).labels(TOKENS)
+    expected = dict(zip(TOKENS, labels))        # same token, same seed: same rows
+    for token, alerts in zip(summary["Token"], summary["Alerts"].fillna("")):
+        assert alerts == expected[token]
+
+def test_html_report(tmp_path):
+    manifest = export(str(tmp_path), ["AAVE"], seed=3, days=DAYS, workers=0, html_reports=True)
+    assert manifest["html"]
+    assert sorted(os.listdir(tmp_path / "html")) == ["AAVE.html", "plotly.min.js"]
+    page = (tmp_path / "html" / "AAVE.html").read_text()
+    assert "<h1>AAVE</h1>" in page and page.count("plotly-graph-div") == len(METRICS) + 1
+
+def test_reports_do_not_load_streamlit():
+    code = ("import sys, tempfile; from utils.export import export; "
+            "export(tempfile.mkdtemp(), ['AAVE'], days=%d, workers=0, html_reports=True); "
+            "sys.exit('streamlit' in sys.modules)" % DAYS)
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT).returncode == 0
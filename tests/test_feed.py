@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pandas as pd
+
+from utils import feed as feed_module
+from utils.feed import CURSOR_OVERLAP, Feed, FeedStore
+
+NOW = pd.Timestamp("2024-06-10 12:00")
+
+def _news(*rows):
+    return pd.DataFrame(
+        [{"id": i, "date": pd.Timestamp(d), "headline": h, "source": "Wire", "category": c} for i, d, h, c in rows],
+        columns=["id", "date", "headline", "source", "category"],
+    )
+
+def test_merge_dedupes_by_id_and_keeps_latest():
+    feed = Feed("news", "AAVE")
+    assert feed.merge(_news((1, "2024-06-01", "a", "Listing"), (2, "2024-06-03", "b", "Hack")), now=NOW) == 2
+    assert feed.merge(_news((2, "2024-06-03", "b (updated)", "Hack"), (3, "2024-06-05", "c", "Listing")), now=NOW) == 1
+    assert list(feed.items["headline"]) == ["a", "b (updated)", "c"]
+    assert list(feed.query()["id"]) == ["3", "2", "1"]    # newest first
+
+def test_missing_ids_fall_back_to_a_stable_digest():
+    feed = Feed("news", "AAVE")
+    rows = _news((None, "2024-06-01", "a", "Listing"))
+    feed.merge(rows, now=NOW)
+    assert feed.merge(rows, now=NOW) == 0
+    assert len(feed.items) == 1
+
+def test_query_filters_categories_and_dates():
+    feed = Feed("news", "AAVE")
+    feed.merge(_news((1, "2024-06-01", "a", "Listing"), (2, "2024-06-03", "b", "Hack"),
+                     (3, "2024-06-05", "c", "Listing")), now=NOW)
+    assert feed.categories() == ["Hack", "Listing"]
+    assert list(feed.query(["Listing"])["id"]) == ["3", "1"]
+    assert list(feed.query(since="2024-06-02", until="2024-06-04")["id"]) == ["2"]
+    assert feed.query(["Unknown"]).empty
+
+def test_cursor_is_newest_item_less_overlap():
+    feed = Feed("news", "AAVE")
+    feed.merge(_news((1, "2024-06-01", "a", "Listing"), (2, "2024-06-03 09:00", "b", "Hack")), now=NOW)
+    assert feed.cursor == pd.Timestamp("2024-06-03 09:00") - CURSOR_OVERLAP
+    feed.merge(_news(), now=NOW)                 # nothing new: the cursor stays
+    assert feed.cursor == pd.Timestamp("2024-06-03 09:00") - CURSOR_OVERLAP
+
+def test_governance_cursor_is_capped_at_now():
+    # open proposals end in the future and can still change until then
+    feed = Feed("governance", "AAVE")
+    feed.merge(pd.DataFrame([{"id": "p1", "title": "t", "type": "Snapshot", "status": "Active",
+                              "start": pd.Timestamp("2024-06-08"), "end": pd.Timestamp("2024-06-20"), "impact": "-"}]),
+               now=NOW)
+    assert feed.cursor == NOW - CURSOR_OVERLAP
+
+def test_concurrent_syncs_of_one_feed_fetch_once(monkeypatch):
+    calls = []
+
+    def slow_fetch(kind, token, since):
+        calls.append(since)
+        time.sleep(0.05)
+        return _news((1, "2024-06-01", "a", "Listing"))
+
+    monkeypatch.setattr(feed_module, "fetch_since", slow_fetch)
+    store = FeedStore(ttl=3600, max_feeds=2)
+    threads = [threading.Thread(target=store.sync, args=("news", "AAVE")) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert store._entry("news", "AAVE")[1] is store._entry("news", "AAVE")[1]
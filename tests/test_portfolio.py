@@ -0,0 +1,57 @@
+import numpy as np
+
+from utils.portfolio import (
+    covariance,
+    drawdown,
+    historical_var,
+    portfolio_analytics,
+    portfolio_value,
+    risk_contribution,
+)
+from utils.rolling import PERIODS_PER_YEAR
+
+def _prices(n_tokens: int = 5, n: int = 500, seed: int = 0) -> np.ndarray:
+    r = np.random.default_rng(seed)
+    return 50 * np.exp(np.cumsum(r.normal(0, 0.02, (n_tokens, n)), axis=-1))
+
+def test_portfolio_value_is_the_sum_of_positions():
+    prices = _prices()
+    qty = np.array([1.0, 2.0, 0.5, 10.0, 3.0])
+    np.testing.assert_allclose(portfolio_value(qty, prices), (qty[:, None] * prices).sum(axis=0), rtol=1e-13)
+
+def test_covariance_matches_numpy():
+    returns = np.diff(np.log(_prices()), axis=-1)
+    np.testing.assert_allclose(covariance(returns), np.cov(returns) * PERIODS_PER_YEAR, rtol=1e-12)
+
+def test_risk_contributions_sum_to_one():
+    returns = np.diff(np.log(_prices()), axis=-1)
+    cov = covariance(returns)
+    weights = np.array([0.1, 0.3, 0.2, 0.25, 0.15])
+    contrib, vol = risk_contribution(weights, cov)
+    assert np.isclose(contrib.sum(), 1.0)
+    assert np.isclose(vol, np.sqrt(weights @ cov @ weights))
+    contrib, vol = risk_contribution(np.zeros(5), cov)
+    assert not contrib.any() and vol == 0.0
+
+def test_historical_var_and_expected_shortfall():
+    returns = np.linspace(-0.10, 0.09, 20)            # -10%, -9%, ..., +9%
+    var, es = historical_var(returns, 0.90)
+    cutoff = np.quantile(returns, 0.10)
+    assert np.isclose(var, -cutoff)
+    assert np.isclose(es, -returns[returns <= cutoff].mean())
+    assert es >= var
+    assert historical_var(np.array([])) == (0.0, 0.0)
+
+def test_drawdown_from_the_running_peak():
+    value = np.array([100.0, 110.0, 99.0, 121.0, 60.5])
+    np.testing.assert_allclose(drawdown(value), [0.0, 0.0, -0.1, 0.0, -0.5])
+
+def test_analytics_tie_together():
+    prices = _prices()
+    qty = np.array([1.0, 2.0, 0.5, 10.0, 3.0])
+    out = portfolio_analytics(prices, {"qty": qty, "cost_value": qty * prices[:, 0]})
+    value = portfolio_value(qty, prices)
+    np.testing.assert_allclose(out["weights"].sum(), 1.0)
+    np.testing.assert_allclose(out["pnl"], value - (qty * prices[:, 0]).sum())
+    assert np.isclose(out["max_drawdown"], drawdown(value).min() * 100)
+    np.testing.assert_allclose(np.diag(out["corr"]), 1.0)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from utils.rolling import (
+    PERIODS_PER_YEAR,
+    latest_stats,
+    pct_change,
+    rolling_corr,
+    rolling_stats,
+    rolling_vol,
+)
+
+def _paths(n_series: int = 4, n: int = 400, seed: int = 0) -> np.ndarray:
+    r = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(r.normal(0, 0.03, (n_series, n)), axis=-1))
+
+def _pandas_vol(s: pd.Series, window: int) -> pd.Series:
+    return np.log(s).diff().rolling(window).std() * np.sqrt(PERIODS_PER_YEAR) * 100
+
+def test_pct_change_matches_pandas():
+    values = _paths()
+    for p in (1, 7, 30):
+        expected = pd.DataFrame(values.T).pct_change(p).iloc[-1].to_numpy() * 100
+        np.testing.assert_allclose(pct_change(values, p), expected, rtol=1e-13)
+
+def test_pct_change_on_short_history_and_zero_base():
+    assert (pct_change(_paths(n=10), 30) == 0).all()
+    assert pct_change(np.array([0.0, 5.0, 7.0]), 2) == 0
+
+def test_rolling_stats_match_pandas():
+    values = _paths()
+    stats = rolling_stats(values)
+    for i, row in enumerate(values):
+        s = pd.Series(row)
+        for w in (7, 30, 90):
+            np.testing.assert_allclose(stats[f"ma{w}"][i], s.rolling(w).mean(), rtol=1e-13)
+            assert np.isnan(stats[f"ma{w}"][i, :w - 1]).all() and not np.isnan(stats[f"ma{w}"][i, w - 1:]).any()
+        np.testing.assert_allclose(stats["ewma"][i], s.ewm(span=30, adjust=False).mean(), rtol=1e-13)
+        np.testing.assert_allclose(stats["vol30"][i], _pandas_vol(s, 30), rtol=1e-13)
+        assert np.isnan(stats["vol30"][i, :30]).all() and not np.isnan(stats["vol30"][i, 30:]).any()
+
+def test_latest_stats_match_the_full_series():
+    values = _paths()
+    full, last = rolling_stats(values), latest_stats(values)
+    for key in ("ma7", "ma30", "ma90", "ewma"):
+        np.testing.assert_allclose(last[key], full[key][:, -1], rtol=1e-13)
+    np.testing.assert_allclose(last["vol30"], full["vol30"][:, -1], rtol=1e-13)
+    np.testing.assert_allclose(last["chg_30d"], pct_change(values, 30))
+
+def test_latest_stats_on_short_history_are_nan():
+    last = latest_stats(_paths(n=20))
+    assert np.isnan(last["ma30"]).all() and np.isnan(last["vol30"]).all()
+    assert (last["chg_30d"] == 0).all()
+
+def test_rolling_vol_window():
+    values = _paths(1, 120)[0]
+    np.testing.assert_allclose(rolling_vol(values, 10), _pandas_vol(pd.Series(values), 10), rtol=1e-13)
+
+def test_rolling_corr_matches_pandas():
+    values = _paths(3, 300)
+    corr = rolling_corr(values, 30)
+    returns = np.log(pd.DataFrame(values.T)).diff()
+    for a in range(3):
+        for b in range(3):
+            expected = returns[a].rolling(30).corr(returns[b])
+            np.testing.assert_allclose(corr[a, b], expected, rtol=1e-13, atol=1e-12)
+    assert np.isnan(corr[..., :30]).all() and not np.isnan(corr[..., 30:]).any()
+
+def test_rolling_corr_waits_for_a_full_window_of_padded_series():
+    values = _paths(2, 200)
+    values[1, :50] = np.nan                   # listed 50 days later
+    corr = rolling_corr(values, 30)
+    returns = np.log(pd.DataFrame(values.T)).diff()
+    expected = returns[0].rolling(30).corr(returns[1])
+    assert np.isnan(corr[0, 1, :80]).all() and not np.isnan(corr[0, 1, 80:]).any()
+    np.testing.assert_allclose(corr[0, 1], expected, rtol=1e-13, atol=1e-12)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from utils.rollups import MAX_POINTS, Pyramid
+
+def _pyramid(start: str, n: int, agg: str, freq: str = "D", value: float = 1.0) -> Pyramid:
+    dates = pd.date_range(start, periods=n, freq=freq)
+    return Pyramid(dates.to_numpy(), np.full(n, value), agg)
+
+def test_last_buckets_are_dated_at_their_last_day():
+    # Mon 2024-01-01 .. Wed 2024-01-17: two full weeks and a three-day one
+    p = Pyramid(pd.date_range("2024-01-01", periods=17).to_numpy(), np.arange(17.0), "last")
+    view = p.view(resolution="W")
+    assert list(view["date"]) == list(pd.to_datetime(["2024-01-07", "2024-01-14", "2024-01-17"]))
+    assert list(view["value"]) == [6.0, 13.0, 16.0]
+
+def test_sum_and_mean_buckets_are_dated_at_their_start():
+    view = _pyramid("2024-01-01", 17, "mean").view(resolution="W")
+    assert list(view["date"]) == list(pd.to_datetime(["2024-01-01", "2024-01-08", "2024-01-15"]))
+
+def test_partial_sum_buckets_are_scaled_to_a_full_period():
+    # Thu 2024-01-04 .. Wed 2024-01-24: a four-day week, two full ones, a three-day one
+    view = _pyramid("2024-01-04", 21, "sum").view(resolution="W")
+    np.testing.assert_allclose(view["value"], [7.0, 7.0, 7.0, 7.0])
+    months = _pyramid("2024-01-20", 40, "sum").view(resolution="M")
+    np.testing.assert_allclose(months["value"], [31.0, 29.0])
+
+def test_weekly_data_rolled_into_months_is_not_scaled_inside_the_range():
+    # week-ending Sundays: only the trailing month is short
+    p = _pyramid("2024-01-07", 20, "sum", freq="W")
+    months = p.view(resolution="M")
+    assert list(months["value"][:-1]) == [4.0, 4.0, 5.0, 4.0]
+    assert months["value"].iloc[-1] > 3.0      # 3 weeks of May, projected to the month
+
+def test_long_ranges_pick_a_coarser_level_built_on_demand():
+    p = _pyramid("2015-01-01", 3650, "last")
+    assert list(p.levels) == ["D"]
+    assert p.pick(end="2015-12-31") == "D"
+    assert list(p.levels) == ["D"]             # the daily range fit: nothing rolled up
+    assert p.pick() == "W"                     # ten years of days are past the budget
+    assert len(p.view()) <= MAX_POINTS
+    assert list(p.levels) == ["D", "W"]
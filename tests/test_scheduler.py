@@ -0,0 +1,73 @@
+import json
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from utils import scheduler
+from utils.scheduler import RefreshScheduler, read_status
+from utils.snapshot import MANIFEST, resolve
+
+TOKENS = ["AAVE", "LDO", "ENA"]
+
+@pytest.fixture
+def sched(tmp_path):
+    s = RefreshScheduler(str(tmp_path), TOKENS, seed=3, interval=3600, workers=1)
+    yield s
+    s.stop()
+
+def test_refresh_publishes_a_version(sched):
+    version = sched.refresh()
+    assert os.path.basename(resolve(sched.root)) == version
+    status = read_status(sched.root)
+    assert status["state"] == "idle" and status["version"] == version and status["tokens"] == len(TOKENS)
+    assert status["done"] == status["total"]
+
+def test_failed_refresh_replaces_the_broken_pool(sched, monkeypatch):
+    real = scheduler.write_snapshot
+    calls = []
+
+    def flaky(path, *args, executor=None, **kwargs):
+        calls.append(executor)
+        if len(calls) == 1:
+            raise BrokenProcessPool("worker died")
+        return real(path, *args, executor=executor, **kwargs)
+
+    monkeypatch.setattr(scheduler, "write_snapshot", flaky)
+    with pytest.raises(BrokenProcessPool):
+        sched.refresh()
+    assert sched._pool is None
+    status = read_status(sched.root)
+    assert status["state"] == "failed" and "BrokenProcessPool" in status["error"]
+    assert not [d for d in os.listdir(sched.root) if d.startswith("v")]   # partial build removed
+
+    version = sched.refresh()
+    assert calls[1] is not calls[0]
+    assert read_status(sched.root)["state"] == "idle"
+    assert os.path.basename(resolve(sched.root)) == version
+
+def test_due(sched):
+    assert sched.due()                                  # nothing published yet
+    sched.refresh()
+    assert not sched.due()
+    manifest = os.path.join(resolve(sched.root), MANIFEST)
+    old = time.time() - sched.interval - 1
+    os.utime(manifest, (old, old))
+    assert sched.due()                                  # older than the interval
+    os.utime(manifest, None)
+    with open(manifest) as f:
+        data = json.load(f)
+    data["as_of"] = "2000-01-01"
+    with open(manifest, "w") as f:
+        json.dump(data, f)
+    assert sched.due()                                  # a previous day's data
+
+def test_run_logs_errors_instead_of_hiding_them(sched, monkeypatch, caplog):
+    def broken():
+        sched._stop.set()           # one tick only
+        raise OSError("store unreadable")
+
+    monkeypatch.setattr(sched, "due", broken)
+    sched.run()
+    assert "store unreadable" in caplog.text
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from utils.screener import filter_mask, page_slice, screen, top_k
+from utils.tokens_mock import generate_token_dataset
+
+def _summary():
+    return pd.DataFrame({
+        "Token": ["AAVE", "LDO", "ENA", "PENDLE", "AAVEX"],
+        "Price (30D %)": [5.0, -12.0, np.nan, 30.0, 1.0],
+        "_next_unlock_flag": [False, True, True, False, True],
+    })
+
+def test_query_matches_ticker_substring_case_insensitively():
+    assert list(np.flatnonzero(filter_mask(_summary(), " aave "))) == [0, 4]
+
+def test_unlock_only():
+    assert list(np.flatnonzero(filter_mask(_summary(), unlock_only=True))) == [1, 2, 4]
+
+def test_ranges_are_inclusive_open_ended_and_drop_nan():
+    s = _summary()
+    assert list(np.flatnonzero(filter_mask(s, ranges={"Price (30D %)": (1.0, 5.0)}))) == [0, 4]
+    assert list(np.flatnonzero(filter_mask(s, ranges={"Price (30D %)": (None, 0.0)}))) == [1]
+    assert list(np.flatnonzero(filter_mask(s, ranges={"Price (30D %)": (0.0, None)}))) == [0, 3, 4]
+
+def test_filters_combine():
+    mask = filter_mask(_summary(), "a", unlock_only=True, ranges={"Price (30D %)": (0.0, None)})
+    assert list(np.flatnonzero(mask)) == [4]
+
+def test_top_k_orders_and_puts_nan_last():
+    v = np.array([3.0, np.nan, 7.0, 1.0, 5.0])
+    assert list(top_k(v)) == [2, 4, 0, 3, 1]
+    assert list(top_k(v, 2)) == [2, 4]
+    assert list(top_k(v, 2, descending=False)) == [3, 0]
+    assert len(top_k(v, 0)) == 0
+
+def test_screen_sorts_filtered_rows_and_applies_mask():
+    s = _summary()
+    assert list(screen(s, sort_by="Price (30D %)")) == [3, 0, 4, 1, 2]
+    assert list(screen(s, unlock_only=True, sort_by="Price (30D %)", k=2)) == [4, 1]
+    assert list(screen(s, mask=np.array([True, False, True, True, False]))) == [0, 2, 3]
+
+def test_screen_matches_pandas_on_generated_summary():
+    summary, _ = generate_token_dataset(seed=3)
+    ranges = {"Price (30D %)": (-10.0, 20.0)}
+    rows = screen(summary, "E", ranges=ranges, sort_by="FDV (30D %)", descending=True)
+    expected = summary[summary["Token"].str.contains("E") & summary["Price (30D %)"].between(-10.0, 20.0)]
+    expected = expected.sort_values("FDV (30D %)", ascending=False, kind="stable")
+    assert list(summary.index[rows]) == list(expected.index)
+
+def test_page_slice_clamps():
+    assert page_slice(120, 1, 50) == slice(0, 50)
+    assert page_slice(120, 3, 50) == slice(100, 120)
+    assert page_slice(120, 9, 50) == slice(100, 120)
+    assert page_slice(0, 1, 50) == slice(0, 0)
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pandas as pd
+import pytest
+
+from utils.sources import CryptoPanicNewsSource, RateLimiter, SourceError, SourceRunner
+
+POSTS = {"results": [
+    {"id": 1, "published_at": "2024-05-01T10:00:00Z", "title": "Listing", "source": {"title": "Wire"}, "kind": "news"},
+]}
+
+class StubServer:
+    """CryptoPanic stand-in on localhost: answers each request with the next queued status."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.paths = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.paths.append(self.path)
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                body = json.dumps(POSTS if status == 200 else {"error": "nope"}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub(request):
+    server = StubServer(getattr(request, "param", []))
+    yield server
+    server.close()
+
+def _fetch(source, key):
+    async def run():
+        try:
+            return await source.fetch(key)
+        finally:
+            await source.aclose()
+    return asyncio.run(run())
+
+def _source(url, **kwargs):
+    source = CryptoPanicNewsSource(auth_token="s3cret", base_url=url, **kwargs)
+    source.backoff = 0.0
+    return source
+
+def test_fetch_parses_stub_response(stub):
+    news = _fetch(_source(stub.url), "AAVE")
+    assert list(news["headline"]) == ["Listing"]
+    assert news["date"].iloc[0] == pd.Timestamp("2024-05-01 10:00")
+    assert "currencies=AAVE" in stub.paths[0]
+
+@pytest.mark.parametrize("stub", [[503, 502]], indirect=True)
+def test_retries_transient_errors(stub):
+    source = _source(stub.url)
+    news = _fetch(source, "AAVE")
+    assert len(news) == 1
+    assert source.requests == 3
+
+@pytest.mark.parametrize("stub", [[401]], indirect=True)
+def test_client_error_is_not_retried_and_hides_token(stub):
+    source = _source(stub.url)
+    with pytest.raises(SourceError) as err:
+        _fetch(source, "AAVE")
+    assert source.requests == 1
+    assert "401" in str(err.value)
+    assert "s3cret" not in str(err.value)
+    assert err.value.__cause__ is None and err.value.__suppress_context__
+
+def test_retries_run_out_on_transport_errors():
+    calls = []
+
+    def refuse(request):
+        calls.append(request)
+        raise httpx.ConnectError("refused", request=request)
+
+    source = _source("http://stub.invalid", retries=2)
+    source._client = httpx.AsyncClient(base_url=source.base_url, transport=httpx.MockTransport(refuse))
+    source._limiter = RateLimiter(source.rate, source.burst)
+    with pytest.raises(SourceError) as err:
+        _fetch(source, "AAVE")
+    assert len(calls) == 3
+    assert "ConnectError" in str(err.value) and "s3cret" not in str(err.value)
+
+@pytest.mark.parametrize("body", [b"<html>maintenance</html>", b"[1, 2]", b'{"results": [{"published_at": "soon"}]}'])
+def test_bad_payload_is_a_source_error_and_not_retried(body):
+    calls = []
+
+    def reply(request):
+        calls.append(request)
+        return httpx.Response(200, content=body, headers={"Content-Type": "application/json"})
+
+    source = _source("http://stub.invalid")
+    source._client = httpx.AsyncClient(base_url=source.base_url, transport=httpx.MockTransport(reply))
+    source._limiter = RateLimiter(source.rate, source.burst)
+    with pytest.raises(SourceError, match="bad payload") as err:
+        _fetch(source, "AAVE")
+    assert len(calls) == 1
+    assert err.value.__cause__ is None and err.value.__suppress_context__
+
+def test_rate_limiter_spaces_requests_after_burst():
+    async def run():
+        limiter = RateLimiter(rate=20.0, burst=2)
+        started = time.monotonic()
+        for _ in range(6):
+            await limiter.acquire()
+        return time.monotonic() - started
+    # two from the burst, then four at 20/s
+    assert 0.18 <= asyncio.run(run()) < 1.0
+
+def test_runner_times_out():
+    runner = SourceRunner()
+    with pytest.raises(SourceError):
+        runner.run(asyncio.sleep(5), timeout=0.05)
@@ -0,0 +1,25 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from utils import startup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_first_render_writes_the_ready_file(tmp_path, monkeypatch):
+    ready = tmp_path / "dashboard.ready"
+    monkeypatch.setattr(startup, "READY_FILE", str(ready))
+    monkeypatch.setattr(startup, "_READY", type(startup._READY)())
+    monkeypatch.setattr(startup, "_FIRST_RENDER", {})
+    startup.record_first_render("app", time.time() - 0.5)
+    assert startup.is_ready()
+    status = json.loads(ready.read_text())
+    assert status["ready"] and status["first_render"]["page"] == "app"
+
+def test_charts_import_does_not_load_plotly():
+    # streamlit's own theme module loads plotly; headless importers (export, scheduler) shouldn't
+    code = ("import sys, types; sys.modules['streamlit'] = types.ModuleType('streamlit'); import utils.charts; "
+            "sys.exit('plotly.graph_objects' in sys.modules)")
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT).returncode == 0
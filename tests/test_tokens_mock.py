@@ -0,0 +1,100 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.hashing import stable_seed
+from utils.rolling import pct_change
+from utils.tokens_mock import (
+    _TREND_SPECS,
+    METRICS,
+    SUMMARY_METRICS,
+    generate_token_arrays,
+    generate_token_dataset,
+    token_universe,
+)
+
+TOKENS = token_universe(40)
+
+def _reference_token(seed: int, token: str, n: int) -> tuple[np.ndarray, dict]:
+    """One token, one series at a time, the way the mock is specified (no batching)."""
+    r = np.random.default_rng(stable_seed(seed, token))
+    params = {}
+    for name, _, _, (b0, b1), (d0, d1) in _TREND_SPECS:
+        params[name] = (r.uniform(b0, b1), r.uniform(d0, d1))
+    spike_mask = r.random(n) < 0.08
+    spikes = r.uniform(1.5, 5.0, spike_mask.sum())
+    cost_mult = r.uniform(0.6, 1.4)
+    qty = r.uniform(100, 20000)
+    unlock = np.clip(r.normal(1.2, 1.0, 12), 0, 6)
+
+    # one noise stream per token, summary metrics first
+    order = SUMMARY_METRICS + [m for m in METRICS if m not in SUMMARY_METRICS]
+    noise = np.random.default_rng(stable_seed(seed, f"{token}_paths")).standard_normal((len(order), n))
+    values = np.empty((len(METRICS), n))
+    for name, _, vol, _, _ in _TREND_SPECS:
+        base, drift = params[name]
+        if name == "burn":
+            burn_off = base < 2e5
+            base = max(1.0, base + 1.0)
+        series = base * np.exp(np.cumsum(drift + noise[order.index(name)] * vol))
+        if name == "volume":
+            series[spike_mask] *= spikes
+        elif name == "burn" and burn_off:
+            series *= 0.0
+        elif name == "fund_share":
+            series = np.clip(series, 0, 0.9)
+        values[METRICS.index(name)] = series
+    last_price = values[METRICS.index("price"), -1]
+    return values, {"qty": qty, "cost_basis": last_price * cost_mult, "unlock": unlock}
+
+def test_batched_arrays_match_a_per_token_loop():
+    arrays = generate_token_arrays(TOKENS, seed=5)
+    n = len(arrays["dates"])
+    for i, token in enumerate(TOKENS):
+        values, extra = _reference_token(5, token, n)
+        np.testing.assert_allclose(arrays["values"][i], values, rtol=1e-12)
+        np.testing.assert_allclose(arrays["position"]["qty"][i], extra["qty"])
+        np.testing.assert_allclose(arrays["position"]["cost_basis"][i], extra["cost_basis"], rtol=1e-12)
+        np.testing.assert_array_equal(arrays["unlock_pct"][i], extra["unlock"])
+
+def test_lazy_details_match_the_eager_arrays():
+    _, details = generate_token_dataset(TOKENS, seed=5)
+    arrays = generate_token_arrays(TOKENS, seed=5)
+    for i in (0, 17, 39):
+        np.testing.assert_array_equal(details[TOKENS[i]].values, arrays["values"][i])
+
+def test_summary_matches_the_eager_arrays():
+    summary, _ = generate_token_dataset(TOKENS, seed=5)
+    values = generate_token_arrays(TOKENS, seed=5)["values"]
+    deltas = pct_change(values[:, [METRICS.index(m) for m in SUMMARY_METRICS]], 30)
+    by_token = summary.set_index("Token")
+    np.testing.assert_allclose(by_token.loc[TOKENS, "Price (30D %)"], deltas[:, 0])
+    np.testing.assert_allclose(by_token.loc[TOKENS, "Volume 24H (30D %)"], deltas[:, 2])
+
+def test_batches_draw_the_same_per_token_streams():
+    whole = generate_token_arrays(TOKENS, seed=5)["values"]
+    part = generate_token_arrays(TOKENS[10:13], seed=5)["values"]
+    np.testing.assert_array_equal(part, whole[10:13])
+
+def test_seeds_differ_and_repeat():
+    a = generate_token_arrays(TOKENS[:3], seed=5)["values"]
+    np.testing.assert_array_equal(a, generate_token_arrays(TOKENS[:3], seed=5)["values"])
+    assert not np.allclose(a, generate_token_arrays(TOKENS[:3], seed=6)["values"])
+
+def test_observed_values_keep_their_constraints():
+    values = generate_token_arrays(TOKENS, seed=5)["values"]
+    share = values[:, METRICS.index("fund_share")]
+    assert (share >= 0).all() and (share <= 0.9).all()
+    burn = values[:, METRICS.index("burn")]
+    assert ((burn == 0).all(axis=-1) | (burn > 0).all(axis=-1)).all()
+
+def test_concurrent_builds_share_one_token_and_count_it_once():
+    _, details = generate_token_dataset(TOKENS, seed=5)
+    before = details.nbytes
+    with ThreadPoolExecutor(8) as pool:
+        got = list(pool.map(details.__getitem__, [TOKENS[3]] * 32))
+    assert all(d is got[0] for d in got)
+    assert details.nbytes == before + got[0].nbytes
+    copy = pickle.loads(pickle.dumps(details))
+    assert copy.nbytes == details.nbytes and copy[TOKENS[4]] is copy[TOKENS[4]]
@@ -0,0 +1,136 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from utils.rolling import _cumsum0, _pct
+
+UNLOCK = "unlock"   # pseudo-metric: the forward monthly unlock schedule (% of circ)
+
+class Rule(NamedTuple):
+    """Fires when `stat` of `metric` over `window` compares true against `threshold`.
+
+    stat: "change" (% vs `window` points ago), "level" (mean of the last
+    `window` points), "vs_ma" (% of the latest vs that mean) or, for the
+    UNLOCK pseudo-metric, "next" (any of the next `window` months).
+    """
+    name: str
+    metric: str
+    op: str
+    threshold: float
+    window: int = 30
+    stat: str = "change"
+
+UNLOCK_RULE = Rule("Unlock >2%", UNLOCK, ">", 2.0, window=12, stat="next")
+SHARE_RULE = Rule("Share Drop", "fund_share", "<=", -20.0, window=30)
+
+DEFAULT_RULES = [
+    UNLOCK_RULE,
+    SHARE_RULE,
+    Rule("Price -20% WoW", "price", "<=", -20.0, window=7),
+    Rule("Volume Spike", "volume", ">=", 100.0, window=30, stat="vs_ma"),
+    Rule("TVL -25%", "fund_tvl", "<=", -25.0, window=30),
+    Rule("Fees -30%", "fund_fees", "<=", -30.0, window=30),
+    Rule("DAU -30%", "fund_dau", "<=", -30.0, window=30),
+]
+
+# a < t  <=>  -a > -t, so every comparison becomes > or >= on sign-flipped values
+_OPS = {">": (1.0, True), ">=": (1.0, False), "<": (-1.0, True), "<=": (-1.0, False)}
+_STATS = ("change", "level", "vs_ma")
+
+class AlertResult:
+    """(tokens, rules) masks and the value each rule compared, from one evaluate() pass."""
+
+    def __init__(self, rules, tokens, mask, value, first):
+        self.rules = list(rules)
+        self.tokens = list(tokens) if tokens is not None else None
+        self.mask = mask
+        self.value = value
+        self.first = first   # first matching month for UNLOCK rules, else -1
+        self.as_of = None    # date of the data evaluated, when the caller knows it
+        self._pos = {t: i for i, t in enumerate(self.tokens or [])}
+
+    @property
+    def nbytes(self) -> int:
+        return self.mask.nbytes + self.value.nbytes + self.first.nbytes
+
+    def rule(self, name: str) -> int:
+        return next(j for j, r in enumerate(self.rules) if r.name == name)
+
+    def any(self) -> np.ndarray:
+        return self.mask.any(axis=1)
+
+    def fired(self, token) -> list[tuple[Rule, float, int]]:
+        i = self._pos[token]
+        return [(r, float(self.value[i, j]), int(self.first[i, j])) for j, r in enumerate(self.rules) if self.mask[i, j]]
+
+    def positions(self, tokens) -> np.ndarray:
+        """Row of each of `tokens` in the result, e.g. to align with a re-sorted table."""
+        return np.array([self._pos[t] for t in tokens], dtype=np.int64)
+
+    def labels(self, tokens) -> list[str]:
+        """Comma-joined names of the rules firing for each of `tokens` ("" if none)."""
+        names = np.array([r.name for r in self.rules], dtype=object)
+        return [", ".join(names[self.mask[i]]) for i in self.positions(tokens)]
+
+def lookback(rules) -> int:
+    """History points the series rules need (window + the base point)."""
+    return max([r.window for r in rules if r.metric != UNLOCK] or [0]) + 1
+
+def evaluate(rules, values: np.ndarray | None = None, metrics=None, unlock_pct: np.ndarray | None = None,
+             tokens=None) -> AlertResult:
+    """Evaluate every rule for every token at once.
+
+    values: (tokens, metrics, days) block with time on the last axis, keyed
+    by `metrics`; unlock_pct: (tokens, months) forward schedule. Only the
+    inputs the rules reference are required.
+    """
+    rules = list(rules)
+    for r in rules:
+        if r.op not in _OPS or r.stat not in (("next",) if r.metric == UNLOCK else _STATS):
+            raise ValueError(f"Unsupported rule {r}")
+    series = [j for j, r in enumerate(rules) if r.metric != UNLOCK]
+    unlocks = [j for j, r in enumerate(rules) if r.metric == UNLOCK]
+    if series and values is None or unlocks and unlock_pct is None:
+        raise ValueError("Rules reference inputs that were not provided")
+
+    n_tokens = len(values) if values is not None else len(unlock_pct)
+    stat_value = np.zeros((n_tokens, len(rules)))
+    first = np.full((n_tokens, len(rules)), -1, dtype=np.int64)
+    sign = np.array([_OPS[r.op][0] for r in rules], dtype=np.float64)
+    strict = np.array([_OPS[r.op][1] for r in rules], dtype=bool)
+    threshold = np.array([r.threshold for r in rules], dtype=np.float64)
+
+    if series:
+        rs = [rules[j] for j in series]
+        used = sorted({r.metric for r in rs})
+        mi = np.array([metrics.index(r.metric) for r in rs])
+        ui = np.array([used.index(r.metric) for r in rs])
+        w = np.array([r.window for r in rs])
+        n = values.shape[-1]
+        if n < lookback(rs):
+            raise ValueError(f"Rules need {lookback(rs)} points of history, got {n}")
+
+        # every stat comes from a handful of (tokens, rules) gathers
+        latest = values[:, mi, -1]
+        prev = values[:, mi, n - 1 - w]
+        cum = _cumsum0(np.asarray(values[:, [metrics.index(m) for m in used], n - max(w):], dtype=np.float64))
+        mean = (cum[:, ui, -1] - cum[:, ui, -1 - w]) / w
+        kind = np.array([_STATS.index(r.stat) for r in rs])
+        stat_value[:, series] = np.choose(kind, [_pct(latest, prev), mean, _pct(latest, mean)])
+
+    if unlocks:
+        ru = [rules[j] for j in unlocks]
+        u = np.asarray(unlock_pct, dtype=np.float64)[:, None, :]   # (tokens, 1, months)
+        s, t = sign[unlocks][:, None], (sign * threshold)[unlocks][:, None]
+        hit = np.where(strict[unlocks][:, None], s * u > t, s * u >= t)
+        hit &= np.arange(u.shape[-1]) < np.array([r.window for r in ru])[:, None]   # only the next `window` months
+        idx = hit.argmax(axis=-1)
+        any_hit = hit.any(axis=-1)
+        first[:, unlocks] = np.where(any_hit, idx, -1)
+        stat_value[:, unlocks] = np.take_along_axis(np.broadcast_to(u, hit.shape), idx[..., None], axis=-1)[..., 0]
+
+    flipped, t = stat_value * sign, threshold * sign
+    mask = np.where(strict, flipped > t, flipped >= t)
+    if unlocks:
+        mask[:, unlocks] = first[:, unlocks] >= 0
+    return AlertResult(rules, tokens, mask, stat_value, first)
@@ -0,0 +1,373 @@
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from utils.fake_data import MACRO_SERIES, MacroPanel, _group_specs, align_block, make_panel
+from utils.hashing import stable_key
+from utils.portfolio import portfolio_analytics, portfolio_frames, positions_table
+from utils.snapshot import current_snapshot
+from utils.tokens_mock import TOKENS_DEFAULT, generate_token_dataset
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_MB = float(os.environ.get("DASHBOARD_CACHE_MB", "256"))
+# disk tier, off unless set: a volume shared by this deployment's workers (and only its user)
+DEFAULT_DISK_DIR = os.environ.get("DASHBOARD_CACHE_DIR", "")
+DEFAULT_DISK_MB = float(os.environ.get("DASHBOARD_DISK_CACHE_MB", "2048"))
+# part of every disk key: bump DISK_SCHEMA when a cached value's shape changes; library
+# upgrades (pickles of pandas/numpy objects) retire old entries on their own
+DISK_SCHEMA = 1
+DISK_VERSION = f"{DISK_SCHEMA}-pandas{pd.__version__}-numpy{np.__version__}"
+# token detail blocks; "float32" halves them at ~7 significant digits
+DETAIL_DTYPE = os.environ.get("DASHBOARD_DETAIL_DTYPE", "float64")
+
+def as_of() -> pd.Timestamp:
+    return pd.Timestamp.today().normalize()
+
+def data_version() -> tuple:
+    """As-of day plus the published snapshot, if any: the version in keys of anything derived from the data."""
+    snap = current_snapshot()
+    return as_of(), None if snap is None else snap.path
+
+def _next_day_boundary(now: float) -> float:
+    tomorrow = pd.Timestamp.fromtimestamp(now).normalize() + pd.Timedelta(days=1)
+    return tomorrow.timestamp()
+
+def sizeof(obj) -> int:
+    """Approximate in-memory size of a cached value, in bytes."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    if hasattr(obj, "to_plotly_json"):  # plotly figure: its trace arrays dominate
+        return sum(sizeof(v) for trace in obj.data for v in (trace.x, trace.y) if v is not None) or 64
+    if isinstance(obj, Mapping):
+        return sum(sizeof(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(sizeof(v) for v in obj)
+    return 64
+
+def _frozen_values(col: pd.Series):
+    if col.dtype.kind in "biufcmM":
+        return freeze(col.to_numpy())
+    if col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+        # text as a read-only object array: pandas' own string arrays can't be locked
+        return freeze(col.to_numpy(dtype=object))
+    return None
+
+def freeze(obj):
+    """Read-only version of a cached value: arrays are flagged non-writeable and frames
+    rebuilt over them, so in-place writes raise instead of leaking into other sessions."""
+    if isinstance(obj, np.ndarray):
+        obj.flags.writeable = False
+        return obj
+    if isinstance(obj, pd.DataFrame):
+        cols = {}
+        for c in obj.columns:
+            values = _frozen_values(obj[c])
+            cols[c] = obj[c] if values is None else pd.Series(values, index=obj.index, dtype=values.dtype, copy=False)
+        return pd.DataFrame(cols, index=obj.index, copy=False)
+    if isinstance(obj, pd.Series):
+        values = _frozen_values(obj)
+        return obj if values is None else pd.Series(values, index=obj.index, name=obj.name, dtype=values.dtype, copy=False)
+    if isinstance(obj, tuple):
+        return tuple(freeze(v) for v in obj)
+    return obj  # e.g. TokenDetails, which builds read-only blocks itself
+
+def _fingerprint(obj):
+    # structural changes that read-only arrays can't stop (added columns, inplace sorts)
+    if isinstance(obj, pd.DataFrame):
+        return tuple(obj.columns), obj.shape, id(obj.index)
+    if isinstance(obj, pd.Series):
+        return obj.name, obj.shape, id(obj.index)
+    if isinstance(obj, tuple):
+        return tuple(_fingerprint(v) for v in obj)
+    return None
+
+class DiskCache:
+    """Pickle store keyed by stable digests, shareable between processes.
+
+    Writes go to a temp file and are renamed into place, so readers never
+    see partial entries. Least recently read files are pruned over budget.
+    Unpickling runs whatever the file says, so the directory must be ours
+    and not writable by group or others; anything else is refused.
+    """
+
+    def __init__(self, path: str, max_bytes: int, version: str = DISK_VERSION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.stat(path)
+        if hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & 0o022):
+            raise PermissionError(f"Disk cache {path} must be owned by this user and not group/world-writable")
+
+    def _file(self, digest: str) -> str:
+        return os.path.join(self.path, f"{digest}.pkl")
+
+    def get(self, digest: str, default=None):
+        path = self._file(digest)
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self.misses += 1
+            return default
+        try:
+            with f:
+                value = pickle.load(f)
+        except Exception:
+            # truncated, from an older layout, or a class that moved: recompute instead
+            log.warning("Dropping unreadable disk cache entry %s", path, exc_info=True)
+            self._remove(path)
+            self.misses += 1
+            return default
+        try:
+            os.utime(path)
+        except OSError:
+            pass   # pruned meanwhile, or a read-only volume: the value is still good
+        self.hits += 1
+        return value
+
+    def _remove(self, path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def put(self, digest: str, value):
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._file(digest))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._prune()
+
+    def clear(self):
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".pkl"):
+                self._remove(entry.path)
+
+    def _prune(self):
+        files = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".pkl"):
+                st = entry.stat()
+                files.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+class DatasetCache:
+    """Thread-safe LRU cache with a byte budget and daily-rollover TTL.
+
+    Entries expire at the next local midnight (or after `ttl` seconds, if
+    sooner). Concurrent misses on the same key compute once. With a
+    `disk` tier, misses are looked up by stable_key(*key) before computing.
+    With `readonly`, values are frozen on insert and shared as-is: callers
+    derive views, never copies. A value found mutated is logged, dropped
+    and recomputed, rather than failing whichever session reads it next.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float | None = None, disk: DiskCache | None = None,
+                 readonly: bool = False):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk = disk
+        self.readonly = readonly
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.mutations = 0
+        self._entries = OrderedDict()  # key -> [value, nbytes, expires_at, fingerprint]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _expires_at(self, now: float) -> float:
+        expires = _next_day_boundary(now)
+        if self.ttl is not None:
+            expires = min(expires, now + self.ttl)
+        return expires
+
+    def _drop(self, key):
+        nbytes = self._entries.pop(key)[1]
+        self._bytes -= nbytes
+
+    def _lookup(self, key, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= now:
+            self._drop(key)
+            return None
+        if self.readonly and _fingerprint(entry[0]) != entry[3]:
+            log.warning("Shared cached value for %r was modified in place; dropped it. Derive a view or copy instead", key)
+            self._drop(key)
+            self.mutations += 1
+            return None
+        self._entries.move_to_end(key)
+        # lazily built values (e.g. TokenDetails) grow after insertion
+        if hasattr(entry[0], "nbytes"):
+            nbytes = sizeof(entry[0])
+            self._bytes += nbytes - entry[1]
+            entry[1] = nbytes
+        return entry
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._lookup(key, time.time())
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._evict()
+            return entry[0]
+
+    def put(self, key, value):
+        """Store value; returns what was stored (the frozen value for a readonly cache)."""
+        if self.readonly:
+            value = freeze(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            nbytes = sizeof(value)
+            self._entries[key] = [value, nbytes, self._expires_at(time.time()), _fingerprint(value)]
+            self._bytes += nbytes
+            self._evict()
+        return value
+
+    def get_or_compute(self, key, compute, disk: bool = True):
+        """Cached value for key, computed once; disk=False keeps it out of the disk tier
+        (e.g. values over memory-mapped snapshot arrays, which are shared already)."""
+        with self._lock:
+            entry = self._lookup(key, time.time())
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._lookup(key, time.time())
+                if entry is not None:
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+            try:
+                value = self.put(key, self._load_or_compute(key, compute) if disk else compute())
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return value
+
+    def _load_or_compute(self, key, compute):
+        if self.disk is None:
+            return compute()
+        digest = stable_key(self.disk.version, *key)
+        value = self.disk.get(digest)
+        if value is None:
+            value = compute()
+            try:
+                self.disk.put(digest, value)
+            except OSError:
+                pass  # a full or read-only disk only costs the shared copy
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "mutations": self.mutations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+        if self.disk is not None:
+            stats["disk_hits"] = self.disk.hits
+            stats["disk_misses"] = self.disk.misses
+        return stats
+
+def _disk_tier() -> DiskCache | None:
+    if not DEFAULT_DISK_DIR:
+        return None
+    try:
+        return DiskCache(DEFAULT_DISK_DIR, int(DEFAULT_DISK_MB * 2**20))
+    except OSError as e:
+        log.warning("Disk cache off: %s", e)
+        return None
+
+# shared by every session in this process (and, via the disk tier, across workers)
+DATASETS = DatasetCache(max_bytes=int(DEFAULT_MAX_MB * 2**20), disk=_disk_tier(), readonly=True)
+
+def cached_token_dataset(tokens=None, seed: int = 42):
+    tokens = tuple(TOKENS_DEFAULT if tokens is None else tokens)
+    snap = current_snapshot()
+    if snap is not None and snap.matches(tokens, seed, as_of()):
+        # through DATASETS too, so the shared summary is frozen and checked like a generated one
+        return DATASETS.get_or_compute(("tokens", tokens, seed, snap.path), snap.token_dataset, disk=False)
+    key = ("tokens", tokens, seed, DETAIL_DTYPE, as_of())
+    return DATASETS.get_or_compute(key, lambda: generate_token_dataset(list(tokens), seed=seed, dtype=DETAIL_DTYPE))
+
+def cached_portfolio(tokens=None, seed: int = 42) -> dict:
+    """portfolio_analytics for every position in the dataset, plus chart frames and the positions table."""
+    def compute():
+        _, details = cached_token_dataset(tokens, seed)
+        positions = details.positions()
+        analytics = portfolio_analytics(details.prices(), positions)
+        analytics["tokens"] = list(details)
+        analytics["frames"] = portfolio_frames(details.dates, analytics)
+        analytics["table"] = positions_table(details, positions, analytics)
+        return analytics
+
+    key = ("portfolio", tuple(TOKENS_DEFAULT if tokens is None else tokens), seed, data_version())
+    return DATASETS.get_or_compute(key, compute)
+
+def _snapshot_panel(snap, specs) -> MacroPanel:
+    blocks = {}
+    for freq, group in _group_specs(specs).items():
+        frames = [snap.series(name) for name, *_ in group]
+        dates = max((f["date"].to_numpy() for f in frames), key=len)
+        blocks[freq] = (dates, align_block(dates, [f["value"].to_numpy() for f in frames]))
+    return MacroPanel(specs, blocks)
+
+def cached_macro(specs=MACRO_SERIES, seed: int = 42) -> MacroPanel:
+    """All macro series in one cached panel: one aligned block per frequency."""
+    specs = tuple(tuple(s) for s in specs)
+    snap = current_snapshot()
+    if snap is not None and snap.fresh(as_of()) and all(snap.has_series(*s, seed) for s in specs):
+        # keyed by version: a snapshot may lag as_of() by a day
+        return DATASETS.get_or_compute(("macro", specs, seed, snap.path), lambda: _snapshot_panel(snap, specs),
+                                       disk=False)
+    return DATASETS.get_or_compute(("macro", specs, seed, as_of()), lambda: make_panel(specs, seed=seed))
@@ -0,0 +1,74 @@
+import os
+from typing import TYPE_CHECKING
+
+import pandas as pd
+import streamlit as st
+
+from utils.cache import DatasetCache
+from utils.figures import PIXEL_WIDTH, WEBGL_THRESHOLD, bar_figure, heatmap_figure, time_figure  # noqa: F401
+from utils.perf import span
+from utils.rollups import MAX_POINTS, pyramid
+
+if TYPE_CHECKING:
+    # plotly is imported by the builders: pages whose figures are all cached never load it
+    import plotly.graph_objects as go
+
+# label -> lookback in days (None = full history)
+RANGES = {"1M": 30, "3M": 91, "6M": 182, "1Y": 365, "3Y": 1096, "All": None}
+
+# A view is first cut to the finest rollup with at most MAX_POINTS points, then
+# downsampled to PIXEL_WIDTH; series longer than WEBGL_THRESHOLD before
+# downsampling are drawn with scattergl (both budgets live in utils.figures).
+# PIXEL_WIDTH < WEBGL_THRESHOLD < MAX_POINTS.
+
+# Built figures, shared across sessions and reused within a render. Figure
+# objects are cached rather than JSON/dict specs: st.plotly_chart re-validates
+# dict specs through Figure(**spec), which costs more than building anew.
+FIGURES = DatasetCache(max_bytes=int(float(os.environ.get("DASHBOARD_FIGURE_CACHE_MB", "64")) * 2**20))
+
+def range_selector(label: str = "Range", options=("1M", "3M", "6M", "1Y", "All"), default: str = "1Y", key=None) -> str:
+    choice = st.segmented_control(label, list(options), default=default, key=key)
+    return choice or default
+
+def range_start(range_label: str, end) -> pd.Timestamp | None:
+    days = RANGES.get(range_label)
+    return None if days is None else pd.Timestamp(end) - pd.Timedelta(days=days)
+
+def series_view(df: pd.DataFrame, agg: str, range_label: str = "All", max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """Range-sliced frame at the finest rollup resolution that fits max_points."""
+    end = df["date"].iloc[-1]
+    return pyramid(df, agg).view(range_start(range_label, end), end, max_points=max_points)
+
+def plot(fig: "go.Figure", key=None):
+    """Single entry point for every Plotly chart on the dashboard."""
+    with span("plot"):
+        st.plotly_chart(fig, use_container_width=True, key=key)
+
+def cached_figure(cache_key, build) -> "go.Figure":
+    """Figure for cache_key, built once; cached figures must not be mutated."""
+    def traced_build():
+        with span("build figure"):
+            return build()
+
+    if cache_key is None:
+        return traced_build()
+    return FIGURES.get_or_compute(cache_key, traced_build)
+
+def series_figure(df: pd.DataFrame, agg: str = "last", range_label: str = "All", kind: str = "line",
+                  cache_key: tuple | None = None) -> "go.Figure":
+    """Downsampled figure for a date/value frame, cached under cache_key when given."""
+    def build():
+        view = series_view(df, agg, range_label)
+        # summed series (volumes, fees) are spiky: min-max keeps every spike
+        method = "minmax" if agg == "sum" else "lttb"
+        return time_figure(view["date"].to_numpy(), view["value"].to_numpy(), kind=kind, method=method)
+
+    if cache_key is not None:
+        cache_key = ("series", *cache_key, agg, range_label, kind)
+    return cached_figure(cache_key, build)
+
+def series_chart(df: pd.DataFrame, agg: str = "last", range_label: str = "All", kind: str = "line", key=None,
+                 cache_key: tuple | None = None):
+    """Chart a date/value frame; pass cache_key (e.g. token, metric, seed, data_version()) to reuse the figure."""
+    with span("series_chart", key=str(cache_key[0] if cache_key else key)):
+        plot(series_figure(df, agg, range_label, kind, cache_key), key=key)
@@ -0,0 +1,57 @@
+import numpy as np
+
+def _as_float(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+def minmax(x, y, n_buckets: int):
+    """Keep each bucket's min and max point (in time order), so every spike survives."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * n_buckets or n_buckets < 1:
+        return x, y
+
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+    counts = np.diff(np.r_[starts, n])
+    pos = np.arange(n)
+    hi = np.repeat(np.maximum.reduceat(y, starts), counts)
+    lo = np.repeat(np.minimum.reduceat(y, starts), counts)
+    i_hi = np.minimum.reduceat(np.where(y == hi, pos, n), starts)
+    i_lo = np.minimum.reduceat(np.where(y == lo, pos, n), starts)
+
+    keep = np.unique(np.r_[0, i_lo, i_hi, n - 1])
+    keep = keep[keep < n]
+    return np.asarray(x)[keep], y[keep]
+
+def lttb(x, y, n_out: int):
+    """Largest-Triangle-Three-Buckets: n_out points that keep the visual shape."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    xf = _as_float(x)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)   # n_out - 2 middle buckets
+    # each bucket's mean point, plus the last point as the final "next bucket"
+    counts = np.diff(edges)
+    mean_x = np.r_[np.add.reduceat(xf[1:n - 1], edges[:-1] - 1) / counts, xf[-1]]
+    mean_y = np.r_[np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts, y[-1]]
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = mean_x[b + 1], mean_y[b + 1]
+        area = np.abs((xf[a] - cx) * (y[lo:hi] - y[a]) - (xf[a] - xf[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[b + 1] = a
+    return np.asarray(x)[idx], y[idx]
+
+def downsample(x, y, budget: int, method: str = "lttb"):
+    """Reduce a series to roughly `budget` points; minmax keeps 2 per bucket."""
+    if method == "minmax":
+        return minmax(x, y, max(budget // 2, 1))
+    return lttb(x, y, budget)
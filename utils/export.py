@@ -0,0 +1,315 @@
+"""Headless bulk export of the token and macro datasets, no Streamlit UI.
+
+    python -m utils.export out/ --universe 500 --format parquet --html
+    python -m utils.export out/ --tokens AAVE,LDO --format csv --workers 0
+
+writes, under out/:
+
+    summary.<ext>     one row per token, as on the Summary page, plus fired alerts
+    stats.<ext>       token × metric latest indicators (the Tokens page tiles)
+    details.<ext>     token, date and one column per metric: every token's daily history
+    unlock.<ext>      token, date, unlock % of circulating over the next 12 months
+    positions.<ext>   the mock position per token
+    macro.<ext>       series, date, value for every Macro series
+    html/<TOKEN>.html static report per token (--html), sharing html/plotly.min.js;
+                      characters other than A-Z, 0-9, _ and - become _ in the name
+    manifest.json     written last: a manifest means a complete export
+
+<ext> is parquet, arrow (Arrow IPC file) or csv. Token batches are built in
+a process pool and appended to the files as they arrive, with at most a
+few batches in flight, so memory stays flat however large the universe;
+workers write their batch's HTML reports themselves. Batches draw the same
+per-token streams as a whole-universe build, so an export matches what the
+pages show for the same tokens and seed.
+"""
+import argparse
+import html
+import multiprocessing
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from utils.alerts import DEFAULT_RULES, evaluate, lookback
+from utils.fake_data import MACRO_SERIES, make_panel
+from utils.figures import bar_figure, time_figure
+from utils.formatting import badge_html, html_table
+from utils.rolling import latest_stats, pct_change
+from utils.rollups import TOKEN_AGG
+from utils.snapshot import MANIFEST, POSITION_KEYS, _write_json
+from utils.tokens_mock import (
+    DAYS,
+    METRICS,
+    SUMMARY_METRICS,
+    _unlock_months,
+    build_summary,
+    generate_token_arrays,
+    token_universe,
+)
+
+EXPORT_VERSION = 1
+FORMATS = ("parquet", "arrow", "csv")   # also the file extensions
+TABLES = ["details", "stats", "unlock", "positions"]
+# `days` of history is days + 1 points; the alert rules and the summary's 30D change need this many
+MIN_DAYS = max(lookback(DEFAULT_RULES), 31) - 1
+
+def report_name(token: str) -> str:
+    """File name for a token's HTML report: tickers come from user input, so no path parts."""
+    return re.sub(r"[^A-Za-z0-9_-]", "_", token) + ".html"
+
+class TableWriter:
+    """Appends pyarrow tables to one file; the schema comes from the first table."""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self._writer = None
+
+    def write(self, table: pa.Table):
+        if self._writer is None:
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            elif self.fmt == "arrow":
+                self._writer = pa.ipc.new_file(self.path, table.schema)
+            else:
+                self._writer = pacsv.CSVWriter(self.path, table.schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+def write_table(path: str, fmt: str, table: pa.Table) -> int:
+    writer = TableWriter(path, fmt)
+    try:
+        writer.write(table)
+    finally:
+        writer.close()
+    return writer.rows
+
+# =======================
+# Per-batch tables (run in the workers)
+# =======================
+def _days(dates) -> pa.Array:
+    return pa.array(np.asarray(dates, dtype="datetime64[D]"))
+
+def _batch_tables(arrays: dict, stats: dict) -> dict:
+    tokens = arrays["tokens"]
+    values = arrays["values"]
+    n_tokens, n_metrics, n_days = values.shape
+    # metric-major reshape: one contiguous column per metric
+    columns = values.transpose(1, 0, 2).reshape(n_metrics, -1)
+    details = pa.table({
+        "token": np.repeat(tokens, n_days),
+        "date": pa.concat_arrays([_days(arrays["dates"])] * n_tokens) if n_tokens else _days([]),
+        **{m: columns[j] for j, m in enumerate(METRICS)},
+    })
+    stats_table = pa.table({
+        "token": np.repeat(tokens, n_metrics),
+        "metric": np.tile(METRICS, n_tokens),
+        **{k: v.reshape(-1) for k, v in stats.items()},
+    })
+    n_months = arrays["unlock_pct"].shape[1]
+    unlock = pa.table({
+        "token": np.repeat(tokens, n_months),
+        "date": pa.concat_arrays([_days(arrays["unlock_dates"])] * n_tokens) if n_tokens else _days([]),
+        "unlock_pct_of_circ": arrays["unlock_pct"].reshape(-1),
+    })
+    positions = pa.table({"token": tokens, **{k: arrays["position"][k] for k in POSITION_KEYS}})
+    return {"details": details, "stats": stats_table, "unlock": unlock, "positions": positions}
+
+def _export_batch(tokens: list, seed: int, days: int, html_dir: str | None) -> dict:
+    """Every table's rows for one batch of tokens, plus what the summary needs."""
+    arrays = generate_token_arrays(tokens, seed=seed, days=days)
+    values = arrays["values"]
+    stats = latest_stats(values)
+    alerts = evaluate(DEFAULT_RULES, values[..., -lookback(DEFAULT_RULES):], METRICS, arrays["unlock_pct"],
+                      tokens=tokens)
+    if html_dir is not None:
+        for i, token in enumerate(tokens):
+            with open(os.path.join(html_dir, report_name(token)), "w") as f:
+                f.write(token_report(arrays, i, stats, alerts, seed))
+
+    cols = [METRICS.index(m) for m in SUMMARY_METRICS]
+    return {
+        "tables": _batch_tables(arrays, stats),
+        "deltas": pct_change(values[:, cols, -31:], 30),
+        "unlock_pct": arrays["unlock_pct"],
+        "alerts": alerts.labels(tokens),
+        "as_of": arrays["dates"][-1].date().isoformat(),
+    }
+
+# =======================
+# HTML report
+# =======================
+def token_report(arrays: dict, i: int, stats: dict, alerts, seed: int) -> str:
+    """Standalone page for token i of a batch: indicator table, alerts and one chart per metric."""
+
+    token = arrays["tokens"][i]
+    dates = arrays["dates"].to_numpy()
+    as_of = arrays["dates"][-1].date().isoformat()
+    rows = [
+        [html.escape(m)] + [f"{stats[k][i, j]:,.4g}" for k in ("last", "ma30", "chg_7d", "chg_30d", "vol30")]
+        for j, m in enumerate(METRICS)
+    ]
+    fired = [badge_html(f"{rule.name}: {value:.1f}", color="red") for rule, value, _ in alerts.fired(token)]
+
+    charts = []
+    for j, m in enumerate(METRICS):
+        agg = TOKEN_AGG[m]
+        fig = time_figure(dates, arrays["values"][i, j], kind="area" if m == "volume" else "line",
+                          method="minmax" if agg == "sum" else "lttb")
+        fig.update_layout(title=m, height=300)
+        charts.append(fig.to_html(full_html=False, include_plotlyjs=False))
+    unlock = {"date": arrays["unlock_dates"], "unlock_pct_of_circ": arrays["unlock_pct"][i]}
+    fig = bar_figure(unlock, "date", "unlock_pct_of_circ")
+    fig.update_layout(title="Unlock schedule (% of circ)", height=300)
+    charts.append(fig.to_html(full_html=False, include_plotlyjs=False))
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(token)} · {as_of}</title>
+<script src="plotly.min.js"></script></head>
+<body style="font-family:sans-serif;max-width:1100px;margin:auto">
+<h1>{html.escape(token)}</h1>
+<p>As of {as_of} · seed {seed} · mock data</p>
+<p>{" ".join(fired) or "No alerts firing."}</p>
+{html_table(["Metric", "Last", "MA30", "7D %", "30D %", "Vol 30D %"], rows)}
+{"".join(charts)}
+</body></html>
+"""
+
+# =======================
+# Export
+# =======================
+def _bounded_map(executor, fn, batches, window: int):
+    """fn(*batch) for every batch, results in order, with at most `window` in flight."""
+    if executor is None:
+        for batch in batches:
+            yield fn(*batch)
+        return
+    pending = deque()
+    for batch in batches:
+        pending.append(executor.submit(fn, *batch))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def _macro_table(seed: int) -> pa.Table:
+    panel = make_panel(MACRO_SERIES, seed=seed)
+    frames = [panel[name] for name, *_ in MACRO_SERIES]
+    return pa.table({
+        "series": np.repeat([name for name, *_ in MACRO_SERIES], [len(f) for f in frames]),
+        "date": pa.concat_arrays([_days(f["date"]) for f in frames]),
+        "value": np.concatenate([f["value"].to_numpy() for f in frames]),
+    })
+
+def export(out: str, tokens=None, seed: int = 42, days: int = DAYS, fmt: str = "parquet", html_reports: bool = False,
+           workers: int | None = None, batch_size: int = 64, progress=None) -> dict:
+    """Write the full export to `out` and return its manifest.
+
+    workers=0 builds every batch in this process; otherwise a spawn process
+    pool of `workers` (default: CPU count). progress(done, total) is called
+    per written batch.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    if days < MIN_DAYS:
+        raise ValueError(f"Export needs at least {MIN_DAYS} days of history, got {days}")
+    started = time.time()
+    tokens = list(token_universe() if tokens is None else tokens)
+    os.makedirs(out, exist_ok=True)
+    if os.path.exists(os.path.join(out, MANIFEST)):
+        os.remove(os.path.join(out, MANIFEST))   # an earlier export's: these files are about to change
+    html_dir = None
+    if html_reports:
+        import plotly.offline
+
+        html_dir = os.path.join(out, "html")
+        os.makedirs(html_dir, exist_ok=True)
+        with open(os.path.join(html_dir, "plotly.min.js"), "w") as f:
+            f.write(plotly.offline.get_plotlyjs())
+
+    writers = {name: TableWriter(os.path.join(out, f"{name}.{fmt}"), fmt) for name in TABLES}
+    batches = [(tokens[i:i + batch_size], seed, days, html_dir) for i in range(0, len(tokens), batch_size)]
+    deltas, unlock_pct, alerts, as_ofs = [], [], [], set()
+
+    workers = os.cpu_count() if workers is None else workers
+    # spawn, like the snapshot scheduler: safe to call from a process running threads
+    executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) if workers else None
+    try:
+        for done, result in enumerate(_bounded_map(executor, _export_batch, batches, 2 * max(workers, 1)), start=1):
+            for name, table in result["tables"].items():
+                writers[name].write(table)
+            # the summary is sorted across the universe, so keep its (small) inputs for the end
+            deltas.append(result["deltas"])
+            unlock_pct.append(result["unlock_pct"])
+            alerts.extend(result["alerts"])
+            as_ofs.add(result["as_of"])
+            if progress:
+                progress(done, len(batches))
+    finally:
+        for w in writers.values():
+            w.close()
+        if executor is not None:
+            executor.shutdown()
+    if len(as_ofs) > 1:
+        raise RuntimeError("The day rolled over while the export was being written; run it again")
+
+    # alerts follow the rows, not the tickers: a token may appear in more than one batch
+    summary = build_summary(tokens, np.concatenate(deltas), np.concatenate(unlock_pct), _unlock_months(),
+                            extra={"Alerts": alerts})
+    summary = summary.drop(columns="_next_unlock_flag")
+    rows = {name: w.rows for name, w in writers.items()}
+    summary = pa.Table.from_pandas(summary, preserve_index=False)
+    rows["summary"] = write_table(os.path.join(out, f"summary.{fmt}"), fmt, summary)
+    rows["macro"] = write_table(os.path.join(out, f"macro.{fmt}"), fmt, _macro_table(seed))
+
+    manifest = {
+        "version": EXPORT_VERSION,
+        "seed": seed,
+        "as_of": as_ofs.pop() if as_ofs else None,
+        "days": days,
+        "format": fmt,
+        "tokens": len(tokens),
+        "rows": rows,
+        "html": html_dir is not None,
+        "elapsed_s": round(time.time() - started, 3),
+    }
+    _write_json(out, MANIFEST, manifest)
+    return manifest
+
+def _days_arg(value: str) -> int:
+    days = int(value)
+    if days < MIN_DAYS:
+        raise argparse.ArgumentTypeError(f"needs at least {MIN_DAYS} days of history, got {days}")
+    return days
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the summary, token details and macro series without the UI.")
+    parser.add_argument("out")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tokens", help="comma-separated symbols (default: TOKENS_DEFAULT)")
+    parser.add_argument("--universe", type=int, help="TOKENS_DEFAULT padded with synthetic tickers to this many tokens")
+    parser.add_argument("--days", type=_days_arg, default=DAYS, help=f"days of history (at least {MIN_DAYS})")
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--html", action="store_true", help="also write a static HTML report per token")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (0: build in this process)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args(argv)
+    tokens = args.tokens.split(",") if args.tokens else token_universe(args.universe)
+    manifest = export(args.out, tokens, seed=args.seed, days=args.days, fmt=args.format, html_reports=args.html,
+                      workers=args.workers, batch_size=args.batch_size)
+    print(f"Exported {manifest['tokens']} tokens as of {manifest['as_of']} to {args.out} in {manifest['elapsed_s']:.1f}s")
+
+if __name__ == "__main__":
+    main()
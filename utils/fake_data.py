@@ -1,22 +1,28 @@
+from collections.abc import Mapping
+
 import numpy as np
 import pandas as pd
 
-def _date_index(years: int, freq: str) -> pd.DatetimeIndex:
-    end = pd.Timestamp.today().normalize()
+from utils.hashing import stable_seed
+from utils.perf import timed
+
+# Series on the Macro page: (name, years, freq, kind)
+MACRO_SERIES = [
+    ("M2", 3, "W", "level"),
+    ("Stablecoin Supplies", 3, "W", "level"),
+    ("Spot Trading Volume", 3, "W", "volume"),
+    ("Perp Trading Volume", 3, "W", "volume"),
+    ("BTC MVRV", 3, "W", "ratio"),
+    ("Fear & Greed", 1, "D", "index"),
+]
+
+def _date_index(years: int, freq: str, end=None) -> pd.DatetimeIndex:
+    end = pd.Timestamp.today().normalize() if end is None else end
     start = end - pd.Timedelta(days=int(years * 365.25))
     return pd.date_range(start=start, end=end, freq=freq)
 
-def make_series(
-    name: str,
-    years: int,
-    freq: str,
-    kind: str = "level",   # "level" | "volume" | "ratio" | "index"
-    seed: int = 42,
-) -> pd.DataFrame:
-    rng = np.random.default_rng(abs(hash((name, seed))) % (2**32))
-    idx = _date_index(years, freq)
-
-    n = len(idx)
+def _series_values(name: str, n: int, kind: str, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(stable_seed(name, seed))
     noise = rng.normal(0, 1, n)
 
     if kind == "level":
@@ -35,5 +41,105 @@ def make_series(
         values = np.clip(values, 0, 100)
     else:
         values = np.cumsum(noise)
+    return values
+
+@timed()
+def make_series(
+    name: str,
+    years: int,
+    freq: str,
+    kind: str = "level",   # "level" | "volume" | "ratio" | "index"
+    seed: int = 42,
+) -> pd.DataFrame:
+    idx = _date_index(years, freq)
+    return pd.DataFrame({"date": idx, "value": _series_values(name, len(idx), kind, seed)})
+
+# =======================
+# Batched: one block per frequency
+# =======================
+class MacroPanel(Mapping):
+    """Macro series grouped by frequency into (series, dates) blocks on one shared index each.
+
+    Shorter series are NaN-padded at the start. panel[name] is a date/value
+    DataFrame view (from the first real point), built on first use;
+    panel.wide(freq) is the aligned date x name frame.
+    """
+
+    def __init__(self, specs, blocks: dict):
+        # blocks: freq -> (dates, (series, dates) values)
+        self.specs = [tuple(s) for s in specs]
+        self.blocks = blocks
+        self._freeze()
+        self._where = {}   # name -> (freq, row)
+        for freq, group in _group_specs(self.specs).items():
+            self._where.update({spec[0]: (freq, row) for row, spec in enumerate(group)})
+        self._frames = {}
+
+    def _freeze(self):
+        for _, values in self.blocks.values():
+            values.flags.writeable = False   # shared by every session
+
+    def __setstate__(self, state):
+        # unpickled arrays (disk cache) come back writeable
+        self.__dict__.update(state)
+        self._freeze()
+
+    def freqs(self) -> list:
+        return list(self.blocks)
+
+    def names(self, freq: str | None = None) -> list:
+        return [s[0] for s in self.specs if freq is None or s[2] == freq]
+
+    def series(self, name: str) -> np.ndarray:
+        freq, row = self._where[name]
+        return self.blocks[freq][1][row]
+
+    def wide(self, freq: str) -> pd.DataFrame:
+        dates, values = self.blocks[freq]
+        return pd.DataFrame(values.T, index=pd.DatetimeIndex(dates, name="date"), columns=self.names(freq), copy=False)
+
+    def __getitem__(self, name):
+        if name not in self._frames:
+            freq, _ = self._where[name]
+            values = self.series(name)
+            first = int(np.argmax(~np.isnan(values)))
+            self._frames[name] = pd.DataFrame({"date": self.blocks[freq][0][first:], "value": values[first:]}, copy=False)
+        return self._frames[name]
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self):
+        return len(self.specs)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(dates.nbytes + values.nbytes for dates, values in self.blocks.values())
+
+def _group_specs(specs) -> dict:
+    groups = {}
+    for spec in specs:
+        groups.setdefault(spec[2], []).append(tuple(spec))
+    return groups
+
+def align_block(dates, columns: list) -> np.ndarray:
+    """(series, dates) block from arrays that each end on dates[-1], NaN-padded at the start."""
+    block = np.full((len(columns), len(dates)), np.nan)
+    for row, values in enumerate(columns):
+        block[row, len(dates) - len(values):] = values
+    return block
 
-    return pd.DataFrame({"date": idx, "value": values})
+@timed()
+def make_panel(specs=MACRO_SERIES, seed: int = 42) -> MacroPanel:
+    """Every series in `specs`, one date index per frequency; values match make_series."""
+    blocks = {}
+    for freq, group in _group_specs(specs).items():
+        end = pd.Timestamp.today().normalize()
+        idx = _date_index(max(years for _, years, _, _ in group), freq, end)
+        columns = []
+        for name, years, _, kind in group:
+            # shorter histories on the same anchored frequency are a tail of idx
+            n = len(idx) - idx.searchsorted(end - pd.Timedelta(days=int(years * 365.25)))
+            columns.append(_series_values(name, n, kind, seed))
+        blocks[freq] = (idx.to_numpy(), align_block(idx, columns))
+    return MacroPanel(specs, blocks)
@@ -0,0 +1,140 @@
+"""Governance and news feeds kept per (kind, token) and updated incrementally.
+
+Each sync asks the source only for rows since the feed's cursor (the newest
+item it has seen, less a small overlap) and merges them in by item id, so a proposal whose status moved
+on replaces its old row instead of duplicating it. Rows stay sorted by date
+with a category -> positions index, so the pages' paginated views are a
+searchsorted plus a slice rather than a scan.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.hashing import stable_key
+from utils.sources import fetch_since
+
+DATE_COLUMNS = {"governance": "start", "news": "date"}
+CATEGORY_COLUMNS = {"governance": "status", "news": "category"}
+KEY_COLUMNS = {"governance": "title", "news": "headline"}
+CURSOR_COLUMNS = {"governance": "end", "news": "date"}   # the sources' changed_column
+CURSOR_OVERLAP = pd.Timedelta(hours=1)   # re-asks for late or re-stamped items; merge dedupes them
+DEFAULT_TTL = float(os.environ.get("DASHBOARD_FEED_TTL", "300"))   # seconds between syncs
+MAX_FEEDS = 512
+
+class Feed:
+    """One token's items of one kind, deduped by id and sorted by date (oldest first)."""
+
+    def __init__(self, kind: str, token: str):
+        self.kind = kind
+        self.token = token
+        self.date_column = DATE_COLUMNS[kind]
+        self.category_column = CATEGORY_COLUMNS[kind]
+        self.cursor_column = CURSOR_COLUMNS[kind]
+        self.cursor = None
+        self.synced_at = 0.0
+        # (items, dates, category -> positions), replaced whole by merge so readers need no lock
+        self._view = (None, np.empty(0, dtype="datetime64[ns]"), {})
+
+    @property
+    def items(self) -> pd.DataFrame | None:
+        return self._view[0]
+
+    def _with_ids(self, rows: pd.DataFrame) -> pd.DataFrame:
+        # live sources may not send ids; fall back to a digest of what identifies the item
+        ids = rows["id"] if "id" in rows.columns else pd.Series(None, index=rows.index, dtype=object)
+        missing = ids.isna()
+        if missing.any():
+            title = KEY_COLUMNS[self.kind]
+            ids = ids.astype(object).copy()
+            ids[missing] = [
+                stable_key(self.token, self.kind, str(d), t)
+                for d, t in zip(rows.loc[missing, self.date_column], rows.loc[missing, title])
+            ]
+        return rows.assign(id=ids.astype(str))
+
+    def merge(self, rows: pd.DataFrame, now: pd.Timestamp | None = None) -> int:
+        """Upsert rows by id and move the cursor; returns how many were new."""
+        rows = self._with_ids(rows)
+        rows[self.date_column] = pd.to_datetime(rows[self.date_column])
+        old = self.items
+        before = 0 if old is None else len(old)
+        merged = rows if old is None else pd.concat([old, rows], ignore_index=True)
+        merged = merged.drop_duplicates("id", keep="last")
+        items = merged.sort_values(self.date_column, kind="stable", ignore_index=True)
+        codes, uniques = pd.factorize(items[self.category_column])
+        categories = {c: np.flatnonzero(codes == i) for i, c in enumerate(uniques)}
+        self._view = (items, items[self.date_column].to_numpy(), categories)
+        self.cursor = self._next_cursor(items, now)
+        return len(items) - before
+
+    def _next_cursor(self, items: pd.DataFrame, now=None):
+        # the newest item seen, not the wall clock: items the source stamps late still
+        # fall after it. Capped at now, since future end dates (open proposals) can still change.
+        newest = pd.to_datetime(items[self.cursor_column]).max() if len(items) else pd.NaT
+        if pd.isna(newest):
+            return self.cursor
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+        return min(newest, now) - CURSOR_OVERLAP
+
+    def categories(self) -> list:
+        return sorted(self._view[2])
+
+    def query(self, categories=None, since=None, until=None) -> pd.DataFrame:
+        """Items newest first, optionally limited to categories and a [since, until] date range."""
+        items, dates, index = self._view   # one consistent version, even mid-merge
+        if items is None:
+            return pd.DataFrame()
+        lo = 0 if since is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(since)), "left")
+        hi = len(dates) if until is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(until)), "right")
+        if categories is None:
+            rows = np.arange(lo, hi)
+        else:
+            picked = [index[c] for c in categories if c in index]
+            rows = np.sort(np.concatenate(picked)) if picked else np.empty(0, dtype=np.int64)
+            rows = rows[(rows >= lo) & (rows < hi)]
+        return items.iloc[rows[::-1]]
+
+class FeedStore:
+    """Process-wide feeds, synced at most every `ttl` seconds per (kind, token)."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_feeds: int = MAX_FEEDS):
+        self.ttl = ttl
+        self.max_feeds = max_feeds
+        self._feeds = OrderedDict()
+        self._lock = threading.Lock()
+        self._feed_locks = {}
+
+    def _entry(self, kind: str, token: str) -> tuple[Feed, threading.Lock]:
+        # feed and its sync lock in one step, so callers of one feed always share its lock
+        with self._lock:
+            key = (kind, token)
+            feed = self._feeds.get(key)
+            if feed is None:
+                feed = self._feeds[key] = Feed(kind, token)
+                while len(self._feeds) > self.max_feeds:
+                    old, _ = self._feeds.popitem(last=False)
+                    self._feed_locks.pop(old, None)
+            self._feeds.move_to_end(key)
+            return feed, self._feed_locks.setdefault(key, threading.Lock())
+
+    def feed(self, kind: str, token: str) -> Feed:
+        return self._entry(kind, token)[0]
+
+    def sync(self, kind: str, token: str, force: bool = False) -> Feed:
+        feed, lock = self._entry(kind, token)
+        with lock:
+            if force or time.time() - feed.synced_at >= self.ttl:
+                feed.merge(fetch_since(kind, token, feed.cursor))
+                feed.synced_at = time.time()
+        return feed
+
+    def clear(self):
+        with self._lock:
+            self._feeds.clear()
+            self._feed_locks.clear()
+
+FEEDS = FeedStore()
@@ -0,0 +1,49 @@
+"""Plotly figure builders, free of Streamlit so headless code (export) can use them.
+
+utils.charts re-exports these and adds the caching and st.plotly_chart side.
+"""
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from utils.downsample import downsample
+
+if TYPE_CHECKING:
+    # plotly is imported by the builders: pages whose figures are all cached never load it
+    import plotly.graph_objects as go
+
+PIXEL_WIDTH = 800        # point budget per trace, about one point per horizontal pixel
+WEBGL_THRESHOLD = 1000   # above this many source points, draw with scattergl
+
+def time_figure(x, y, kind: str = "line", method: str = "lttb", budget: int = PIXEL_WIDTH) -> "go.Figure":
+    """Line/area figure downsampled to the pixel budget, WebGL for series over WEBGL_THRESHOLD points."""
+    import plotly.graph_objects as go
+
+    trace = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    if len(y) > budget:
+        x, y = downsample(x, y, budget, method)
+    fill = "tozeroy" if kind == "area" else None
+    fig = go.Figure(trace(
+        x=x, y=y, mode="lines", fill=fill,
+        hovertemplate="date=%{x}<br>value=%{y}<extra></extra>",
+    ))
+    fig.update_layout(xaxis_title="date", yaxis_title="value", margin=dict(t=30))
+    return fig
+
+def bar_figure(df: pd.DataFrame, x: str, y: str) -> "go.Figure":
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Bar(x=df[x], y=df[y], hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>"))
+    fig.update_layout(xaxis_title=x, yaxis_title=y, margin=dict(t=30))
+    return fig
+
+def heatmap_figure(matrix, labels) -> "go.Figure":
+    """Correlation-style heatmap on a fixed [-1, 1] color scale."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Heatmap(
+        z=matrix, x=labels, y=labels, zmin=-1, zmax=1, colorscale="RdBu", text=matrix,
+        texttemplate="%{text:.2f}", hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>",
+    ))
+    fig.update_layout(margin=dict(t=30), yaxis_autorange="reversed")
+    return fig
@@ -1,4 +1,4 @@
-import streamlit as st
+import html
 
 def pct_delta_str(pct: float) -> str:
     return f"{pct:+.2f}%"
@@ -9,28 +9,36 @@ def colored_delta(pct: float) -> str:
 
 def warn_if(condition: bool, msg: str):
     if condition:
+        import streamlit as st
+
         st.warning(msg)
 
+BADGE_COLORS = {
+    "red": "#EF4444",
+    "green": "#22C55E",
+    "blue": "#3B82F6",
+    "gray": "#111827",
+}
+
+def badge_html(text: str, color: str = "gray", tooltip: str | None = None) -> str:
+    bg = BADGE_COLORS.get(color, "#111827")
+    title_attr = f'title="{html.escape(tooltip)}"' if tooltip else ""
+    return (
+        f'<span {title_attr} style="display:inline-block;padding:2px 8px;border-radius:999px;'
+        f'background:{bg};color:#fff;font-size:12px;line-height:18px;">{html.escape(str(text))}</span>'
+    )
+
 def badge(text: str, color: str = "gray", tooltip: str | None = None):
     """
     color: red | green | gray | blue
     tooltip: hover text
     """
-    bg = {
-        "red": "#EF4444",
-        "green": "#22C55E",
-        "blue": "#3B82F6",
-        "gray": "#111827",
-    }.get(color, "#111827")
-
-    title_attr = f'title="{tooltip}"' if tooltip else ""
-    st.markdown(
-        f"""
-        <span {title_attr}
-              style="display:inline-block;padding:2px 8px;border-radius:999px;
-                     background:{bg};color:#fff;font-size:12px;line-height:18px;">
-          {text}
-        </span>
-        """,
-        unsafe_allow_html=True
-    )
+    import streamlit as st
+
+    st.markdown(badge_html(text, color, tooltip), unsafe_allow_html=True)
+
+def html_table(columns: list[str], rows: list[list[str]]) -> str:
+    """One <table> for a page of rows; cells are HTML, so escape text before passing it in."""
+    head = "".join(f'<th style="text-align:left">{html.escape(c)}</th>' for c in columns)
+    body = "".join("<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in rows)
+    return f'<table style="width:100%;font-size:14px"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
@@ -0,0 +1,13 @@
+import hashlib
+import json
+
+def _payload(parts) -> bytes:
+    return json.dumps(parts, default=str, separators=(",", ":")).encode("utf-8")
+
+def stable_key(*parts) -> str:
+    """Hex digest of `parts` that is identical across processes and restarts."""
+    return hashlib.blake2b(_payload(parts), digest_size=16).hexdigest()
+
+def stable_seed(*parts) -> int:
+    """32-bit rng seed derived from `parts` (unlike hash(), not salted per process)."""
+    return int.from_bytes(hashlib.blake2b(_payload(parts), digest_size=4).digest(), "little")
@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.alerts import DEFAULT_RULES, AlertResult, evaluate, lookback
+from utils.cache import DATASETS, as_of
+from utils.hashing import stable_key
+from utils.snapshot import current_snapshot
+from utils.tokens_mock import METRICS, TOKENS_DEFAULT, generate_token_arrays
+
+log = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = float(os.environ.get("DASHBOARD_ALERT_INTERVAL", "300"))   # seconds
+# how long latest() waits on the background pass before evaluating in the caller
+WAIT_TIMEOUT = float(os.environ.get("DASHBOARD_ALERT_WAIT", "30"))
+
+class AlertMonitor:
+    """Evaluates alert rules for a token universe on a background thread.
+
+    Pages read latest() instead of checking tokens one at a time; every
+    session looking at the same universe shares one monitor.
+    """
+
+    def __init__(self, tokens=None, seed: int = 42, rules=DEFAULT_RULES, interval: float = DEFAULT_INTERVAL):
+        self.tokens = tokens
+        self.seed = seed
+        self.rules = list(rules)
+        self.interval = interval
+        self.as_of = None
+        self.runs = 0
+        self.failures = 0
+        self.error = None
+        self._result = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _inputs(self, snap):
+        """(values trailing window, unlock_pct, tokens, last date), from the snapshot when it has this universe."""
+        window = lookback(self.rules)
+        if snap is not None:
+            return snap.values[..., -window:], snap.unlock, snap.tokens, snap.dates[-1]
+        arrays = generate_token_arrays(self.tokens, seed=self.seed)
+        # rules only look at the trailing window, so keep just that and free the rest
+        return arrays["values"][..., -window:].copy(), arrays["unlock_pct"], arrays["tokens"], arrays["dates"][-1]
+
+    def refresh(self) -> AlertResult:
+        tokens = tuple(TOKENS_DEFAULT if self.tokens is None else self.tokens)
+        snap = current_snapshot()
+        if snap is not None and not snap.matches(tokens, self.seed, as_of()):
+            snap = None
+        # the data only changes with the day or a new snapshot: between those, this is a cache hit
+        version = snap.path if snap is not None else as_of()
+
+        def compute():
+            values, unlock_pct, names, last = self._inputs(snap)
+            result = evaluate(self.rules, values, METRICS, unlock_pct, tokens=names)
+            result.as_of = pd.Timestamp(last)
+            return result
+
+        result = DATASETS.get_or_compute(("alerts", tokens, self.seed, tuple(self.rules), version), compute)
+        with self._lock:
+            self._result = result
+            self.as_of = result.as_of
+            self.runs += 1
+            self.error = None
+        self._ready.set()
+        return result
+
+    def latest(self, wait: bool = True) -> AlertResult | None:
+        """Most recent result; with wait=False, None until the first pass finishes.
+
+        With wait=True and no result yet (the background pass is slow or
+        failing), evaluates in the caller after WAIT_TIMEOUT at most.
+        """
+        if wait and not self._ready.is_set():
+            if self._thread is None or not self._ready.wait(WAIT_TIMEOUT):
+                return self.refresh()
+        with self._lock:
+            return self._result
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                # keep the thread alive: the next pass may succeed, and latest() falls back meanwhile
+                log.exception("Alert refresh failed for %s", self.tokens or "default universe")
+                with self._lock:
+                    self.error = f"{type(e).__name__}: {e}"
+                    self.failures += 1
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+MAX_MONITORS = 8   # least recently used universes/seeds stop beyond this
+
+_MONITORS = OrderedDict()
+_LOCK = threading.Lock()
+
+def alert_monitor(tokens=None, seed: int = 42) -> AlertMonitor:
+    """Process-wide running monitor for a universe (default rules)."""
+    key = stable_key(tokens, seed)
+    with _LOCK:
+        if key not in _MONITORS:
+            _MONITORS[key] = AlertMonitor(tokens, seed).start()
+            while len(_MONITORS) > MAX_MONITORS:
+                _MONITORS.popitem(last=False)[1].stop()
+        _MONITORS.move_to_end(key)
+        return _MONITORS[key]
@@ -0,0 +1,209 @@
+"""Hot-path timing spans, collected per rerun.
+
+    with span("rolling stats"):
+        ...
+
+    @timed("generate_token_dataset")
+    def generate_token_dataset(...): ...
+
+Spans only record inside an active trace (start_trace(), one per page
+rerun), so outside one, or when tracing is off, a span costs one
+ContextVar lookup. Traces are span trees with wall times and, with
+DASHBOARD_PERF=mem, the net bytes each span allocated (via tracemalloc,
+which slows everything down). Export with to_json() or chrome_trace()
+(load the latter in chrome://tracing or https://ui.perfetto.dev).
+
+Tracing is on for every session with DASHBOARD_PERF=1 (or =mem), or for
+one session by opening a page with ?perf=1.
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+MODE = os.environ.get("DASHBOARD_PERF", "")
+ENABLED = MODE in ("1", "mem")
+TRACK_MEMORY = MODE == "mem"
+
+_TRACE = contextvars.ContextVar("perf_trace", default=None)
+# recent finished traces from every session, for export without the UI
+RECENT = deque(maxlen=50)
+
+class Span:
+    __slots__ = ("name", "start", "end", "children", "alloc", "attrs")
+
+    def __init__(self, name: str, attrs: dict | None = None):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end = None
+        self.children = []
+        self.alloc = None
+        self.attrs = attrs or {}
+
+    @property
+    def ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1e3
+
+    @property
+    def self_ms(self) -> float:
+        return self.ms - sum(c.ms for c in self.children)
+
+    def to_dict(self, origin: float) -> dict:
+        out = {"name": self.name, "start_ms": (self.start - origin) * 1e3, "ms": self.ms}
+        if self.alloc is not None:
+            out["alloc_bytes"] = self.alloc
+        if self.attrs:
+            out["attrs"] = self.attrs
+        if self.children:
+            out["children"] = [c.to_dict(origin) for c in self.children]
+        return out
+
+class Trace:
+    """Span tree for one rerun; the root span is the whole rerun."""
+
+    def __init__(self, label: str):
+        if TRACK_MEMORY and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.label = label
+        self.wall = time.time()
+        self.thread = threading.get_ident()
+        self.root = Span(label)
+        self._stack = [self.root]
+        self._token = _TRACE.set(self)
+
+    def push(self, name: str, attrs: dict | None) -> Span:
+        s = Span(name, attrs)
+        if TRACK_MEMORY:
+            s.alloc = tracemalloc.get_traced_memory()[0]
+        self._stack[-1].children.append(s)
+        self._stack.append(s)
+        return s
+
+    def pop(self, s: Span):
+        s.end = time.perf_counter()
+        if TRACK_MEMORY:
+            s.alloc = tracemalloc.get_traced_memory()[0] - s.alloc
+        # tolerate spans closed out of order (e.g. an exception unwinding several)
+        while self._stack[-1] is not s and len(self._stack) > 1:
+            self._stack.pop()
+        if len(self._stack) > 1:
+            self._stack.pop()
+
+    def finish(self) -> "Trace":
+        if self.root.end is None:
+            self.root.end = time.perf_counter()
+            try:
+                _TRACE.reset(self._token)
+            except ValueError:
+                _TRACE.set(None)   # finished from another context
+            RECENT.append(self)
+        return self
+
+    def rows(self) -> list[dict]:
+        """Depth-first flat view: one row per span, for tables."""
+        out = []
+
+        def walk(s: Span, depth: int):
+            out.append({
+                "span": "  " * depth + s.name,
+                "ms": round(s.ms, 2),
+                "self ms": round(s.self_ms, 2),
+                "alloc KB": None if s.alloc is None else round(s.alloc / 1024, 1),
+            })
+            for c in s.children:
+                walk(c, depth + 1)
+
+        walk(self.root, 0)
+        return out
+
+    def to_dict(self) -> dict:
+        return {"label": self.label, "wall_time": self.wall, "root": self.root.to_dict(self.root.start)}
+
+class _Null:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _Null()
+
+class _Active:
+    __slots__ = ("trace", "name", "attrs", "span")
+
+    def __init__(self, trace: Trace, name: str, attrs: dict | None):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> Span:
+        self.span = self.trace.push(self.name, self.attrs)
+        return self.span
+
+    def __exit__(self, *exc):
+        self.trace.pop(self.span)
+        return False
+
+def start_trace(label: str) -> Trace:
+    """Begin collecting spans in this context (a Streamlit script run); call finish() at the end."""
+    return Trace(label)
+
+def current_trace() -> Trace | None:
+    return _TRACE.get()
+
+def clear_trace():
+    """Drop any trace left active in this context (e.g. by a rerun that was interrupted)."""
+    _TRACE.set(None)
+
+def span(name: str, **attrs):
+    trace = _TRACE.get()
+    if trace is None:
+        return _NULL
+    return _Active(trace, name, attrs or None)
+
+def timed(name: str | None = None):
+    """Decorator: run the function inside span(name or its qualified name)."""
+    def wrap(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _TRACE.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            with _Active(trace, label, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return wrap
+
+# =======================
+# Export
+# =======================
+def to_json(traces) -> list[dict]:
+    return [t.to_dict() for t in traces]
+
+def chrome_trace(traces) -> dict:
+    """Chrome trace-event format: one complete ("X") event per span, one row per rerun."""
+    events = []
+    for i, t in enumerate(traces):
+        origin = t.root.start - (t.wall - traces[0].wall)   # lay reruns out on one wall-clock axis
+
+        def walk(s: Span):
+            args = dict(s.attrs)
+            if s.alloc is not None:
+                args["alloc_bytes"] = s.alloc
+            events.append({
+                "name": s.name, "ph": "X", "pid": 1, "tid": i,
+                "ts": (s.start - origin) * 1e6, "dur": s.ms * 1e3, "args": args,
+            })
+            for c in s.children:
+                walk(c)
+
+        walk(t.root)
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": i, "args": {"name": t.label}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
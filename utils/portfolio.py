@@ -0,0 +1,104 @@
+"""Portfolio analytics over every position at once.
+
+Positions are held at constant quantity (the mock has no trade history), so
+the portfolio path is one matrix product, qty (tokens,) @ prices (tokens,
+days), and the risk figures come from the (tokens, tokens) covariance of
+daily log returns. Everything is plain numpy over the whole block, so
+hundreds of positions over multi-year daily history stay in the milliseconds.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.perf import timed
+from utils.rolling import PERIODS_PER_YEAR, VOL_WINDOW, _log_return, rolling_vol
+
+VAR_LEVEL = 0.95
+
+def portfolio_value(qty: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """(days,) portfolio value: qty (tokens,) @ prices (tokens, days)."""
+    return np.asarray(qty, dtype=np.float64) @ np.asarray(prices, dtype=np.float64)
+
+def covariance(returns: np.ndarray, periods_per_year: int = PERIODS_PER_YEAR) -> np.ndarray:
+    """Annualized (tokens, tokens) covariance of (tokens, days) returns."""
+    centered = returns - returns.mean(axis=-1, keepdims=True)
+    return centered @ centered.T / (returns.shape[-1] - 1) * periods_per_year
+
+def correlation(cov: np.ndarray) -> np.ndarray:
+    sd = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(sd, sd)
+    return np.clip(np.nan_to_num(corr), -1.0, 1.0)
+
+def drawdown(value: np.ndarray) -> np.ndarray:
+    """Fraction below the running peak (0 at new highs, negative otherwise)."""
+    return value / np.maximum.accumulate(value) - 1
+
+def historical_var(returns: np.ndarray, level: float = VAR_LEVEL) -> tuple[float, float]:
+    """(VaR, expected shortfall) of one-period returns, as positive loss fractions."""
+    if len(returns) == 0:
+        return 0.0, 0.0
+    cutoff = np.quantile(returns, 1 - level)
+    return float(-cutoff), float(-returns[returns <= cutoff].mean())
+
+def risk_contribution(weights: np.ndarray, cov: np.ndarray) -> tuple[np.ndarray, float]:
+    """(per-position share of portfolio vol, portfolio vol); the shares sum to 1."""
+    marginal = cov @ weights
+    variance = float(weights @ marginal)
+    if variance <= 0:
+        return np.zeros_like(weights), 0.0
+    return weights * marginal / variance, float(np.sqrt(variance))
+
+@timed()
+def portfolio_analytics(prices, positions: dict, window: int = VOL_WINDOW, level: float = VAR_LEVEL) -> dict:
+    """Value/PnL paths and risk figures for a (tokens, days) price block and position arrays."""
+    prices = np.asarray(prices, dtype=np.float64)
+    qty = np.asarray(positions["qty"], dtype=np.float64)
+    cost = float(np.sum(positions["cost_value"]))
+
+    value = portfolio_value(qty, prices)
+    returns = _log_return(prices[:, :-1], prices[:, 1:])
+    cov = covariance(returns)
+    weights = qty * prices[:, -1] / value[-1]
+    contrib, vol = risk_contribution(weights, cov)
+    port_returns = value[1:] / value[:-1] - 1
+    var, es = historical_var(port_returns, level)
+    dd = drawdown(value)
+
+    return {
+        "value": value,
+        "pnl": value - cost,
+        "pnl_pct": float(value[-1] / cost - 1) * 100 if cost else 0.0,
+        "returns": port_returns,
+        "rolling_vol": rolling_vol(value, window),
+        "drawdown": dd * 100,
+        "max_drawdown": float(dd.min()) * 100,
+        "cov": cov,
+        "corr": correlation(cov),
+        "weights": weights,
+        "risk_contribution": contrib,
+        "vol": vol * 100,
+        "var": var * 100,
+        "var_abs": var * float(value[-1]),
+        "es": es * 100,
+        "level": level,
+    }
+
+def portfolio_frames(dates, analytics: dict) -> dict:
+    """date/value frames of the path outputs for series_chart, from each one's first defined point."""
+    frames = {}
+    for k in ("value", "pnl", "rolling_vol", "drawdown"):
+        values = analytics[k]
+        first = int(np.argmax(~np.isnan(values)))
+        frames[k] = pd.DataFrame({"date": dates[first:], "value": values[first:]}, copy=False)
+    return frames
+
+def positions_table(tokens, positions: dict, analytics: dict) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Token": list(tokens),
+        "Qty": positions["qty"],
+        "Value": positions["value"],
+        "Weight (%)": analytics["weights"] * 100,
+        "PnL": positions["pnl_abs"],
+        "PnL (%)": positions["pnl_pct"],
+        "Risk share (%)": analytics["risk_contribution"] * 100,
+    }).sort_values("Value", ascending=False, ignore_index=True)
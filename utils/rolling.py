@@ -0,0 +1,125 @@
+import numpy as np
+
+from utils.perf import timed
+
+WINDOWS = (7, 30, 90)
+EWM_SPAN = 30
+VOL_WINDOW = 30
+CHANGE_PERIODS = (30, 7)   # 30D and WoW % change
+PERIODS_PER_YEAR = 365
+
+# All functions take a batch of series with time on the last axis, e.g. a
+# (tokens, metrics, days) block, and never copy per series.
+
+def _pct(latest, prev):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chg = (latest / prev - 1) * 100
+    return np.where(prev == 0, 0.0, chg)
+
+def pct_change(values, periods: int) -> np.ndarray:
+    """% change of the last point vs `periods` points earlier; 0 on short history or a 0 base."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[-1] <= periods:
+        return np.zeros(values.shape[:-1])
+    return _pct(values[..., -1], values[..., -1 - periods])
+
+def last_and_change(values, periods: int):
+    values = np.asarray(values, dtype=np.float64)
+    return values[..., -1], pct_change(values, periods)
+
+def _log_return(prev, cur):
+    # zero/negative points (e.g. "no burn" series) contribute a flat return
+    valid = (prev > 0) & (cur > 0)
+    ratio = np.divide(cur, prev, out=np.ones(np.broadcast(prev, cur).shape), where=valid)
+    return np.log(ratio)
+
+def _ann_vol(s1, s2, w: int):
+    var = np.maximum((s2 - s1 * s1 / w) / (w - 1), 0.0)
+    return np.sqrt(var * PERIODS_PER_YEAR) * 100
+
+def _window_sums(cum, w: int):
+    """Trailing w-point sums from a zero-prefixed cumsum; NaN until the window fills."""
+    out = np.full(cum.shape[:-1] + (cum.shape[-1] - 1,), np.nan)
+    out[..., w - 1:] = cum[..., w:] - cum[..., :-w]
+    return out
+
+def _cumsum0(values):
+    cum = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,))
+    np.cumsum(values, axis=-1, out=cum[..., 1:])
+    return cum
+
+@timed()
+def rolling_stats(values, windows=WINDOWS, span: int = EWM_SPAN, vol_window: int = VOL_WINDOW) -> dict:
+    """Full-length MAs, EWMA and annualized realized vol (%) from one cumsum pass."""
+    values = np.asarray(values, dtype=np.float64)
+    cum = _cumsum0(values)
+    out = {f"ma{w}": _window_sums(cum, w) / w for w in windows}
+
+    alpha = 2 / (span + 1)
+    ewma = np.empty_like(values)
+    ewma[..., 0] = values[..., 0]
+    for t in range(1, values.shape[-1]):
+        ewma[..., t] = alpha * values[..., t] + (1 - alpha) * ewma[..., t - 1]
+    out["ewma"] = ewma
+
+    out[f"vol{vol_window}"] = rolling_vol(values, vol_window)
+    return out
+
+def rolling_vol(values, window: int = VOL_WINDOW) -> np.ndarray:
+    """Full-length annualized realized vol (%) of log returns; NaN until the window fills."""
+    values = np.asarray(values, dtype=np.float64)
+    r = _log_return(values[..., :-1], values[..., 1:])
+    vol = np.full(values.shape, np.nan)
+    vol[..., 1:] = _ann_vol(_window_sums(_cumsum0(r), window), _window_sums(_cumsum0(r * r), window), window)
+    return vol
+
+@timed()
+def latest_stats(values, windows=WINDOWS, span: int = EWM_SPAN, vol_window: int = VOL_WINDOW,
+                 periods=CHANGE_PERIODS) -> dict:
+    """Last-point indicators only (what tiles show): last, MAs, EWMA, vol and % changes."""
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+    out = {"last": values[..., -1]}
+    for w in windows:
+        out[f"ma{w}"] = values[..., -w:].mean(axis=-1) if n >= w else np.full(values.shape[:-1], np.nan)
+
+    # EWMA (adjust=False) in closed form: a dot product with decaying weights
+    alpha = 2 / (span + 1)
+    weights = alpha * (1 - alpha) ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1 - alpha) ** (n - 1)
+    out["ewma"] = values @ weights
+
+    if n > vol_window:
+        r = _log_return(values[..., -vol_window - 1:-1], values[..., -vol_window:])
+        out[f"vol{vol_window}"] = _ann_vol(r.sum(axis=-1), (r * r).sum(axis=-1), vol_window)
+    else:
+        out[f"vol{vol_window}"] = np.full(values.shape[:-1], np.nan)
+
+    for p in periods:
+        out[f"chg_{p}d"] = pct_change(values, p)
+    return out
+
+@timed()
+def rolling_corr(values, window: int = VOL_WINDOW) -> np.ndarray:
+    """Rolling correlation matrix of log returns: (series, dates) -> (series, series, dates).
+
+    All pairs come from one cumsum of return cross-products. NaN until a pair
+    has `window` returns, so NaN-padded (shorter) series simply start later.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    prev, cur = values[:, :-1], values[:, 1:]
+    valid = ~(np.isnan(prev) | np.isnan(cur))
+    r = np.where(valid, _log_return(prev, cur), 0.0)
+
+    s1 = _window_sums(_cumsum0(r), window)                                   # (n, t)
+    s2 = _window_sums(_cumsum0(r[:, None, :] * r[None, :, :]), window)        # (n, n, t)
+    full = _window_sums(_cumsum0(valid.astype(np.float64)), window) == window
+    cov = s2 - s1[:, None, :] * s1[None, :, :] / window
+    var = np.diagonal(cov, axis1=0, axis2=1).T                                # (n, t)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(var[:, None, :] * var[None, :, :])
+    corr = np.where(full[:, None, :] & full[None, :, :], np.clip(corr, -1.0, 1.0), np.nan)
+
+    out = np.full(corr.shape[:-1] + (values.shape[-1],), np.nan)
+    out[..., 1:] = corr
+    return out
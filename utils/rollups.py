@@ -0,0 +1,136 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from utils.figures import PIXEL_WIDTH
+
+RESOLUTIONS = ["D", "W", "M"]   # finest → coarsest
+# rows per view before time_figure downsamples to the pixel width: past two
+# points per pixel a coarser rollup draws the same picture from fewer rows
+MAX_POINTS = 2 * PIXEL_WIDTH
+
+# How a bucket is summarized, per token metric / macro kind
+TOKEN_AGG = {
+    "price": "last",
+    "fdv": "last",
+    "volume": "sum",
+    "circ": "last",
+    "burn": "sum",
+    "fund_fees": "sum",
+    "fund_tvl": "last",
+    "fund_platform_vol": "sum",
+    "fund_mau": "last",
+    "fund_dau": "mean",
+    "fund_share": "mean",
+}
+MACRO_KIND_AGG = {"level": "last", "volume": "sum", "ratio": "mean", "index": "mean"}
+
+def _days(dates) -> np.ndarray:
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+def _bucket_ids(days: np.ndarray, res: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bucket id per point, and the start and (exclusive) end day for each id."""
+    if res == "W":
+        ids = (days + 3) // 7            # Monday-based weeks (1970-01-01 was a Thursday)
+        return ids, ids * 7 - 3, ids * 7 + 4
+    if res == "M":
+        ids = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        month_start = lambda m: m.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+        return ids, month_start(ids), month_start(ids + 1)
+    return days, days, days + 1
+
+def _rollup(days: np.ndarray, cols: dict, agg: str, res: str, step: int = 1):
+    """(bucket dates, {"value": ...}) for one resolution.
+
+    "last" buckets are dated at their last observation, the others at the
+    bucket start. Only the first and last buckets can be partial; for "sum"
+    they are scaled up to the full period, so a half-covered trailing week
+    doesn't draw as a drop.
+    """
+    ids, start_day, end_day = _bucket_ids(days, res)
+    starts = np.r_[0, np.flatnonzero(np.diff(ids)) + 1]
+    ends = np.r_[starts[1:], len(days)]
+    v = cols["value"]
+
+    if agg == "sum":
+        value = np.add.reduceat(v, starts)
+        for b in {0, len(starts) - 1}:
+            lo, hi = start_day[starts[b]], end_day[starts[b]]
+            # a point stands for the `step` days up to it, so only gaps of a whole step are missing data
+            before = days[starts[b]] - (step - 1) - lo
+            after = hi - 1 - days[ends[b] - 1]
+            covered = hi - lo - (before if before >= step else 0) - (after if after >= step else 0)
+            value[b] *= (hi - lo) / covered
+    elif agg == "mean":
+        value = np.add.reduceat(v, starts) / (ends - starts)
+    else:  # last
+        return days[ends - 1], {"value": v[ends - 1]}
+    return start_day[starts], {"value": value}
+
+class Pyramid:
+    """Daily → weekly → monthly rollups of one series over a sorted date index.
+
+    Coarser levels are built on first use: most views fit the base level.
+    """
+
+    def __init__(self, dates, values, agg: str = "last"):
+        self.agg = agg
+        days = _days(dates)
+        cols = {"value": np.asarray(values, dtype=np.float64)}
+
+        # start at the series' own frequency (e.g. weekly macro data has no daily level)
+        self._step = int(np.median(np.diff(days))) if len(days) > 1 else 1
+        base = "D" if self._step < 7 else "W" if self._step < 28 else "M"
+        self.resolutions = RESOLUTIONS[RESOLUTIONS.index(base):]
+        self.levels = {base: (days, cols)}
+        self._lock = threading.Lock()   # pyramids are shared across sessions
+
+    def level(self, res: str):
+        """(days, cols) at resolution `res`, rolled up from the base level once."""
+        if res not in self.resolutions:
+            raise ValueError(f"No {res!r} level over {self.resolutions[0]!r} data")
+        if res not in self.levels:
+            with self._lock:
+                if res not in self.levels:
+                    days, cols = self.levels[self.resolutions[0]]
+                    self.levels[res] = _rollup(days, cols, self.agg, res, self._step)
+        return self.levels[res]
+
+    def _bounds(self, days: np.ndarray, start, end) -> slice:
+        i0 = 0 if start is None else np.searchsorted(days, _days([start])[0], side="left")
+        i1 = len(days) if end is None else np.searchsorted(days, _days([end])[0], side="right")
+        return slice(i0, i1)
+
+    def pick(self, start=None, end=None, max_points: int = MAX_POINTS) -> str:
+        """Finest resolution that keeps the range within max_points."""
+        for res in self.resolutions:
+            days, _ = self.level(res)
+            sl = self._bounds(days, start, end)
+            if sl.stop - sl.start <= max_points:
+                return res
+        return res
+
+    def view(self, start=None, end=None, resolution: str | None = None, max_points: int = MAX_POINTS) -> pd.DataFrame:
+        """Frame with date + value over [start, end]."""
+        res = resolution or self.pick(start, end, max_points)
+        days, cols = self.level(res)
+        sl = self._bounds(days, start, end)
+        data = {"date": days[sl].astype("datetime64[D]").astype("datetime64[ns]"), "value": cols["value"][sl]}
+        return pd.DataFrame(data, copy=False)
+
+# id(frame) -> {agg: Pyramid}; entries are dropped when the frame is collected
+_PYRAMIDS = {}
+_LOCK = threading.Lock()
+
+def pyramid(df: pd.DataFrame, agg: str = "last") -> Pyramid:
+    """Pyramid for a date/value frame, built once per frame and agg."""
+    with _LOCK:
+        per_frame = _PYRAMIDS.get(id(df))
+        if per_frame is None:
+            per_frame = _PYRAMIDS[id(df)] = {}
+            weakref.finalize(df, _PYRAMIDS.pop, id(df), None)
+        if agg not in per_frame:
+            per_frame[agg] = Pyramid(df["date"].to_numpy(), df["value"].to_numpy(), agg)
+        return per_frame[agg]
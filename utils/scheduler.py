@@ -0,0 +1,170 @@
+"""Background refresh of the snapshot store.
+
+Builds a new snapshot version whenever the published one is out of date
+(new day, or older than `interval`), with token batches spread over a
+process pool, then flips the store's CURRENT pointer atomically. Pages
+keep serving the previous version meanwhile and read status.json for
+progress and staleness.
+
+    python -m utils.scheduler <root> [--seed 42] [--workers 4] [--interval 3600] [--once]
+
+or set DASHBOARD_SCHEDULER=1 (with DASHBOARD_SNAPSHOT_DIR) to run it inside
+the Streamlit process.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+from utils.snapshot import CURRENT, MANIFEST, _write_json, publish, resolve, write_snapshot
+
+log = logging.getLogger(__name__)
+
+STATUS = "status.json"
+DEFAULT_INTERVAL = float(os.environ.get("DASHBOARD_REFRESH_INTERVAL", "3600"))   # seconds
+
+def read_status(root: str) -> dict | None:
+    try:
+        with open(os.path.join(root, STATUS)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def store_status() -> dict | None:
+    """Status of the store at DASHBOARD_SNAPSHOT_DIR, for the pages' freshness panel."""
+    root = os.environ.get("DASHBOARD_SNAPSHOT_DIR")
+    return read_status(root) if root else None
+
+class RefreshScheduler:
+    """Keeps a versioned snapshot store at `root` current."""
+
+    def __init__(self, root: str, tokens=None, seed: int = 42, interval: float = DEFAULT_INTERVAL,
+                 workers: int | None = None, batch_size: int = 256, keep: int = 3):
+        self.root = root
+        self.tokens = tokens
+        self.seed = seed
+        self.interval = interval
+        self.workers = workers
+        self.batch_size = batch_size
+        self.keep = keep
+        self._pool = None
+        self._stop = threading.Event()
+        self._thread = None
+        os.makedirs(root, exist_ok=True)
+        self.status = read_status(root) or {"state": "idle"}
+
+    def _set_status(self, **fields):
+        self.status = {**self.status, **fields}
+        _write_json(self.root, STATUS, self.status)
+
+    def _executor(self):
+        if self._pool is None:
+            # imported on first refresh: pages import this module only for ensure_scheduler()
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: forking a process that runs Streamlit's threads isn't safe
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def due(self) -> bool:
+        manifest = os.path.join(resolve(self.root), MANIFEST)
+        if not os.path.exists(os.path.join(self.root, CURRENT)) or not os.path.exists(manifest):
+            return True
+        with open(manifest) as f:
+            as_of = pd.Timestamp(json.load(f)["as_of"])
+        age = time.time() - os.stat(manifest).st_mtime
+        return as_of < pd.Timestamp.today().normalize() or age >= self.interval
+
+    def refresh(self) -> str:
+        """Build and publish a new version; returns its name."""
+        version = f"v{time.strftime('%Y%m%d-%H%M%S')}"
+        path = os.path.join(self.root, version)
+        self._set_status(state="running", building=version, started_at=time.time(), done=0, total=None, error=None)
+        try:
+            manifest = write_snapshot(
+                path, self.tokens, self.seed, executor=self._executor(), batch_size=self.batch_size,
+                progress=lambda done, total: self._set_status(done=done, total=total),
+            )
+        except Exception as e:
+            shutil.rmtree(path, ignore_errors=True)
+            # a worker that died leaves the pool broken for good; start a fresh one next time
+            self._shutdown_pool()
+            self._set_status(state="failed", error=f"{type(e).__name__}: {e}")
+            raise
+        publish(self.root, version)
+        self._set_status(state="idle", version=version, as_of=manifest["as_of"], published_at=time.time(),
+                         tokens=len(manifest["tokens"]), building=None)
+        self._prune(version)
+        return version
+
+    def _prune(self, current: str):
+        # readers with older versions mmapped keep their pages until they reopen
+        versions = sorted(d for d in os.listdir(self.root) if d.startswith("v") and d != current)
+        for old in versions[:max(len(versions) - (self.keep - 1), 0)]:
+            shutil.rmtree(os.path.join(self.root, old), ignore_errors=True)
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                if self.due():
+                    self.refresh()
+            except Exception:
+                log.exception("Snapshot refresh of %s failed; retrying in %ss", self.root, min(self.interval, 60))
+            self._stop.wait(min(self.interval, 60))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="snapshot-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def _shutdown_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stop(self):
+        self._stop.set()
+        self._shutdown_pool()
+
+_SCHEDULER = None
+_LOCK = threading.Lock()
+
+def ensure_scheduler() -> RefreshScheduler | None:
+    """Start the in-process scheduler once, if enabled by DASHBOARD_SCHEDULER=1."""
+    global _SCHEDULER
+    root = os.environ.get("DASHBOARD_SNAPSHOT_DIR")
+    if not root or os.environ.get("DASHBOARD_SCHEDULER") != "1":
+        return None
+    with _LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = RefreshScheduler(root).start()
+        return _SCHEDULER
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep a versioned snapshot store fresh.")
+    parser.add_argument("root")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tokens", help="comma-separated symbols (default: TOKENS_DEFAULT)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument("--once", action="store_true", help="refresh once and exit")
+    args = parser.parse_args(argv)
+    tokens = args.tokens.split(",") if args.tokens else None
+    scheduler = RefreshScheduler(args.root, tokens, args.seed, args.interval, args.workers, args.batch_size)
+    if args.once:
+        version = scheduler.refresh()
+        scheduler.stop()
+        print(f"Published {version} to {args.root}")
+    else:
+        scheduler.run()
+
+if __name__ == "__main__":
+    main()
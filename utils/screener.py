@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+PCT_COLUMNS = ["Price (30D %)", "FDV (30D %)", "Volume 24H (30D %)"]
+PAGE_SIZES = [25, 50, 100, 250]
+
+def filter_mask(summary: pd.DataFrame, query: str = "", unlock_only: bool = False, ranges: dict | None = None) -> np.ndarray:
+    """Boolean row mask: ticker substring, >2% unlock flag and {column: (lo, hi)} bounds."""
+    mask = np.ones(len(summary), dtype=bool)
+    if query:
+        mask &= summary["Token"].str.contains(query.strip().upper(), regex=False).to_numpy(dtype=bool)
+    if unlock_only:
+        mask &= summary["_next_unlock_flag"].to_numpy(dtype=bool)
+    for col, (lo, hi) in (ranges or {}).items():
+        v = summary[col].to_numpy()
+        if lo is not None:
+            mask &= v >= lo
+        if hi is not None:
+            mask &= v <= hi
+    return mask
+
+def top_k(values: np.ndarray, k: int | None = None, descending: bool = True) -> np.ndarray:
+    """Positions of the k best values in order; argpartition first, so only k get sorted."""
+    key = -np.asarray(values, dtype=np.float64) if descending else np.asarray(values, dtype=np.float64)
+    key = np.where(np.isnan(key), np.inf, key)   # NaN last either way
+    if k is not None and k < len(key):
+        part = np.argpartition(key, k - 1)[:k] if k > 0 else np.empty(0, dtype=np.int64)
+        return part[np.argsort(key[part], kind="stable")]
+    return np.argsort(key, kind="stable")
+
+def screen(summary: pd.DataFrame, query: str = "", unlock_only: bool = False, ranges: dict | None = None,
+           sort_by: str | None = None, descending: bool = True, k: int | None = None,
+           mask: np.ndarray | None = None) -> np.ndarray:
+    """Row positions of `summary` that pass the filters (and `mask`), sorted by `sort_by` (None keeps summary order)."""
+    keep = filter_mask(summary, query, unlock_only, ranges)
+    if mask is not None:
+        keep &= mask
+    rows = np.flatnonzero(keep)
+    if sort_by is None:
+        return rows if k is None else rows[:k]
+    return rows[top_k(summary[sort_by].to_numpy()[rows], k, descending)]
+
+def page_slice(n_rows: int, page: int, page_size: int) -> slice:
+    """Rows for a 1-based page, clamped to the last page."""
+    n_pages = max(-(-n_rows // page_size), 1)
+    page = min(max(page, 1), n_pages)
+    return slice((page - 1) * page_size, min(page * page_size, n_rows))
@@ -0,0 +1,304 @@
+"""Columnar on-disk snapshots of the token and macro datasets.
+
+A snapshot directory holds one .npy file per array plus manifest.json:
+
+    tokens.dates.npy    (days,)                  shared daily axis
+    tokens.values.npy   (tokens, metrics, days)  every token×metric path
+    unlock.npy          (tokens, 12)             unlock % of circulating
+    position.npy        (tokens, len(POSITION_KEYS))
+    macro_<g>.dates.npy / macro_<g>.values.npy   one block per date axis
+
+Readers np.load them with mmap_mode="r", so workers on one box share the
+pages through the OS cache and series are zero-copy views.
+
+A versioned store (see utils.scheduler) is a root holding one snapshot
+directory per version plus a CURRENT file naming the published one;
+DASHBOARD_SNAPSHOT_DIR may point at either a store root or a snapshot.
+
+    python -m utils.snapshot <dir> [--seed 42] [--tokens AAVE,LDO]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Mapping
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils.fake_data import MACRO_SERIES, make_series
+from utils.rolling import pct_change
+from utils.tokens_mock import (
+    DAYS,
+    METRICS,
+    SUMMARY_METRICS,
+    TOKENS_DEFAULT,
+    TokenSeries,
+    _date_index,
+    _unlock_months,
+    build_summary,
+    generate_token_arrays,
+)
+
+SNAPSHOT_VERSION = 1
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+# serve a snapshot up to this many days old (e.g. while the next one builds)
+MAX_STALE_DAYS = int(os.environ.get("DASHBOARD_MAX_STALE_DAYS", "1"))
+POSITION_KEYS = ["qty", "cost_basis", "cost_value", "value", "pnl_abs", "pnl_pct"]
+
+# =======================
+# Writer
+# =======================
+def _write_json(path: str, name: str, obj: dict):
+    # renamed into place, so readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=path, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(obj, f, indent=2)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, os.path.join(path, name))
+
+def _write_manifest(path: str, manifest: dict):
+    # written last: a manifest means a complete snapshot
+    _write_json(path, MANIFEST, manifest)
+
+def _write_token_batch(path: str, start: int, tokens, seed: int) -> str:
+    """Fill rows [start, start + len(tokens)) of the preallocated token arrays; returns the as-of date."""
+    stop = start + len(tokens)
+    values = np.lib.format.open_memmap(os.path.join(path, "tokens.values.npy"), mode="r+")
+    unlock = np.lib.format.open_memmap(os.path.join(path, "unlock.npy"), mode="r+")
+    position = np.lib.format.open_memmap(os.path.join(path, "position.npy"), mode="r+")
+
+    # series draw from per-token streams, so batches match a whole-universe build
+    arrays = generate_token_arrays(tokens, seed=seed, alloc=lambda shape: values[start:stop])
+    unlock[start:stop] = arrays["unlock_pct"]
+    position[start:stop] = np.column_stack([arrays["position"][k] for k in POSITION_KEYS])
+    for a in (values, unlock, position):
+        a.flush()
+    return arrays["dates"][-1].date().isoformat()
+
+def _write_macro(path: str, seed: int) -> dict:
+    # macro series sharing a date axis go in one block
+    groups = {}
+    for name, years, freq, kind in MACRO_SERIES:
+        groups.setdefault(f"{years}y_{freq}", []).append((name, years, freq, kind))
+
+    macro = {}
+    for group, specs in groups.items():
+        frames = [make_series(name, years=years, freq=freq, kind=kind, seed=seed) for name, years, freq, kind in specs]
+        np.save(os.path.join(path, f"macro_{group}.dates.npy"), frames[0]["date"].values)
+        np.save(os.path.join(path, f"macro_{group}.values.npy"), np.vstack([f["value"].to_numpy() for f in frames]))
+        for row, (name, years, freq, kind) in enumerate(specs):
+            macro[name] = {"group": group, "row": row, "years": years, "freq": freq, "kind": kind}
+    return macro
+
+def write_snapshot(path: str, tokens=None, seed: int = 42, executor=None, batch_size: int = 256,
+                   progress=None) -> dict:
+    """Write a complete snapshot to `path`.
+
+    With an `executor` (e.g. a ProcessPoolExecutor), token batches and the
+    macro block are built in parallel, each worker writing its own rows of
+    the preallocated arrays. progress(done, total) is called per finished task.
+    """
+    os.makedirs(path, exist_ok=True)
+    tokens = list(TOKENS_DEFAULT if tokens is None else tokens)
+    dates = _date_index(DAYS, "D")
+    unlock_dates = _unlock_months()
+
+    def alloc(name, shape):
+        np.lib.format.open_memmap(os.path.join(path, name), mode="w+", dtype=np.float64, shape=shape).flush()
+
+    alloc("tokens.values.npy", (len(tokens), len(METRICS), len(dates)))
+    alloc("unlock.npy", (len(tokens), len(unlock_dates)))
+    alloc("position.npy", (len(tokens), len(POSITION_KEYS)))
+    np.save(os.path.join(path, "tokens.dates.npy"), dates.values)
+
+    batches = [(i, tokens[i:i + batch_size]) for i in range(0, len(tokens), batch_size)]
+    total = len(batches) + 1
+    if executor is None:
+        as_ofs = []
+        for i, (start, batch) in enumerate(batches):
+            as_ofs.append(_write_token_batch(path, start, batch, seed))
+            if progress:
+                progress(i + 1, total)
+        macro = _write_macro(path, seed)
+    else:
+        futures = [executor.submit(_write_token_batch, path, start, batch, seed) for start, batch in batches]
+        macro_future = executor.submit(_write_macro, path, seed)
+        for done, _ in enumerate(as_completed(futures + [macro_future]), start=1):
+            if progress:
+                progress(done, total)
+        as_ofs = [f.result() for f in futures]
+        macro = macro_future.result()
+
+    as_of = dates[-1].date().isoformat()
+    if any(a != as_of for a in as_ofs):
+        raise RuntimeError("The day rolled over while the snapshot was being written; write it again")
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "seed": seed,
+        "as_of": as_of,
+        "tokens": tokens,
+        "metrics": METRICS,
+        "unlock_dates": [d.date().isoformat() for d in unlock_dates],
+        "macro": macro,
+    }
+    _write_manifest(path, manifest)
+    return manifest
+
+def publish(root: str, version: str):
+    """Atomically point the store at root/<version>."""
+    fd, tmp = tempfile.mkstemp(dir=root, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(version)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, os.path.join(root, CURRENT))
+
+def resolve(path: str) -> str:
+    """Snapshot directory for a store root (via CURRENT) or a plain snapshot path."""
+    try:
+        with open(os.path.join(path, CURRENT)) as f:
+            return os.path.join(path, f.read().strip())
+    except FileNotFoundError:
+        return path
+
+# =======================
+# Reader
+# =======================
+class SnapshotDetails(Mapping):
+    """details[t] backed by memory-mapped arrays; frames are read-only views."""
+
+    def __init__(self, snapshot: "Snapshot"):
+        self._snap = snapshot
+        self._pos = {t: i for i, t in enumerate(snapshot.tokens)}
+        self._built = {}
+        self._built_nbytes = 0
+        self._lock = threading.Lock()
+
+    def __getitem__(self, token):
+        d = self._built.get(token)
+        if d is None:
+            # shared across sessions, like TokenDetails: the first build in wins and is counted
+            built = self._build(token)
+            with self._lock:
+                d = self._built.setdefault(token, built)
+                if d is built:
+                    self._built_nbytes += int(d.unlock.memory_usage().sum())
+        return d
+
+    def __iter__(self):
+        return iter(self._pos)
+
+    def __len__(self):
+        return len(self._pos)
+
+    @property
+    def nbytes(self) -> int:
+        # the blocks are mmapped (OS page cache); only the per-token unlock frames are heap
+        return self._built_nbytes
+
+    @property
+    def dates(self):
+        return self._snap.dates
+
+    def prices(self) -> np.ndarray:
+        return self._snap.values[:, METRICS.index("price")]
+
+    def positions(self) -> dict:
+        return dict(zip(POSITION_KEYS, self._snap.position.T))
+
+    def _build(self, token):
+        snap = self._snap
+        i = self._pos[token]
+        unlock = pd.DataFrame({"date": snap.unlock_dates, "unlock_pct_of_circ": snap.unlock[i]}, copy=False)
+        return TokenSeries(token, snap.dates, snap.values[i], unlock, dict(zip(POSITION_KEYS, map(float, snap.position[i]))))
+
+class Snapshot:
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {self.manifest.get('version')}")
+
+        self.seed = self.manifest["seed"]
+        self.as_of = pd.Timestamp(self.manifest["as_of"])
+        self.tokens = self.manifest["tokens"]
+        self.dates = pd.DatetimeIndex(self._load("tokens.dates.npy"))
+        self.values = self._load("tokens.values.npy")
+        self.unlock = self._load("unlock.npy")
+        self.position = self._load("position.npy")
+        self.unlock_dates = pd.DatetimeIndex(self.manifest["unlock_dates"])
+        self._macro_blocks = {}
+        self._summary = None
+        self._details = None
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, name), mmap_mode="r")
+
+    def fresh(self, as_of, max_stale_days: int = MAX_STALE_DAYS) -> bool:
+        return 0 <= (pd.Timestamp(as_of) - self.as_of).days <= max_stale_days
+
+    def matches(self, tokens, seed: int, as_of) -> bool:
+        return list(tokens) == self.tokens and seed == self.seed and self.fresh(as_of)
+
+    def token_dataset(self):
+        if self._summary is None:
+            cols = [METRICS.index(m) for m in SUMMARY_METRICS]
+            deltas = pct_change(self.values[:, cols, -31:], 30)
+            self._summary = build_summary(self.tokens, deltas, self.unlock, self.unlock_dates)
+            self._details = SnapshotDetails(self)
+        return self._summary, self._details
+
+    def has_series(self, name: str, years: int, freq: str, kind: str, seed: int) -> bool:
+        spec = self.manifest["macro"].get(name)
+        return (
+            spec is not None and seed == self.seed
+            and (spec["years"], spec["freq"], spec["kind"]) == (years, freq, kind)
+        )
+
+    def series(self, name: str) -> pd.DataFrame:
+        spec = self.manifest["macro"][name]
+        group = spec["group"]
+        if group not in self._macro_blocks:
+            self._macro_blocks[group] = (
+                pd.DatetimeIndex(self._load(f"macro_{group}.dates.npy")),
+                self._load(f"macro_{group}.values.npy"),
+            )
+        dates, values = self._macro_blocks[group]
+        return pd.DataFrame({"date": dates, "value": values[spec["row"]]}, copy=False)
+
+_OPEN = {}
+
+def open_snapshot(path: str) -> Snapshot | None:
+    """Open (and memoize per published version) the snapshot at `path`, if any."""
+    target = resolve(path)
+    try:
+        mtime = os.stat(os.path.join(target, MANIFEST)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    # one entry per path, so superseded versions (and their mmaps) are released
+    snap = _OPEN.get(path)
+    if snap is None or snap[:2] != (target, mtime):
+        snap = _OPEN[path] = (target, mtime, Snapshot(target))
+    return snap[2]
+
+def current_snapshot() -> Snapshot | None:
+    path = os.environ.get("DASHBOARD_SNAPSHOT_DIR")
+    return open_snapshot(path) if path else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a columnar dataset snapshot.")
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tokens", help="comma-separated symbols (default: TOKENS_DEFAULT)")
+    args = parser.parse_args(argv)
+    tokens = args.tokens.split(",") if args.tokens else None
+    manifest = write_snapshot(args.path, tokens=tokens, seed=args.seed)
+    print(f"Wrote {len(manifest['tokens'])} tokens as of {manifest['as_of']} to {args.path}")
+
+if __name__ == "__main__":
+    main()
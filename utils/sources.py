@@ -0,0 +1,353 @@
+"""Pluggable data sources behind the dashboard's mock generators.
+
+Every source answers `await source.fetch(key)` / `fetch_many(keys)`, and
+feeds also `fetch_since(key, cursor)` for incremental updates. The
+mock sources wrap the existing generators; HTTP sources share a pooled
+httpx client per source and add rate limiting, retries with backoff,
+per-source timeouts and request coalescing (concurrent fetches of one key
+share a single in-flight request).
+
+Pages call the sync helpers fetch() / fetch_many(), which run on one
+background event loop shared by every session in the process, so
+coalescing and connection pools work across sessions. Live sources are
+opted into per name, e.g.
+
+    DASHBOARD_LIVE_SOURCES=governance,news CRYPTOPANIC_TOKEN=... streamlit run app.py
+
+and base URLs can be pointed at a local stub server with
+SNAPSHOT_URL / CRYPTOPANIC_URL.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+
+import pandas as pd
+
+from utils.fake_data import make_panel, make_series
+from utils.token_news_mock import get_mock_governance, get_mock_news
+from utils.tokens_mock import generate_token_dataset
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RUN_TIMEOUT = float(os.environ.get("DASHBOARD_SOURCE_TIMEOUT", "60"))   # seconds per sync call, retries included
+
+class SourceError(RuntimeError):
+    pass
+
+def _describe(e) -> str:
+    """httpx error without the request URL's query string (it can carry an API key)."""
+    try:
+        request = e.request
+    except RuntimeError:
+        return type(e).__name__
+    url = request.url.copy_with(query=None)
+    if hasattr(e, "response"):
+        return f"HTTP {e.response.status_code} from {request.method} {url}"
+    return f"{type(e).__name__} on {request.method} {url}"
+
+class DataSource:
+    """Fetches one kind of data keyed by token (or series spec)."""
+
+    name = ""
+    changed_column = None   # feeds: rows on/after the cursor's day here are new or updated
+
+    async def fetch(self, key):
+        raise NotImplementedError
+
+    async def fetch_since(self, key, since=None):
+        """Rows new or changed since the `since` cursor. Re-sends the cursor's whole day,
+        so callers dedupe; sources without a query for it fetch everything and filter."""
+        items = await self.fetch(key)
+        if since is None or self.changed_column is None:
+            return items
+        return items[items[self.changed_column] >= pd.Timestamp(since).normalize()]
+
+    async def fetch_many(self, keys) -> dict:
+        keys = list(keys)
+        return dict(zip(keys, await asyncio.gather(*(self.fetch(k) for k in keys))))
+
+    async def aclose(self):
+        pass
+
+# =======================
+# Mock sources (current generators)
+# =======================
+class MockGovernanceSource(DataSource):
+    name = "governance"
+    changed_column = "end"   # a proposal's status can only change until it ends
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+
+    async def fetch(self, token):
+        return get_mock_governance(token, seed=self.seed)
+
+class MockNewsSource(DataSource):
+    name = "news"
+    changed_column = "date"
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+
+    async def fetch(self, token):
+        return get_mock_news(token, seed=self.seed)
+
+    async def fetch_since(self, token, since=None):
+        since = None if since is None else pd.Timestamp(since).normalize()
+        return get_mock_news(token, seed=self.seed, since=since)
+
+class MockMacroSource(DataSource):
+    """key: (name, years, freq, kind) as in fake_data.MACRO_SERIES."""
+
+    name = "macro"
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+
+    async def fetch(self, spec):
+        name, years, freq, kind = spec
+        return make_series(name, years=years, freq=freq, kind=kind, seed=self.seed)
+
+    async def fetch_many(self, specs) -> dict:
+        # one date index per frequency instead of one per series
+        specs = [tuple(s) for s in specs]
+        panel = make_panel(specs, seed=self.seed)
+        return {spec: panel[spec[0]] for spec in specs}
+
+class MockTokenSource(DataSource):
+    """key: token; values are the token's details (TokenSeries)."""
+
+    name = "tokens"
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+
+    async def fetch(self, token):
+        return (await self.fetch_many([token]))[token]
+
+    async def fetch_many(self, tokens) -> dict:
+        # the generator is batched: one call for the whole universe
+        _, details = generate_token_dataset(list(tokens), seed=self.seed)
+        return {t: details[t] for t in details}
+
+# =======================
+# HTTP sources
+# =======================
+class RateLimiter:
+    """Token bucket: `rate` requests per second with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class HttpSource(DataSource):
+    """Pooled async HTTP source; subclasses build the request and parse the payload."""
+
+    base_url = ""
+    timeout = 10.0          # seconds per attempt
+    rate = 5.0              # requests per second
+    burst = 5
+    retries = 3
+    backoff = 0.5           # seconds, doubled per retry (with jitter)
+    max_connections = 10
+
+    def __init__(self, base_url: str | None = None, timeout: float | None = None, rate: float | None = None,
+                 retries: int | None = None):
+        self.base_url = base_url or self.base_url
+        self.timeout = self.timeout if timeout is None else timeout
+        self.rate = self.rate if rate is None else rate
+        self.retries = self.retries if retries is None else retries
+        self.requests = 0   # attempts actually sent, for stats / tests
+        self._client = None
+        self._limiter = None
+        self._inflight = {}
+
+    def request(self, key) -> tuple[str, str, dict]:
+        """(method, path, httpx request kwargs) for key."""
+        raise NotImplementedError
+
+    def parse(self, key, payload):
+        raise NotImplementedError
+
+    def _ensure_client(self):
+        # created lazily so the client and limiter bind to the running loop;
+        # httpx is imported here too, so mock-only processes never load it
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            )
+            self._limiter = RateLimiter(self.rate, self.burst)
+        return self._client
+
+    async def fetch(self, key):
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch(key))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller giving up doesn't cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key):
+        import httpx
+
+        client = self._ensure_client()
+        method, path, kwargs = self.request(key)
+        for attempt in range(self.retries + 1):
+            await self._limiter.acquire()
+            self.requests += 1
+            try:
+                resp = await client.request(method, path, **kwargs)
+                resp.raise_for_status()
+                break
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in RETRY_STATUS
+                if not retryable or attempt == self.retries:
+                    # not chained: the original's message and traceback show the full URL
+                    raise SourceError(f"{self.name} {key!r}: {_describe(e)}") from None
+            await asyncio.sleep(self.backoff * 2**attempt * (0.5 + random.random()))
+        try:
+            return self.parse(key, resp.json())
+        except (ValueError, TypeError, KeyError, AttributeError, IndexError):
+            # a well-formed response with the wrong body won't get better on retry
+            raise SourceError(f"{self.name} {key!r}: bad payload") from None
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+class SnapshotGovernanceSource(HttpSource):
+    """Proposals from the Snapshot GraphQL hub, for tokens with a known space."""
+
+    name = "governance"
+    changed_column = "end"
+    base_url = os.environ.get("SNAPSHOT_URL", "https://hub.snapshot.org")
+    SPACES = {"AAVE": "aave.eth", "LDO": "lido-snapshot.eth", "ENA": "ethenagovernance.eth", "PENDLE": "pendle.eth"}
+    QUERY = """query($space: String!, $first: Int!) {
+      proposals(first: $first, where: {space: $space}, orderBy: "created", orderDirection: desc) {
+        id title state start end
+      }
+    }"""
+    STATUS = {"active": "Active", "closed": "Closed", "pending": "Pending"}
+
+    async def fetch(self, token):
+        if token not in self.SPACES:
+            return self.parse(token, {"data": {"proposals": []}})
+        return await super().fetch(token)
+
+    def request(self, token):
+        return "POST", "/graphql", {"json": {"query": self.QUERY, "variables": {"space": self.SPACES[token], "first": 10}}}
+
+    def parse(self, token, payload):
+        rows = [
+            {
+                "id": p.get("id"),
+                "title": p.get("title", ""),
+                "type": "Snapshot",
+                "status": self.STATUS.get(p.get("state"), str(p.get("state", "-")).title()),
+                "start": pd.to_datetime(p.get("start"), unit="s"),
+                "end": pd.to_datetime(p.get("end"), unit="s"),
+                "impact": "-",
+            }
+            for p in (payload.get("data") or {}).get("proposals") or []
+        ]
+        return pd.DataFrame(rows, columns=["id", "title", "type", "status", "start", "end", "impact"])
+
+class CryptoPanicNewsSource(HttpSource):
+    """Headlines per currency from the CryptoPanic API (needs CRYPTOPANIC_TOKEN)."""
+
+    name = "news"
+    changed_column = "date"
+    base_url = os.environ.get("CRYPTOPANIC_URL", "https://cryptopanic.com/api/developer/v2")
+    rate = 2.0
+    burst = 2
+
+    def __init__(self, auth_token: str | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.auth_token = auth_token or os.environ.get("CRYPTOPANIC_TOKEN", "")
+
+    def request(self, token):
+        return "GET", "/posts/", {"params": {"auth_token": self.auth_token, "currencies": token, "public": "true"}}
+
+    def parse(self, token, payload):
+        rows = [
+            {
+                "id": p.get("id"),
+                "date": pd.to_datetime(p.get("published_at"), utc=True).tz_localize(None),
+                "headline": p.get("title", ""),
+                "source": (p.get("source") or {}).get("title", "-"),
+                "category": str(p.get("kind", "Other")).title(),
+            }
+            for p in payload.get("results") or []
+        ]
+        return pd.DataFrame(rows, columns=["id", "date", "headline", "source", "category"])
+
+# =======================
+# Registry + shared event loop
+# =======================
+LIVE_SOURCES = {"governance": SnapshotGovernanceSource, "news": CryptoPanicNewsSource}
+MOCK_SOURCES = {"governance": MockGovernanceSource, "news": MockNewsSource, "macro": MockMacroSource, "tokens": MockTokenSource}
+
+class SourceRunner:
+    """Background thread running the event loop every source lives on."""
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+        self._sources = {}
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="data-sources", daemon=True).start()
+            return self._loop
+
+    def run(self, coro, timeout: float | None = RUN_TIMEOUT):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise SourceError(f"no answer within {timeout:g}s") from None
+
+    def source(self, name: str) -> DataSource:
+        with self._lock:
+            if name not in self._sources:
+                live = {s.strip() for s in os.environ.get("DASHBOARD_LIVE_SOURCES", "").split(",") if s.strip()}
+                self._sources[name] = (LIVE_SOURCES if name in live else MOCK_SOURCES)[name]()
+            return self._sources[name]
+
+    def register(self, name: str, source: DataSource):
+        with self._lock:
+            self._sources[name] = source
+
+RUNNER = SourceRunner()
+
+def fetch(name: str, key):
+    return RUNNER.run(RUNNER.source(name).fetch(key))
+
+def fetch_many(name: str, keys) -> dict:
+    return RUNNER.run(RUNNER.source(name).fetch_many(keys))
+
+def fetch_since(name: str, key, since=None):
+    return RUNNER.run(RUNNER.source(name).fetch_since(key, since))
@@ -0,0 +1,213 @@
+"""Cold start: warm-up, readiness and time to first render.
+
+The first render in a fresh worker pays for importing pandas and the
+dashboard modules, generating the default datasets, building their figures
+and Streamlit's first Arrow/Plotly serialization. warm_up() does all of
+that ahead of time, into the same process-wide caches the pages read.
+
+    python -m utils.startup app.py --server.port 8501
+
+runs the dashboard like `streamlit run`, with warm-up started in the server
+process before the first session arrives. Under plain `streamlit run`, the
+first session's ensure_warmup() starts it in the background instead, so
+the sessions after it find the caches warm. DASHBOARD_WARMUP=0 turns it off.
+
+Readiness: is_ready() / wait_ready(), a sidebar notice while warming
+(ui.warmup_notice), and with DASHBOARD_READY_FILE set, a JSON status file
+written once warm-up is done or a first page render completes, whichever
+comes first. Point the deployment's readiness probe at it
+(`test -f "$DASHBOARD_READY_FILE"`) and a rolling restart keeps traffic on
+the old workers until the new one is warm.
+
+Time to first render is tracked per process (from process start to the end
+of its first completed page render) and per session (its first page render,
+start to end); see warmup_status(), which the status file also carries.
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+ENABLED = os.environ.get("DASHBOARD_WARMUP", "1") != "0"
+READY_FILE = os.environ.get("DASHBOARD_READY_FILE")
+DEFAULT_SEED = 42
+
+def process_start() -> float:
+    """Wall-clock start of this process (from /proc on Linux, else roughly now)."""
+    try:
+        with open("/proc/self/stat") as f:
+            started = int(f.read().rsplit(")", 1)[1].split()[19]) / os.sysconf("SC_CLK_TCK")
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - (uptime - started)
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+PROCESS_START = process_start()
+
+_LOCK = threading.Lock()
+_READY = threading.Event()
+_THREAD = None
+_STATE = {"state": "idle"}      # idle -> warming -> ready | failed | off
+_FIRST_RENDER = {}              # the process's first completed render
+_SESSION_RENDERS = deque(maxlen=1000)   # seconds to each session's first render
+
+# =======================
+# Warm-up
+# =======================
+def _warm_imports():
+    # what the first render would otherwise import or initialise on the spot
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    for name in ("utils.cache", "utils.feed", "utils.monitor", "utils.portfolio", "utils.screener", "utils.ui"):
+        importlib.import_module(name)
+    from utils.charts import bar_figure, heatmap_figure, time_figure
+
+    frame = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=3), "value": [1.0, 2.0, 3.0]})
+    for fig in (time_figure(frame["date"], frame["value"]), bar_figure(frame, "date", "value"),
+                heatmap_figure([[1.0]], ["x"]), go.Figure(go.Scattergl(x=[0], y=[0]))):
+        fig.to_json()
+    try:
+        import pyarrow as pa
+        pa.Table.from_pandas(frame)
+    except ImportError:
+        pass
+
+def _warm_tokens(seed: int):
+    from utils.cache import cached_token_dataset, data_version
+    from utils.charts import series_figure
+    from utils.feed import FEEDS
+    from utils.monitor import alert_monitor
+    from utils.rollups import TOKEN_AGG
+
+    summary, details = cached_token_dataset(seed=seed)
+    # the Tokens page opens on the first token, at its default 1Y range
+    token = summary["Token"].iloc[0]
+    d = details[token]
+    for metric, agg in TOKEN_AGG.items():
+        series_figure(d[metric], agg, "1Y", "area" if metric == "volume" else "line", (token, metric, seed, data_version()))
+    alert_monitor(seed=seed).latest()
+    for kind in ("governance", "news"):
+        FEEDS.sync(kind, token)
+
+def _warm_macro(seed: int):
+    from utils.cache import cached_macro, data_version
+    from utils.charts import series_figure
+    from utils.fake_data import MACRO_SERIES
+    from utils.rollups import MACRO_KIND_AGG
+
+    panel = cached_macro(MACRO_SERIES, seed=seed)
+    for name, _, _, kind in MACRO_SERIES:
+        series_figure(panel[name], MACRO_KIND_AGG[kind], "All", "area" if kind == "volume" else "line",
+                      (name, seed, data_version()))
+
+def _warm_portfolio(seed: int):
+    from utils.cache import cached_portfolio
+    cached_portfolio(seed=seed)
+
+STEPS = [
+    ("imports", lambda seed: _warm_imports()),
+    ("tokens", _warm_tokens),
+    ("macro", _warm_macro),
+    ("portfolio", _warm_portfolio),
+]
+
+def warm_up(seed: int = DEFAULT_SEED) -> dict:
+    """Prime every page's default view; returns seconds per step."""
+    steps = {}
+    for name, step in STEPS:
+        t = time.perf_counter()
+        step(seed)
+        steps[name] = round(time.perf_counter() - t, 4)
+    return steps
+
+def _run(seed: int):
+    started = time.time()
+    _STATE.update(state="warming", started_at=started)
+    try:
+        steps = warm_up(seed)
+        _STATE.update(state="ready", steps=steps)
+    except Exception as e:
+        # pages still compute on demand; readiness must not wait on a broken warm-up
+        _STATE.update(state="failed", error=f"{type(e).__name__}: {e}")
+    _STATE.update(warmup_s=round(time.time() - started, 4), ready_s=round(time.time() - PROCESS_START, 4))
+    _mark_ready()
+
+def _write_status():
+    if READY_FILE:
+        from utils.snapshot import _write_json
+        _write_json(os.path.dirname(os.path.abspath(READY_FILE)), os.path.basename(READY_FILE), warmup_status())
+
+def _mark_ready():
+    _READY.set()
+    _write_status()
+
+def ensure_warmup(seed: int = DEFAULT_SEED) -> threading.Thread | None:
+    """Start the background warm-up once per process (no-op with DASHBOARD_WARMUP=0)."""
+    global _THREAD
+    with _LOCK:
+        if _THREAD is not None or _READY.is_set():
+            return _THREAD
+        if READY_FILE and os.path.exists(READY_FILE):
+            os.remove(READY_FILE)   # left by the previous process
+        if not ENABLED:
+            _STATE.update(state="off")
+            _mark_ready()
+            return None
+        _THREAD = threading.Thread(target=_run, args=(seed,), name="dashboard-warmup", daemon=True)
+        _THREAD.start()
+        return _THREAD
+
+def is_ready() -> bool:
+    return _READY.is_set()
+
+def wait_ready(timeout: float | None = None) -> bool:
+    return _READY.wait(timeout)
+
+# =======================
+# Time to first render
+# =======================
+def record_first_render(page: str, started: float):
+    """A session's first render finished; `started` is time.time() when its first run began."""
+    now = time.time()
+    _SESSION_RENDERS.append(now - started)
+    with _LOCK:
+        if _FIRST_RENDER:
+            return
+        _FIRST_RENDER.update(page=page, since_start_s=round(now - PROCESS_START, 4),
+                             render_s=round(now - started, 4), warm=is_ready())
+    # a finished render means this process serves pages, even if warm-up is off, never
+    # started or still running; it also puts the metric in the status file
+    _mark_ready()
+
+def _quantile(values: list, q: float) -> float:
+    return round(sorted(values)[int(q * (len(values) - 1))], 4)
+
+def warmup_status() -> dict:
+    """Warm-up state and timings plus the time-to-first-render metrics, JSON-ready."""
+    renders = list(_SESSION_RENDERS)
+    status = {**_STATE, "ready": is_ready(), "pid": os.getpid(), "process_start": PROCESS_START,
+              "first_render": dict(_FIRST_RENDER) or None, "sessions": len(renders)}
+    if renders:
+        status["session_first_render_s"] = {"p50": _quantile(renders, 0.5), "p90": _quantile(renders, 0.9),
+                                            "max": _quantile(renders, 1.0)}
+    return status
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print("usage: python -m utils.startup <app.py> [streamlit run options]")
+        return
+    # through the imported module, not __main__: the pages read its state
+    from streamlit.web import cli
+    from utils import startup
+
+    startup.ensure_warmup()
+    sys.argv = ["streamlit", "run", *argv]
+    sys.exit(cli.main())
+
+if __name__ == "__main__":
+    main()
@@ -2,43 +2,76 @@ import pandas as pd
 from datetime import datetime, timedelta
 import random
 
-def get_mock_governance(token: str) -> pd.DataFrame:
-    today = datetime.today()
-
-    data = [
-        {
-            "title": f"{token} Proposal #{i}",
-            "type": random.choice(["Parameter Change", "Treasury", "Protocol Upgrade"]),
-            "status": random.choice(["Active", "Passed", "Rejected"]),
-            "start": today - timedelta(days=random.randint(10, 40)),
-            "end": today + timedelta(days=random.randint(3, 14)),
-            "impact": random.choice(["High", "Medium", "Low"]),
-        }
-        for i in range(1, 6)
-    ]
-
-    return pd.DataFrame(data)
-
-
-def get_mock_news(token: str) -> pd.DataFrame:
-    today = datetime.today()
-
-    categories = [
-        "Partnership",
-        "Listing",
-        "Product Update",
-        "Security",
-        "Regulation",
-    ]
-
-    data = [
-        {
-            "date": today - timedelta(days=random.randint(0, 30)),
-            "headline": f"{token} announces {random.choice(categories)} update",
-            "source": random.choice(["Twitter", "Blog", "CoinDesk", "The Block"]),
-            "category": random.choice(categories),
-        }
-        for _ in range(8)
-    ]
-
-    return pd.DataFrame(data)
+from utils.hashing import stable_seed
+
+CATEGORIES = [
+    "Partnership",
+    "Listing",
+    "Product Update",
+    "Security",
+    "Regulation",
+]
+GOV_COLUMNS = ["id", "title", "type", "status", "start", "end", "impact"]
+NEWS_COLUMNS = ["id", "date", "headline", "source", "category"]
+
+GOV_LOOKBACK_DAYS = 60
+NEWS_LOOKBACK_DAYS = 30
+_EPOCH = datetime(2024, 1, 1)
+
+def _today() -> datetime:
+    return datetime.combine(datetime.today().date(), datetime.min.time())
+
+def _day_rng(token: str, kind: str, day: datetime, seed: int) -> random.Random:
+    # one stream per token-day: past days never change, each new day adds items
+    return random.Random(stable_seed(token, kind, day.date().isoformat(), seed))
+
+def get_mock_governance(token: str, seed: int = 42, today=None) -> pd.DataFrame:
+    today = _today() if today is None else today
+
+    data = []
+    for back in range(GOV_LOOKBACK_DAYS, -1, -1):
+        start = today - timedelta(days=back)
+        rng = _day_rng(token, "governance", start, seed)
+        if rng.random() >= 0.1:
+            continue
+        end = start + timedelta(days=rng.randint(3, 14))
+        outcome = rng.choice(["Passed", "Rejected"])
+        data.append({
+            "id": f"{token}-gov-{start:%Y%m%d}",
+            "title": f"{token} Proposal #{(start - _EPOCH).days}",
+            "type": rng.choice(["Parameter Change", "Treasury", "Protocol Upgrade"]),
+            "status": "Active" if end >= today else outcome,   # same id, status moves on
+            "start": start,
+            "end": end,
+            "impact": rng.choice(["High", "Medium", "Low"]),
+        })
+
+    return pd.DataFrame(data, columns=GOV_COLUMNS)
+
+
+def get_mock_news(token: str, seed: int = 42, since=None, today=None) -> pd.DataFrame:
+    """Headlines from the last NEWS_LOOKBACK_DAYS, only those on or after `since` if given."""
+    today = _today() if today is None else today
+    first = today - timedelta(days=NEWS_LOOKBACK_DAYS)
+    if since is not None:
+        first = max(first, datetime.combine(pd.Timestamp(since).date(), datetime.min.time()))
+
+    data = []
+    day = first
+    while day <= today:
+        rng = _day_rng(token, "news", day, seed)
+        for k in range(rng.choices([0, 1, 2], weights=[0.7, 0.2, 0.1])[0]):
+            category = rng.choice(CATEGORIES)
+            data.append({
+                "id": f"{token}-news-{day:%Y%m%d}-{k}",
+                "date": day + timedelta(minutes=rng.randint(0, 24 * 60 - 1)),
+                "headline": f"{token} announces {category} update",
+                "source": rng.choice(["Twitter", "Blog", "CoinDesk", "The Block"]),
+                "category": category,
+            })
+        day += timedelta(days=1)
+
+    news = pd.DataFrame(data, columns=NEWS_COLUMNS)
+    if since is not None:
+        news = news[news["date"] >= pd.Timestamp(since)]
+    return news
@@ -1,155 +1,369 @@
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+
 import numpy as np
 import pandas as pd
 
+from utils.alerts import UNLOCK_RULE, evaluate
+from utils.hashing import stable_seed
+from utils.perf import timed
+from utils.rolling import pct_change
+
 TOKENS_DEFAULT = [
     "AAVE","LDO","SQD","ENA","PENDLE","TON","SKY","HYPE","COMP","SNX","DYDX","PUMP","CANTON","POL","ARC"
 ]
 
+DAYS = 365
+
+def _ticker(i: int) -> str:
+    # AAA, AAB, ... ZZZ, AAAA, ... (bijective base 26, at least 3 letters)
+    i += 26**2 + 26
+    letters = ""
+    while i >= 0:
+        i, r = divmod(i, 26)
+        letters = chr(65 + r) + letters
+        i -= 1
+    return letters
+
+def token_universe(n: int | None = None) -> list[str]:
+    """TOKENS_DEFAULT padded with synthetic tickers up to n tokens (for screener load)."""
+    if n is None or n <= len(TOKENS_DEFAULT):
+        return TOKENS_DEFAULT[:n]
+    taken = set(TOKENS_DEFAULT)
+    out = list(TOKENS_DEFAULT)
+    i = 0
+    while len(out) < n:
+        t = _ticker(i)
+        if t not in taken:
+            out.append(t)
+        i += 1
+    return out
+
+# Daily trend series per token: (detail key, rng salt, vol, base range, drift range)
+_TREND_SPECS = [
+    ("price",             "price",   0.03,  (0.2, 300),     (-0.001, 0.003)),
+    ("fdv",               "fdv",     0.02,  (200e6, 80e9),  (-0.001, 0.002)),
+    ("volume",            "vol",     0.06,  (5e6, 3e9),     (-0.002, 0.002)),   # spiky
+    ("circ",              "circ",    0.005, (20e6, 3e9),    (0.0001, 0.001)),   # slow increase
+    ("burn",              "burn",    0.08,  (0, 2e6),       (-0.003, 0.002)),   # can be 0 for some tokens
+    ("fund_fees",         "fees",    0.07,  (1e4, 2e7),     (-0.001, 0.004)),
+    ("fund_tvl",          "tvl",     0.04,  (1e7, 3e10),    (-0.002, 0.003)),
+    ("fund_platform_vol", "platvol", 0.06,  (1e6, 2e10),    (-0.002, 0.004)),
+    ("fund_mau",          "mau",     0.03,  (2e4, 2e7),     (-0.001, 0.002)),
+    ("fund_dau",          "dau",     0.03,  (5e3, 5e6),     (-0.001, 0.002)),
+    ("fund_share",        "share",   0.02,  (0.01, 0.35),   (-0.001, 0.001)),   # 0~1
+]
+METRICS = [spec[0] for spec in _TREND_SPECS]
+_M = {m: j for j, m in enumerate(METRICS)}
+SUMMARY_METRICS = ["price", "fdv", "volume"]
+DETAIL_KEYS = METRICS[:_M["burn"] + 1] + ["unlock"] + METRICS[_M["fund_fees"]:]
+
 def _rng(seed: int, salt: str):
-    return np.random.default_rng(abs(hash((seed, salt))) % (2**32))
+    return np.random.default_rng(stable_seed(seed, salt))
 
 def _date_index(days: int, freq: str = "D"):
     end = pd.Timestamp.today().normalize()
     start = end - pd.Timedelta(days=days)
     return pd.date_range(start=start, end=end, freq=freq)
 
-def _series_trend(seed: int, name: str, days: int, base: float, vol: float, drift: float):
-    r = _rng(seed, name)
-    idx = _date_index(days, "D")
-    noise = r.normal(0, vol, len(idx))
-    vals = base * np.exp(np.cumsum(drift + noise))
-    return pd.DataFrame({"date": idx, "value": vals})
-
-def _pct_change_30d(series_df: pd.DataFrame) -> float:
-    df = series_df.dropna()
-    if len(df) < 31:
-        return 0.0
-    latest = df["value"].iloc[-1]
-    prev = df["value"].iloc[-31]
-    if prev == 0:
-        return 0.0
-    return (latest / prev - 1) * 100
-
-def generate_token_dataset(tokens=None, seed: int = 42):
-    if tokens is None:
-        tokens = TOKENS_DEFAULT
+def _unlock_months(today=None):
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today).normalize()
+    return pd.date_range(today + pd.offsets.MonthBegin(1), periods=12, freq="MS")
+
+# =======================
+# Batch engine
+# =======================
+# (metrics, [base, drift]) lower and upper bounds, drawn in one call per token
+_PARAM_LO = np.array([(spec[3][0], spec[4][0]) for spec in _TREND_SPECS])
+_PARAM_HI = np.array([(spec[3][1], spec[4][1]) for spec in _TREND_SPECS])
+
+def _token_params(r, n: int):
+    """Draw one token's scalar inputs from its rng (the draw order defines the dataset)."""
+    base, drift = r.uniform(_PARAM_LO, _PARAM_HI).T.copy()
+
+    # volume spikes as a multiplier path
+    spike_mult = np.ones(n)
+    spike_mask = r.random(n) < 0.08
+    spike_mult[spike_mask] = r.uniform(1.5, 5.0, spike_mask.sum())
+
+    burn_off = base[_M["burn"]] < 2e5  # show “no burn” behavior for some
+    base[_M["burn"]] = max(1.0, base[_M["burn"]] + 1.0)
+
+    # PnL inputs (mock)
+    cost_mult = r.uniform(0.6, 1.4)
+    qty = r.uniform(100, 20000)
+
+    # unlock % of circulating (0%~6%), monthly next 12 months
+    unlock_pct = np.clip(r.normal(1.2, 1.0, 12), 0, 6)
+
+    return base, drift, spike_mult, burn_off, cost_mult, qty, unlock_pct
 
-    # store per-token details
-    details = {}
-    summary_rows = []
-
-    for t in tokens:
-        r = _rng(seed, t)
-
-        # Price (daily 1Y)
-        price_base = r.uniform(0.2, 300)
-        price = _series_trend(seed, f"{t}_price", days=365, base=price_base, vol=0.03, drift=r.uniform(-0.001, 0.003))
-
-        # FDV (daily 1Y) – correlate with price
-        fdv_base = r.uniform(200e6, 80e9)
-        fdv = _series_trend(seed, f"{t}_fdv", days=365, base=fdv_base, vol=0.02, drift=r.uniform(-0.001, 0.002))
-
-        # 24H Volume (daily 1Y) – spiky
-        vol_base = r.uniform(5e6, 3e9)
-        volume = _series_trend(seed, f"{t}_vol", days=365, base=vol_base, vol=0.06, drift=r.uniform(-0.002, 0.002))
-        # add spikes
-        spike_mask = r.random(len(volume)) < 0.08
-        volume.loc[spike_mask, "value"] *= r.uniform(1.5, 5.0, spike_mask.sum())
-
-        # Circulating supply (daily 1Y) – slow increase
-        circ_base = r.uniform(20e6, 3e9)
-        circ = _series_trend(seed, f"{t}_circ", days=365, base=circ_base, vol=0.005, drift=r.uniform(0.0001, 0.001))
-
-        # Burning (daily 1Y) – can be 0 for some tokens
-        burn_base = r.uniform(0, 2e6)
-        burn = _series_trend(seed, f"{t}_burn", days=365, base=max(1.0, burn_base + 1.0), vol=0.08, drift=r.uniform(-0.003, 0.002))
-        if burn_base < 2e5:
-            burn["value"] *= 0.0  # show “no burn” behavior for some
-
-        # PnL inputs (mock)
-        cost_basis = float(price["value"].iloc[-1] * r.uniform(0.6, 1.4))
-        position_qty = float(r.uniform(100, 20000))
-        position_value = float(price["value"].iloc[-1] * position_qty)
-        cost_value = float(cost_basis * position_qty)
-        pnl_abs = position_value - cost_value
-        pnl_pct = (pnl_abs / cost_value * 100) if cost_value != 0 else 0.0
-
-        # Unlock schedule (monthly next 12 months)
-        today = pd.Timestamp.today().normalize()
-        unlock_months = pd.date_range(today + pd.offsets.MonthBegin(1), periods=12, freq="MS")
-        # unlock % of circulating (0%~6%)
-        unlock_pct = np.clip(r.normal(1.2, 1.0, len(unlock_months)), 0, 6)
-        unlock_df = pd.DataFrame({"date": unlock_months, "unlock_pct_of_circ": unlock_pct})
-
-        # Fundamentals (daily 1Y)
-        fees = _series_trend(seed, f"{t}_fees", days=365, base=r.uniform(1e4, 2e7), vol=0.07, drift=r.uniform(-0.001, 0.004))
-        tvl = _series_trend(seed, f"{t}_tvl", days=365, base=r.uniform(1e7, 3e10), vol=0.04, drift=r.uniform(-0.002, 0.003))
-        platform_vol = _series_trend(seed, f"{t}_platvol", days=365, base=r.uniform(1e6, 2e10), vol=0.06, drift=r.uniform(-0.002, 0.004))
-        mau = _series_trend(seed, f"{t}_mau", days=365, base=r.uniform(2e4, 2e7), vol=0.03, drift=r.uniform(-0.001, 0.002))
-        dau = _series_trend(seed, f"{t}_dau", days=365, base=r.uniform(5e3, 5e6), vol=0.03, drift=r.uniform(-0.001, 0.002))
-
-        # Market share (daily 1Y, 0~1)
-        share = _series_trend(seed, f"{t}_share", days=365, base=r.uniform(0.01, 0.35), vol=0.02, drift=r.uniform(-0.001, 0.001))
-        share["value"] = np.clip(share["value"], 0, 0.9)
-
-        # Derived metrics / deltas
-        price_30d = _pct_change_30d(price)
-        fdv_30d = _pct_change_30d(fdv)
-        vol_30d = _pct_change_30d(volume)
-
-        # Next unlock > 2% ?
-        next_big = unlock_df[unlock_df["unlock_pct_of_circ"] > 2.0].head(1)
-        next_unlock_flag = False
-        next_unlock_text = "-"
-        if len(next_big) > 0:
-            d = next_big["date"].iloc[0].date().isoformat()
-            p = next_big["unlock_pct_of_circ"].iloc[0]
-            next_unlock_flag = True
-            next_unlock_text = f"{d} ({p:.1f}%)"
-
-        summary_rows.append({
-            "Token": t,
-            "Price (30D %)": price_30d,
-            "FDV (30D %)": fdv_30d,
-            "Volume 24H (30D %)": vol_30d,
-            "Next Unlock (>2%)": next_unlock_text,
-            "_next_unlock_flag": next_unlock_flag,
-        })
-
-        details[t] = {
-            "price": price,
-            "fdv": fdv,
-            "volume": volume,
-            "circ": circ,
-            "burn": burn,
-            "unlock": unlock_df,
-            "fund_fees": fees,
-            "fund_tvl": tvl,
-            "fund_platform_vol": platform_vol,
-            "fund_mau": mau,
-            "fund_dau": dau,
-            "fund_share": share,
-            "position": {
-                "qty": position_qty,
-                "cost_basis": cost_basis,
-                "cost_value": cost_value,
-                "value": position_value,
-                "pnl_abs": pnl_abs,
-                "pnl_pct": pnl_pct,
-            }
-        }
-
-    summary = pd.DataFrame(summary_rows)
+def _draw_params(seed: int, tokens, n: int):
+    return tuple(map(np.array, zip(*(_token_params(_rng(seed, t), n) for t in tokens))))
+
+# Each token draws its noise from one stream, metric rows in this order: the
+# summary metrics come first, so a summary-only build draws just that prefix
+_PATH_ORDER = SUMMARY_METRICS + [m for m in METRICS if m not in SUMMARY_METRICS]
+_VOLS = np.array([spec[2] for spec in _TREND_SPECS])
+
+def _trend_paths(seed: int, tokens, base, drift, spike_mult, burn_off, n: int, metrics, out=None) -> np.ndarray:
+    """Raw trend levels for the given metrics as one (tokens, metrics, days) array (filled into `out` if given)."""
+    cols = [_M[m] for m in metrics]
+    rows = [_PATH_ORDER.index(m) for m in metrics]
+    paths = np.empty((len(tokens), len(cols), n)) if out is None else out
+    for i, t in enumerate(tokens):
+        paths[i] = _rng(seed, f"{t}_paths").standard_normal((max(rows) + 1, n))[rows]
+
+    paths *= _VOLS[cols, None]
+    paths += drift[:, cols, None]
+    np.cumsum(paths, axis=-1, out=paths)
+    np.exp(paths, out=paths)
+    paths *= base[:, cols, None]
+    return paths
+
+def _observe(paths: np.ndarray, metrics, spike_mult, burn_off) -> np.ndarray:
+    """Turn raw trend levels into observed values in place (spikes, no-burn, share cap)."""
+    for k, m in enumerate(metrics):
+        if m == "volume":
+            paths[:, k] *= spike_mult
+        elif m == "burn":
+            paths[burn_off, k] *= 0.0
+        elif m == "fund_share":
+            paths[:, k] = np.clip(paths[:, k], 0, 0.9)
+    return paths
+
+def position_arrays(last_price: np.ndarray, cost_basis: np.ndarray, qty: np.ndarray) -> dict:
+    """Mock PnL for a batch of positions, keyed like details[t]["position"]."""
+    position_value = last_price * qty
+    cost_value = cost_basis * qty
+    pnl_abs = position_value - cost_value
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pnl_pct = np.where(cost_value != 0, pnl_abs / cost_value * 100, 0.0)
+    return {
+        "qty": qty,
+        "cost_basis": cost_basis,
+        "cost_value": cost_value,
+        "value": position_value,
+        "pnl_abs": pnl_abs,
+        "pnl_pct": pnl_pct,
+    }
+
+def build_summary(tokens, deltas: np.ndarray, unlock_pct: np.ndarray, unlock_months, extra: dict | None = None) -> pd.DataFrame:
+    """Summary table from the (tokens, SUMMARY_METRICS) 30D % changes and unlock schedule.
+
+    `extra` columns are given in the order of `tokens` and sorted with their rows.
+    """
+    # Next unlock > 2% ?
+    unlocks = evaluate([UNLOCK_RULE], unlock_pct=unlock_pct)
+    next_unlock_flag = unlocks.mask[:, 0]
+    first_big = unlocks.first[:, 0]
+    next_unlock_text = [
+        f"{unlock_months[k].date().isoformat()} ({unlock_pct[i, k]:.1f}%)" if flag else "-"
+        for i, (flag, k) in enumerate(zip(next_unlock_flag, first_big))
+    ]
+
+    summary = pd.DataFrame({
+        "Token": list(tokens),
+        "Price (30D %)": deltas[:, 0],
+        "FDV (30D %)": deltas[:, 1],
+        "Volume 24H (30D %)": deltas[:, 2],
+        "Next Unlock (>2%)": next_unlock_text,
+        **(extra or {}),
+        "_next_unlock_flag": next_unlock_flag,
+    })
 
     # sort: put tokens with big unlock soon on top, then by volume change abs
-    summary = summary.sort_values(
+    return summary.sort_values(
         by=["_next_unlock_flag", "Volume 24H (30D %)"],
         ascending=[False, False]
     ).reset_index(drop=True)
 
+class TokenSeries(Mapping):
+    """One token's details: a (metrics, days) block over a date index shared by all tokens.
+
+    d["price"]-style access returns a date/value DataFrame view into the
+    block, built on first use; d.values and d.series(m) skip pandas.
+    """
+
+    __slots__ = ("token", "dates", "values", "unlock", "position", "_frames")
+
+    def __init__(self, token, dates, values: np.ndarray, unlock: pd.DataFrame, position: dict):
+        values.flags.writeable = False   # shared by every session that reads this token
+        self.token = token
+        self.dates = dates
+        self.values = values
+        self.unlock = unlock
+        self.position = MappingProxyType(dict(position))
+        self._frames = {}
+
+    def __reduce__(self):
+        # mappingproxy doesn't pickle (disk cache); frames are rebuilt on demand
+        return TokenSeries, (self.token, self.dates, self.values, self.unlock, dict(self.position))
+
+    def series(self, metric: str) -> np.ndarray:
+        return self.values[_M[metric]]
+
+    def __getitem__(self, key):
+        if key == "unlock":
+            return self.unlock
+        if key == "position":
+            return self.position
+        if key not in self._frames:
+            self._frames[key] = pd.DataFrame({"date": self.dates, "value": self.values[_M[key]]}, copy=False)
+        return self._frames[key]
+
+    def __iter__(self):
+        return iter(DETAIL_KEYS + ["position"])
+
+    def __len__(self):
+        return len(DETAIL_KEYS) + 1
+
+    @property
+    def nbytes(self) -> int:
+        # the date index is shared, so only the block and the unlock table count
+        return self.values.nbytes + int(self.unlock.memory_usage().sum())
+
+class TokenDetails(Mapping):
+    """Per-token details, built on first access and memoized.
+
+    Holds the drawn inputs for the whole universe plus the summary paths, so
+    a token only pays for its remaining series when a page asks for it.
+    """
+
+    def __init__(self, seed, tokens, idx, unlock_months, params, summary_paths, dtype=np.float64):
+        self.seed = seed
+        self.idx = idx
+        self.dtype = np.dtype(dtype)
+        self.unlock_months = unlock_months
+        self._pos = {t: i for i, t in enumerate(tokens)}
+        self._params = params
+        self._summary_paths = summary_paths
+        self._built = {}
+        self._built_nbytes = 0
+        self._lock = threading.Lock()
+        self._freeze()
+
+    def _freeze(self):
+        # shared by every session; unpickled copies (disk cache) come back writeable
+        for a in (*self._params, self._summary_paths):
+            a.flags.writeable = False
+        for d in self._built.values():
+            d.values.flags.writeable = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._freeze()
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            sum(p.nbytes for p in self._params)
+            + self._summary_paths.nbytes
+            + self._built_nbytes
+        )
+
+    def __getitem__(self, token):
+        d = self._built.get(token)
+        if d is None:
+            # shared across sessions: build outside the lock, keep (and count) the first one in
+            built = self._build(token)
+            with self._lock:
+                d = self._built.setdefault(token, built)
+                if d is built:
+                    self._built_nbytes += d.nbytes
+        return d
+
+    def __iter__(self):
+        return iter(self._pos)
+
+    def __len__(self):
+        return len(self._pos)
+
+    @property
+    def dates(self):
+        return self.idx
+
+    def prices(self) -> np.ndarray:
+        """(tokens, days) price paths for the whole universe, without building any token."""
+        return self._summary_paths[:, SUMMARY_METRICS.index("price")]
+
+    def positions(self) -> dict:
+        """Every token's position as arrays, keyed like details[t]["position"]."""
+        last_price = self.prices()[:, -1]
+        return position_arrays(last_price, last_price * self._params[4], self._params[5])
+
+    @timed("TokenDetails.build")
+    def _build(self, token):
+        i = self._pos[token]
+        base, drift, spike_mult, burn_off, cost_mult, qty, unlock_pct = (p[i:i + 1] for p in self._params)
+
+        rest = [m for m in METRICS if m not in SUMMARY_METRICS]
+        rest_paths = _trend_paths(self.seed, [token], base, drift, spike_mult, burn_off, len(self.idx), rest)
+        _observe(rest_paths, rest, spike_mult, burn_off)
+        values = np.empty((len(METRICS), len(self.idx)), dtype=self.dtype)
+        values[[_M[m] for m in SUMMARY_METRICS]] = self._summary_paths[i]
+        values[[_M[m] for m in rest]] = rest_paths[0]
+
+        # PnL (mock), from the float64 path
+        last_price = self._summary_paths[i, SUMMARY_METRICS.index("price"), -1:]
+        pos = position_arrays(last_price, last_price * cost_mult, qty)
+
+        unlock = pd.DataFrame({"date": self.unlock_months, "unlock_pct_of_circ": unlock_pct[0]}, copy=False)
+        return TokenSeries(token, self.idx, values, unlock, {k: float(v[0]) for k, v in pos.items()})
+
+@timed()
+def generate_token_dataset(tokens=None, seed: int = 42, dtype=np.float64, days: int = DAYS):
+    """(summary, details); dtype=np.float32 halves the per-token detail blocks."""
+    if tokens is None:
+        tokens = TOKENS_DEFAULT
+    tokens = list(tokens)
+
+    idx = _date_index(days, "D")
+    n = len(idx)
+
+    params = _draw_params(seed, tokens, n)
+    base, drift, spike_mult, burn_off, _, _, unlock_pct = params
+
+    # summary only needs the price / FDV / volume paths
+    paths = _trend_paths(seed, tokens, base, drift, spike_mult, burn_off, n, SUMMARY_METRICS)
+    _observe(paths, SUMMARY_METRICS, spike_mult, burn_off)
+    unlock_months = _unlock_months()
+    summary = build_summary(tokens, pct_change(paths, 30), unlock_pct, unlock_months)
+
+    details = TokenDetails(seed, tokens, idx, unlock_months, params, paths, dtype=dtype)
     return summary, details
 
-def ma_30(series_df: pd.DataFrame) -> pd.DataFrame:
-    df = series_df.copy()
-    df["ma30"] = df["value"].rolling(30).mean()
-    return df
+@timed()
+def generate_token_arrays(tokens=None, seed: int = 42, alloc=np.empty, days: int = DAYS) -> dict:
+    """Eager batch build of every metric for every token, as plain arrays.
+
+    `alloc(shape)` provides the (tokens, metrics, days) output buffer, e.g.
+    a np.lib.format.open_memmap so large universes stream straight to disk.
+    """
+    if tokens is None:
+        tokens = TOKENS_DEFAULT
+    tokens = list(tokens)
+
+    idx = _date_index(days, "D")
+    n = len(idx)
+
+    base, drift, spike_mult, burn_off, cost_mult, qty, unlock_pct = _draw_params(seed, tokens, n)
+    values = alloc((len(tokens), len(METRICS), n))
+    _trend_paths(seed, tokens, base, drift, spike_mult, burn_off, n, METRICS, out=values)
+    _observe(values, METRICS, spike_mult, burn_off)
+
+    return {
+        "tokens": tokens,
+        "dates": idx,
+        "values": values,
+        "unlock_dates": _unlock_months(),
+        "unlock_pct": unlock_pct,
+        "position": position_arrays(values[:, _M["price"], -1], values[:, _M["price"], -1] * cost_mult, qty),
+    }
@@ -1,5 +1,12 @@
+import json
+import time
+from collections import deque
+
+import pandas as pd
 import streamlit as st
 
+from utils import perf, startup
+
 def kpi_row(items):
     cols = st.columns(len(items))
     for col, (label, value, delta) in zip(cols, items):
@@ -16,3 +23,66 @@ def section_header(title: str, subtitle: str = ""):
 
 def divider():
     st.markdown("---")
+
+def _ago(seconds: float) -> str:
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+def data_status(status: dict | None):
+    """Snapshot freshness and refresh progress (nothing without a snapshot store)."""
+    if not status:
+        return
+    if status.get("as_of"):
+        stale = pd.Timestamp(status["as_of"]) < pd.Timestamp.today().normalize()
+        age = _ago(time.time() - status.get("published_at", time.time()))
+        st.caption(f"{'⚠️ Stale · ' if stale else ''}Data as of {status['as_of']} · published {age} ago")
+    if status.get("state") == "running" and status.get("total"):
+        st.progress(status["done"] / status["total"], text=f"Refreshing data {status['done']}/{status['total']}")
+    elif status.get("state") == "failed":
+        st.caption(f"Last refresh failed: {status.get('error')}")
+
+def warmup_notice(status: dict):
+    """Sidebar note while the process is still warming its caches (see utils.startup)."""
+    if status["state"] == "warming":
+        st.caption(f"⏳ Warming up caches ({time.time() - status['started_at']:.0f}s) · first loads may be slower")
+
+def perf_begin(page: str):
+    """Start this rerun's trace when perf is on (DASHBOARD_PERF, or ?perf=1 for this session).
+
+    Also stamps the start of the session's first render, for time-to-first-render.
+    """
+    st.session_state.setdefault("_first_render", {"page": page, "started": time.time(), "done": False})
+    if perf.ENABLED or st.query_params.get("perf") == "1":
+        return perf.start_trace(page)
+    perf.clear_trace()
+    return None
+
+def perf_panel(trace, keep: int = 20):
+    """Finish the trace and show this session's recent reruns in a sidebar "Perf" expander."""
+    first = st.session_state.get("_first_render")
+    if first is not None and not first["done"]:
+        first["done"] = True
+        startup.record_first_render(first["page"], first["started"])
+    if trace is None:
+        return
+    trace.finish()
+    history = st.session_state.setdefault("_perf_traces", deque(maxlen=keep))
+    history.append(trace)
+
+    with st.sidebar.expander("Perf", expanded=False):
+        labels = [f"{t.label} · {t.root.ms:.0f} ms · {time.strftime('%H:%M:%S', time.localtime(t.wall))}" for t in history]
+        pick = st.selectbox("Rerun", range(len(history)), index=len(history) - 1, format_func=labels.__getitem__,
+                            key="_perf_pick")
+        st.dataframe(pd.DataFrame(history[pick].rows()), hide_index=True, use_container_width=True)
+        status = startup.warmup_status()
+        first = status["first_render"]
+        if first:
+            warmup = f"{status['warmup_s']:.1f}s" if "warmup_s" in status else status["state"]
+            st.caption(f"Process first render {first['render_s'] * 1e3:.0f} ms, "
+                       f"{first['since_start_s']:.1f}s after start · warm-up {warmup}")
+        st.download_button("JSON", json.dumps(perf.to_json(history), indent=1), "perf.json", "application/json")
+        st.download_button("Chrome trace", json.dumps(perf.chrome_trace(list(history))), "perf.trace.json",
+                           "application/json")